@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from typing import List, Dict, Optional, Any, Callable
+
+CHECKPOINT_VERSION = 1
+
+# Sinaliza que o orçamento de tempo ou de nós acabou; a busca é interrompida e o melhor parcial é devolvido
+class BudgetExhausted(Exception):
+    pass
+
+# Controle de resolução "anytime": prazo de relógio, orçamento de nós, melhor preenchimento parcial e
+# checkpoints periódicos em disco. O relógio só é consultado a cada `check_every` nós.
+class AnytimeControl:
+    def __init__(self, time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None, checkpoint_interval: float = 30.0,
+                 resume_state: Optional[Dict[str, Any]] = None, check_every: int = 128,
+                 stop: Optional[Callable[[], bool]] = None):
+        self.time_limit: Optional[float] = time_limit
+        self.node_limit: Optional[int] = node_limit
+        self.checkpoint_path: Optional[str] = checkpoint_path
+        self.checkpoint_interval: float = checkpoint_interval
+        self.resume_state: Optional[Dict[str, Any]] = resume_state  # Checkpoint carregado para retomar a busca
+        self.check_every: int = check_every
+        self.stop: Optional[Callable[[], bool]] = stop  # Pedido de cancelamento externo, consultado junto com o relógio
+        self.cancelled: bool = False
+        self.deadline: Optional[float] = None
+        self.next_checkpoint: float = 0.0
+        self.exhausted: bool = False
+        self.best_filled: int = 0  # Slots preenchidos com palavras válidas no melhor parcial
+        self.total_slots: int = 0
+        self.best: Any = None  # Representação do melhor parcial (definida pelo resolvedor)
+
+    def start(self, total_slots: int) -> None:
+        now: float = time.perf_counter()
+        self.deadline = now + self.time_limit if self.time_limit is not None else None
+        self.next_checkpoint = now + self.checkpoint_interval
+        self.total_slots = total_slots
+
+    # Chamado a cada nó; levanta BudgetExhausted quando o orçamento acaba e grava checkpoints no intervalo
+    def tick(self, nodes: int, checkpoint: Optional[Callable[[], Dict[str, Any]]] = None) -> None:
+        if self.node_limit is not None and nodes >= self.node_limit:
+            raise BudgetExhausted()
+        if nodes % self.check_every:
+            return
+        now: float = time.perf_counter()
+        if self.deadline is not None and now >= self.deadline:
+            raise BudgetExhausted()
+        if self.stop is not None and self.stop():
+            self.cancelled = True
+            raise BudgetExhausted()
+        if checkpoint is not None and self.checkpoint_path is not None and now >= self.next_checkpoint:
+            save_checkpoint(self.checkpoint_path, checkpoint())
+            self.next_checkpoint = now + self.checkpoint_interval
+
+    # Consulta imediata do orçamento e do cancelamento, para quem coordena subproblemas fora da busca
+    def expired(self, nodes: int) -> bool:
+        if self.stop is not None and self.stop():
+            self.cancelled = True
+        return (self.cancelled or (self.node_limit is not None and nodes >= self.node_limit)
+                or (self.deadline is not None and time.perf_counter() >= self.deadline))
+
+    # Orçamento de um subproblema: o prazo que resta, os nós que restam e o mesmo pedido de cancelamento
+    def child(self, nodes_used: int = 0) -> 'AnytimeControl':
+        time_limit: Optional[float] = max(0.0, self.deadline - time.perf_counter()) if self.deadline is not None else None
+        node_limit: Optional[int] = max(0, self.node_limit - nodes_used) if self.node_limit is not None else None
+        return AnytimeControl(time_limit, node_limit, check_every=self.check_every, stop=self.stop)
+
+    # Guarda o parcial se ele preencher mais slots que o melhor até agora (a cópia só é feita quando melhora)
+    def offer(self, filled: int, snapshot: Callable[[], Any]) -> None:
+        if filled > self.best_filled:
+            self.best_filled = filled
+            self.best = snapshot()
+
+# Grava o checkpoint de forma atômica (arquivo temporário + rename)
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    state = dict(state, version=CHECKPOINT_VERSION)
+    temporary_path: str = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file, ensure_ascii=False)
+    os.replace(temporary_path, path)
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as file:
+        state: Dict[str, Any] = json.load(file)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint incompatível: {path}")
+    return state
+
+def remove_checkpoint(path: Optional[str]) -> None:
+    if path is not None and os.path.exists(path):
+        os.remove(path)
+
+# Cópia do grid (buffer compacto ou lista de listas) para guardar o melhor parcial
+def snapshot_grid(grid: List[List[str]]) -> Any:
+    if hasattr(grid, 'snapshot'):
+        return grid.snapshot()
+    return [list(row) for row in grid]
+
+def restore_grid(grid: List[List[str]], snapshot: Any) -> None:
+    if hasattr(grid, 'restore'):
+        grid.restore(snapshot)
+        return
+    for row, saved in zip(grid, snapshot):
+        row[:] = saved
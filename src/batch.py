@@ -0,0 +1,114 @@
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+import time
+from typing import List, Dict, Optional, Any, Iterator, TextIO
+from pattern_index import PatternIndex
+from compiled_index import ensure_compiled_index
+from compact_grid import Grid
+from modes import SOLVER_MODES, solve_with_mode
+from heuristics import SLOT_STRATEGIES, VALUE_STRATEGIES
+from logger_config import setup_logger
+from utils import WORD_SCORERS
+
+logger = setup_logger()
+
+# Índice compartilhado com os processos filhos. O dicionário compilado é aberto via mmap, então as
+# páginas do arquivo são compartilhadas pelo sistema operacional: com 'fork' o mapeamento é herdado
+# do processo pai; sem 'fork' cada filho abre o mesmo arquivo no inicializador.
+_shared: Dict[str, Any] = {}
+
+# Expande um diretório (todos os .txt) ou um padrão glob em uma lista ordenada de grids
+def expand_grid_paths(sources: List[str]) -> List[str]:
+    paths: List[str] = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(glob.glob(os.path.join(source, '*.txt')))
+        else:
+            paths.extend(glob.glob(source))
+    return sorted(set(paths))
+
+def _init_worker(words_path: Optional[str], options: Dict[str, Any], scorer: Optional[str] = None) -> None:
+    # Silencia o log passo a passo nos filhos: vários processos escrevendo no mesmo log.txt só geram ruído
+    logging.getLogger("crossword_solver").setLevel(logging.WARNING)
+    if words_path is not None:
+        _shared['words_index'] = ensure_compiled_index(words_path, scorer=scorer)
+    _shared['options'] = options
+
+# Resolve um grid no processo filho e devolve o resultado como dicionário serializável
+def solve_grid_file(path: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    words_index: PatternIndex = _shared['words_index']
+    options = options if options is not None else _shared['options']
+    start_time = time.perf_counter()
+    try:
+        grid = Grid.from_file(path)
+        solved: bool = solve_with_mode(grid, words_index, words_index.words_by_length, **options)
+        result: Dict[str, Any] = {'grid': path, 'solved': solved, 'rows': [''.join(line) for line in grid] if solved else None}
+    except Exception as error:  # Um grid com problema não derruba o lote
+        result = {'grid': path, 'solved': False, 'error': repr(error)}
+    result['seconds'] = round(time.perf_counter() - start_time, 4)
+    result['pid'] = os.getpid()
+    return result
+
+# Cria o pool de processos com o índice de palavras já disponível em cada filho
+def make_pool(words_path: str, options: Dict[str, Any], workers: Optional[int] = None, scorer: Optional[str] = None) -> multiprocessing.pool.Pool:
+    if _shared.get('words_path') != (words_path, scorer):
+        _shared['words_index'] = ensure_compiled_index(words_path, scorer=scorer)  # Compila (se preciso) uma vez, antes dos filhos
+        _shared['words_path'] = (words_path, scorer)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        initargs = (None, options)
+    else:
+        context = multiprocessing.get_context()
+        initargs = (words_path, options, scorer)
+    return context.Pool(processes=workers or os.cpu_count(), initializer=_init_worker, initargs=initargs)
+
+# Resolve vários grids em paralelo, devolvendo cada resultado assim que termina
+def solve_batch(paths: List[str], words_path: str, options: Dict[str, Any], workers: Optional[int] = None,
+                scorer: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    with make_pool(words_path, options, workers, scorer) as pool:
+        yield from pool.imap_unordered(solve_grid_file, paths)
+
+# Escreve cada resultado como uma linha JSON, sem esperar o lote inteiro
+def write_jsonl(results: Iterator[Dict[str, Any]], output: TextIO) -> int:
+    count: int = 0
+    for result in results:
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+        output.flush()
+        count += 1
+    return count
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve vários grids em paralelo e emite os resultados em JSONL")
+    parser.add_argument('grids', nargs='+', help="diretório ou padrão glob (ex.: 'grids/*.txt')")
+    parser.add_argument('--words', default='src/files/lista_palavras.txt')
+    parser.add_argument('--mode', choices=SOLVER_MODES, default='ac3')
+    parser.add_argument('--slot-order', choices=sorted(SLOT_STRATEGIES), default='default')
+    parser.add_argument('--value-order', choices=sorted(VALUE_STRATEGIES), default='default')
+    parser.add_argument('--backjumping', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--scorer', choices=sorted(WORD_SCORERS), default=None, help="pontuação que ordena as palavras (padrão: a do índice compilado)")
+    parser.add_argument('--workers', type=int, default=None, help="processos (padrão: todos os núcleos)")
+    parser.add_argument('--output', default='-', help="arquivo JSONL de saída ('-' para stdout)")
+    args = parser.parse_args()
+
+    paths: List[str] = expand_grid_paths(args.grids)
+    if not paths:
+        logger.info("Nenhum grid encontrado.")
+        return
+    options: Dict[str, Any] = {'mode': args.mode, 'slot_order': args.slot_order, 'value_order': args.value_order, 'backjumping': args.backjumping}
+    start_time = time.perf_counter()
+    results = solve_batch(paths, args.words, options, args.workers, args.scorer)
+    if args.output == '-':
+        count = write_jsonl(results, sys.stdout)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            count = write_jsonl(results, output)
+    logger.info(f"{count} grids processados em {time.perf_counter() - start_time:.2f} segundos")
+
+if __name__ == "__main__":
+    main()
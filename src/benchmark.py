@@ -0,0 +1,324 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import signal
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import List, Dict, Callable, Optional, Any, Tuple, Iterable
+from trie import load_words
+from pattern_index import PatternIndex, load_words_index
+from compact_grid import Grid
+from metrics import SolveMetrics, percentile
+from modes import SOLVER_MODES, solve_with_mode
+from numpy_index import NUMPY_AVAILABLE, NumpyPatternIndex
+
+# Gera padrões de consulta a partir de palavras reais, trocando posições aleatórias por '?'
+def generate_query_patterns(word_size_map: Dict[int, List[str]], n_queries: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    lengths: List[int] = sorted(length for length, words in word_size_map.items() if words and length > 1)
+    patterns: List[str] = []
+    for _ in range(n_queries):
+        word: str = rng.choice(word_size_map[rng.choice(lengths)])
+        fixed: int = rng.randint(0, min(3, len(word)))  # Slots reais raramente têm muitas letras fixas
+        positions = set(rng.sample(range(len(word)), fixed))
+        patterns.append(''.join(char if i in positions else '?' for i, char in enumerate(word)))
+    return patterns
+
+# Mede o tempo total de uma função de busca sobre todos os padrões
+def time_queries(search: Callable[[str], List[str]], patterns: List[str]) -> float:
+    start_time = time.perf_counter()
+    for pattern in patterns:
+        search(pattern)
+    return time.perf_counter() - start_time
+
+# Microbenchmark: Trie recursiva (filtrando por tamanho como o solver fazia) x índice posicional
+def benchmark_pattern_index(words_path: str, n_queries: int, seed: int = 0) -> None:
+    words_trie, word_size_map = load_words(words_path)
+    start_time = time.perf_counter()
+    words_index = PatternIndex(word_size_map)
+    build_time: float = time.perf_counter() - start_time
+    patterns: List[str] = generate_query_patterns(word_size_map, n_queries, seed)
+
+    def trie_search(pattern: str) -> List[str]:
+        return [word for word in words_trie.search_with_pattern(pattern) if len(word) == len(pattern)]
+
+    # Confere que os dois mecanismos retornam o mesmo conjunto de palavras
+    for pattern in patterns[:100]:
+        assert sorted(trie_search(pattern)) == sorted(words_index.search_with_pattern(pattern)), pattern
+
+    trie_time: float = time_queries(trie_search, patterns)
+    index_time: float = time_queries(words_index.search_with_pattern, patterns)
+    count_time: float = time_queries(words_index.count_pattern, patterns)
+    print(f"Construção do índice: {build_time:.3f}s")
+    print(f"Trie.search_with_pattern:     {trie_time:.3f}s ({n_queries / trie_time:.0f} consultas/s)")
+    print(f"PatternIndex.search:          {index_time:.3f}s ({n_queries / index_time:.0f} consultas/s, {trie_time / index_time:.1f}x)")
+    print(f"PatternIndex.count_pattern:   {count_time:.3f}s ({n_queries / count_time:.0f} consultas/s, {trie_time / count_time:.1f}x)")
+    if not NUMPY_AVAILABLE:
+        print("NumpyPatternIndex: NumPy não instalado, medição ignorada")
+        return
+    numpy_index = NumpyPatternIndex(word_size_map)
+    for pattern in patterns[:100]:
+        assert numpy_index.search_with_pattern(pattern) == words_index.search_with_pattern(pattern), pattern
+    numpy_time: float = time_queries(numpy_index.search_with_pattern, patterns)
+    print(f"NumpyPatternIndex.search:     {numpy_time:.3f}s ({n_queries / numpy_time:.0f} consultas/s, {trie_time / numpy_time:.1f}x)")
+
+# --- Geradores determinísticos ---
+
+# Frequências aproximadas das letras no português (em %), separadas em vogais e consoantes
+VOWEL_FREQUENCIES: Dict[str, float] = {'A': 14.6, 'E': 12.6, 'O': 10.7, 'I': 6.2, 'U': 4.6}
+CONSONANT_FREQUENCIES: Dict[str, float] = {
+    'S': 7.8, 'R': 6.5, 'N': 5.0, 'D': 5.0, 'M': 4.7, 'T': 4.3, 'C': 3.9, 'L': 2.8, 'P': 2.5, 'V': 1.7,
+    'G': 1.3, 'H': 1.3, 'Q': 1.2, 'B': 1.0, 'F': 1.0, 'Z': 0.5, 'J': 0.4, 'X': 0.3, 'K': 0.02, 'W': 0.01, 'Y': 0.01,
+}
+# Distribuição aproximada dos tamanhos de palavra num dicionário (2 a 15 letras)
+LENGTH_WEIGHTS: Dict[int, float] = {2: 1, 3: 3, 4: 6, 5: 10, 6: 13, 7: 14, 8: 14, 9: 12, 10: 10, 11: 7, 12: 5, 13: 3, 14: 2, 15: 1}
+DEFAULT_MAX_LENGTH = 15
+LONG_WORD_WEIGHT = 0.25  # Peso mínimo dos tamanhos além da tabela: slots longos precisam de candidatas
+
+# Pesos dos tamanhos de 2 até max_length: a tabela acima, com uma cauda que decai pela metade a cada letra
+# (até LONG_WORD_WEIGHT) para os tamanhos maiores que 15
+def length_weights(max_length: int) -> Dict[int, float]:
+    last: int = max(LENGTH_WEIGHTS)
+    return {length: LENGTH_WEIGHTS.get(length, max(LENGTH_WEIGHTS[last] * 0.5 ** (length - last), LONG_WORD_WEIGHT))
+            for length in range(2, max(max_length, 2) + 1)}
+
+# Maior slot (sequência de células fora de blocos, em linha ou coluna) entre os grids
+def longest_slot(grids: Iterable[List[str]]) -> int:
+    longest: int = 0
+    for lines in grids:
+        for line in list(lines) + [''.join(column) for column in zip(*lines)]:
+            longest = max(longest, max(len(run) for run in line.split('.')))
+    return longest
+
+# Gera um dicionário sintético com sílabas consoante-vogal (às vezes com consoante final) e letras sorteadas
+# pelas frequências do português. A mesma semente sempre gera as mesmas palavras, na mesma ordem.
+# `max_length` deve cobrir o maior slot dos grids que serão resolvidos (ver longest_slot)
+def generate_dictionary(n_words: int, seed: int = 0, max_length: int = DEFAULT_MAX_LENGTH) -> List[str]:
+    rng = random.Random(seed)
+    vowels, vowel_weights = zip(*VOWEL_FREQUENCIES.items())
+    consonants, consonant_weights = zip(*CONSONANT_FREQUENCIES.items())
+    lengths, weights = zip(*length_weights(max_length).items())
+    vowel_cumulative = list(_cumulative(vowel_weights))
+    consonant_cumulative = list(_cumulative(consonant_weights))
+    words: Dict[str, None] = {}  # Dicionário como conjunto ordenado
+    while len(words) < n_words:
+        length: int = rng.choices(lengths, weights)[0]
+        letters: List[str] = []
+        while len(letters) < length:
+            if rng.random() < 0.85:  # Ataque da sílaba
+                letters.append(rng.choices(consonants, cum_weights=consonant_cumulative)[0])
+            letters.append(rng.choices(vowels, cum_weights=vowel_cumulative)[0])
+            if rng.random() < 0.15:  # Coda (R, S, L, M, N)
+                letters.append(rng.choice('RSLMN'))
+        words[''.join(letters[:length])] = None
+    return list(words)
+
+def _cumulative(weights: Tuple[float, ...]) -> List[float]:
+    total: float = 0.0
+    cumulative: List[float] = []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+def write_dictionary(path: str, words: List[str]) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(words) + '\n')
+
+# Gera um grid com simetria rotacional de 180° (como nas cruzadas tradicionais): cada bloco '.'
+# sorteado com a densidade informada é espelhado na célula oposta; as demais células ficam '?'
+def generate_grid(rows: int, cols: int, density: float, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    cells: List[List[str]] = [['?'] * cols for _ in range(rows)]
+    for row in range(rows):
+        for col in range(cols):
+            mirror: Tuple[int, int] = (rows - 1 - row, cols - 1 - col)
+            if (row, col) > mirror:
+                continue  # Já decidido pela célula espelhada
+            if rng.random() < density:
+                cells[row][col] = '.'
+                cells[mirror[0]][mirror[1]] = '.'
+    return [''.join(line) for line in cells]
+
+def write_grid(path: str, lines: List[str]) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines) + '\n')
+
+def read_grid_lines(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as file:
+        return [line for line in file.read().splitlines() if line]
+
+def default_grid_paths() -> List[str]:
+    if not os.path.isdir('grids'):
+        return []
+    return sorted(os.path.join('grids', name) for name in os.listdir('grids') if name.endswith('.txt'))
+
+# --- Suíte de resolução ---
+
+class BenchmarkTimeout(Exception):
+    pass
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise BenchmarkTimeout()
+
+# Resolve um grid uma vez; com `timeout`, interrompe pelo relógio do sistema (SIGALRM, apenas Unix)
+def run_once(grid_path: str, words_index: PatternIndex, mode: str, timeout: Optional[float]) -> Tuple[Optional[bool], float, SolveMetrics, Optional[str]]:
+    grid = Grid.from_file(grid_path)
+    metrics = SolveMetrics(timing=False)  # Só a contagem de nós entra no relatório
+    use_alarm: bool = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start_time = time.perf_counter()
+    solved: Optional[bool] = None
+    error: Optional[str] = None
+    try:
+        solved = solve_with_mode(grid, words_index, words_index.words_by_length, mode, metrics=metrics)
+    except BenchmarkTimeout:
+        error = 'timeout'
+    except RecursionError:
+        error = 'recursion'  # O modo legacy é recursivo e estoura a pilha em grids grandes
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return solved, time.perf_counter() - start_time, metrics, error
+
+# Aquecimento, repetições cronometradas e uma execução extra sob o tracemalloc (que distorce o tempo)
+def benchmark_grid(grid_path: str, words_index: PatternIndex, mode: str, warmup: int, repetitions: int,
+                   timeout: Optional[float]) -> Dict[str, Any]:
+    for _ in range(warmup):
+        run_once(grid_path, words_index, mode, timeout)
+    times: List[float] = []
+    solved: Optional[bool] = None
+    nodes: int = 0
+    for _ in range(repetitions):
+        solved, seconds, metrics, error = run_once(grid_path, words_index, mode, timeout)
+        if error is not None:
+            return {'solved': None, 'error': error}
+        times.append(seconds)
+        nodes = metrics.nodes_expanded
+    tracemalloc.start()
+    run_once(grid_path, words_index, mode, timeout)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'solved': solved,
+        'median': round(statistics.median(times), 6),
+        'p95': round(percentile(times, 0.95), 6),
+        'peak_kib': round(peak / 1024, 1),
+        'nodes': nodes,
+    }
+
+def run_suite(grid_paths: List[str], words_path: str, modes: List[str], warmup: int = 1, repetitions: int = 5,
+              timeout: Optional[float] = 30.0) -> Dict[str, Any]:
+    logging.getLogger("crossword_solver").setLevel(logging.WARNING)  # O log do solver distorceria as medidas
+    words_index, _ = load_words_index(words_path)
+    results: Dict[str, Dict[str, Any]] = {}
+    for grid_path in grid_paths:
+        for mode in modes:
+            key: str = f"{os.path.basename(grid_path)}|{mode}"
+            results[key] = benchmark_grid(grid_path, words_index, mode, warmup, repetitions, timeout)
+            print(f"{key:<28} {format_result(results[key])}", flush=True)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'words': words_path,
+            'n_words': sum(len(words) for words in words_index.words_by_length.values()),
+            'warmup': warmup,
+            'repetitions': repetitions,
+        },
+        'results': results,
+    }
+
+def format_result(result: Dict[str, Any]) -> str:
+    if result.get('error'):
+        return result['error']
+    return (f"resolvido={result['solved']} mediana={result['median'] * 1000:.1f}ms p95={result['p95'] * 1000:.1f}ms "
+            f"pico={result['peak_kib']:.0f}KiB nós={result['nodes']}")
+
+# Compara com uma linha de base: regressão se a mediana piorar além da tolerância (e de um mínimo absoluto,
+# para não acusar ruído em grids que resolvem em poucos milissegundos) ou se um grid deixar de ser resolvido
+def compare_with_baseline(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2,
+                          min_delta: float = 0.005) -> List[str]:
+    regressions: List[str] = []
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None or base.get('error'):
+            continue
+        if result.get('error') or result['solved'] != base['solved']:
+            regressions.append(f"{key}: resolvido {base['solved']} -> {result.get('solved')} ({result.get('error', 'ok')})")
+            continue
+        ratio: float = result['median'] / base['median'] if base['median'] else 1.0
+        line: str = f"{key}: mediana {base['median'] * 1000:.1f}ms -> {result['median'] * 1000:.1f}ms ({ratio:.2f}x), nós {base['nodes']} -> {result['nodes']}"
+        if ratio > 1 + tolerance and result['median'] - base['median'] > min_delta:
+            regressions.append(line)
+        else:
+            print(f"ok  {line}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks do resolvedor de palavras cruzadas")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    patterns = commands.add_parser('patterns', help="microbenchmark da busca de padrões (Trie x índice)")
+    patterns.add_argument('words', nargs='?', default='src/files/lista_palavras.txt')
+    patterns.add_argument('--queries', type=int, default=500)
+    patterns.add_argument('--seed', type=int, default=0)
+
+    dictionary = commands.add_parser('dictionary', help="gera um dicionário sintético determinístico")
+    dictionary.add_argument('output')
+    dictionary.add_argument('--size', type=int, default=100_000, help="número de palavras (ex.: 10000 a 1000000)")
+    dictionary.add_argument('--seed', type=int, default=0)
+    dictionary.add_argument('--max-length', type=int, default=None, help="maior tamanho de palavra (padrão: o maior slot dos grids de --grids)")
+    dictionary.add_argument('--grids', nargs='+', default=None, metavar='GRID', help="grids que o dicionário deve cobrir (padrão: grids/*.txt)")
+
+    grid = commands.add_parser('grid', help="gera um grid aleatório com simetria rotacional")
+    grid.add_argument('output')
+    grid.add_argument('--rows', type=int, default=15)
+    grid.add_argument('--cols', type=int, default=None, help="padrão: igual a --rows")
+    grid.add_argument('--density', type=float, default=0.18, help="fração de blocos")
+    grid.add_argument('--seed', type=int, default=0)
+
+    suite = commands.add_parser('suite', help="resolve os grids em cada modo e mede tempo, memória e nós")
+    suite.add_argument('grids', nargs='*', default=None, help="arquivos de grid (padrão: grids/*.txt)")
+    suite.add_argument('--words', default='src/files/lista_palavras.txt')
+    suite.add_argument('--modes', nargs='+', choices=SOLVER_MODES, default=list(SOLVER_MODES))
+    suite.add_argument('--warmup', type=int, default=1)
+    suite.add_argument('--repetitions', type=int, default=5)
+    suite.add_argument('--timeout', type=float, default=30.0, help="segundos por execução (0 desativa)")
+    suite.add_argument('--save', default=None, metavar='ARQUIVO', help="grava os resultados como linha de base")
+    suite.add_argument('--baseline', default=None, metavar='ARQUIVO', help="compara com uma linha de base gravada")
+    suite.add_argument('--tolerance', type=float, default=0.2, help="piora relativa aceita na mediana")
+    args = parser.parse_args()
+
+    if args.command == 'patterns':
+        benchmark_pattern_index(args.words, args.queries, args.seed)
+    elif args.command == 'dictionary':
+        max_length: int = args.max_length or longest_slot(read_grid_lines(path) for path in args.grids or default_grid_paths()) or DEFAULT_MAX_LENGTH
+        write_dictionary(args.output, generate_dictionary(args.size, args.seed, max_length))
+    elif args.command == 'grid':
+        write_grid(args.output, generate_grid(args.rows, args.cols or args.rows, args.density, args.seed))
+    else:
+        grid_paths: List[str] = args.grids or default_grid_paths()
+        results = run_suite(grid_paths, args.words, args.modes, args.warmup, args.repetitions, args.timeout or None)
+        if args.save:
+            with open(args.save, 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as file:
+                baseline = json.load(file)
+            regressions = compare_with_baseline(results, baseline, args.tolerance)
+            for line in regressions:
+                print(f"REGRESSÃO  {line}")
+            if regressions:
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from operator import itemgetter
+from typing import List, Tuple, Dict, Iterator, Union, Callable
+
+ENCODING = 'latin-1'  # Um byte por célula; cobre as letras acentuadas do português
+BLOCK = ord('.')
+EMPTY = ord('?')
+
+# Visão sem cópia de uma linha ou coluna do grid compacto.
+# Lê e escreve diretamente no bytearray do grid, com a mesma interface de uma lista de caracteres.
+class GridLine:
+    __slots__ = ('data', 'start', 'step', 'length')
+
+    def __init__(self, data: bytearray, start: int, step: int, length: int):
+        self.data: bytearray = data
+        self.start: int = start
+        self.step: int = step
+        self.length: int = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: Union[int, slice]) -> str:
+        if isinstance(index, slice):
+            return ''.join(self[i] for i in range(*index.indices(self.length)))
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('índice fora do grid')
+        return chr(self.data[self.start + index * self.step])
+
+    def __setitem__(self, index: int, char: str) -> None:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('índice fora do grid')
+        self.data[self.start + index * self.step] = ord(char)
+
+    def __iter__(self) -> Iterator[str]:
+        data = self.data
+        return (chr(data[i]) for i in range(self.start, self.start + self.length * self.step, self.step))
+
+    def __contains__(self, char: object) -> bool:
+        if self.step == 1:
+            return isinstance(char, str) and char.encode(ENCODING) in self.data[self.start:self.start + self.length]
+        return any(cell == char for cell in self)
+
+    def __eq__(self, other: object) -> bool:
+        try:
+            return len(other) == self.length and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+# Grid compacto: um bytearray contíguo (linha a linha) em vez de List[List[str]].
+# grid[linha][coluna] continua funcionando (via GridLine), então can_place_word, place_word,
+# find_free_spaces etc. aceitam este grid sem mudanças. Os índices das células de cada slot
+# são pré-calculados, permitindo montar o padrão do slot com um único itemgetter sobre o buffer
+# e salvar/restaurar o grid inteiro com uma cópia de bytes durante o backtracking.
+# Linhas de tamanhos diferentes são completadas com blocos ('.') até a linha mais longa.
+class Grid:
+    def __init__(self, rows: List[List[str]]):
+        self.height: int = len(rows)
+        self.width: int = max((len(row) for row in rows), default=0)
+        self.data: bytearray = bytearray(''.join(''.join(row) + '.' * (self.width - len(row)) for row in rows).encode(ENCODING))
+        self.rows: List[GridLine] = [GridLine(self.data, row * self.width, 1, self.width) for row in range(self.height)]
+        self.slot_indices: Dict[Tuple[int, int, str], Tuple[int, ...]] = {}  # {(linha, coluna, direção): índices no buffer}
+        self._slot_getters: Dict[Tuple[int, int, str], Callable[[bytearray], Tuple[int, ...]]] = {}
+        self._find_slot_indices()
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'Grid':
+        with open(file_path, 'r') as file:
+            return cls([list(line.strip()) for line in file.readlines()])
+
+    # Pré-calcula os índices das células de cada slot (duas ou mais células, H e V)
+    def _find_slot_indices(self) -> None:
+        for direction, outer, inner, offset in (('H', self.height, self.width, lambda line, pos: line * self.width + pos),
+                                               ('V', self.width, self.height, lambda line, pos: pos * self.width + line)):
+            for line in range(outer):
+                position = 0
+                while position < inner:
+                    if self.data[offset(line, position)] == BLOCK:
+                        position += 1
+                        continue
+                    start = position
+                    while position < inner and self.data[offset(line, position)] != BLOCK:
+                        position += 1
+                    if position - start > 1:
+                        key = (line, start, 'H') if direction == 'H' else (start, line, 'V')
+                        indices = tuple(offset(line, pos) for pos in range(start, position))
+                        self.slot_indices[key] = indices
+                        self._slot_getters[key] = itemgetter(*indices)
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, row: int) -> GridLine:
+        return self.rows[row]
+
+    def __iter__(self) -> Iterator[GridLine]:
+        return iter(self.rows)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Grid):
+            return self.data == other.data
+        try:
+            return len(other) == self.height and all(a == b for a, b in zip(self.rows, other))
+        except TypeError:
+            return NotImplemented
+
+    # Visão sem cópia de uma coluna
+    def column(self, col: int) -> GridLine:
+        return GridLine(self.data, col, self.width, self.height)
+
+    # Padrão atual de um slot, montado diretamente dos bytes das suas células
+    def pattern(self, row: int, col: int, direction: str) -> str:
+        return bytes(self._slot_getters[(row, col, direction)](self.data)).decode(ENCODING)
+
+    def snapshot(self) -> bytes:
+        return bytes(self.data)
+
+    # Restaura no mesmo buffer (as visões de linha continuam válidas)
+    def restore(self, snapshot: bytes) -> None:
+        self.data[:] = snapshot
+
+    def is_complete(self) -> bool:
+        return EMPTY not in self.data
+
+    def to_text(self) -> str:
+        return '\n'.join(self.data[row * self.width:(row + 1) * self.width].decode(ENCODING) for row in range(self.height))
+
+    def to_lists(self) -> List[List[str]]:
+        return [list(row) for row in self.rows]
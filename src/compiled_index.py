@@ -0,0 +1,373 @@
+import argparse
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+from collections import deque
+from typing import List, Tuple, Dict, Optional, Iterator, Deque, Sequence, Callable, Any, FrozenSet, Type
+from pattern_index import PatternIndex, load_words_index
+from utils import WORD_SCORERS, DEFAULT_SCORER
+from trie import preprocess_words_by_length
+
+logger = logging.getLogger("crossword_solver")  # Sem configurar o arquivo de log: quem configura é o ponto de entrada
+
+# Formato binário versionado do dicionário compilado (little-endian):
+#   cabeçalho | diretório de tamanhos | por tamanho: palavras (largura fixa) + pontuações + tabela e bitsets posicionais | DAWG compactado
+# Cada palavra ocupa um byte por letra (latin-1), então a palavra i de tamanho L está em words_offset + i * L.
+# Com uma função de pontuação, as palavras de cada tamanho são gravadas já ordenadas por pontuação decrescente.
+MAGIC = b'CWIX'
+VERSION = 3
+ENCODING = 'latin-1'
+# magic, versão, n° de tamanhos, sha256 da lista fonte, pontuação, offset da trie, n° de nós, tamanho e mtime (ns) da lista fonte
+HEADER = struct.Struct('<4sII32s16sQQQq')
+SOURCE_STAT = struct.Struct('<Qq')  # Os dois últimos campos do cabeçalho, regravados quando só o mtime mudou
+LENGTH_ENTRY = struct.Struct('<IIQQQI')  # tamanho, n° de palavras, offset das palavras, offset das pontuações, offset da tabela, n° de entradas
+SCORE = struct.Struct('<q')
+BITS_ENTRY = struct.Struct('<HBQ')  # posição, letra, offset do bitset
+TRIE_NODE = struct.Struct('<IHBB')  # primeiro filho, n° de filhos, letra, fim de palavra (um registro por aresta do DAWG)
+
+# Tamanho e mtime da lista fonte: se não mudaram desde a compilação, o checksum nem é calculado
+def source_stat(file_path: str) -> Tuple[int, int]:
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+# Checksum da lista de palavras fonte; muda o checksum, o arquivo compilado é reconstruído
+def source_checksum(file_path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+# Lê a lista de palavras na mesma ordem usada por load_words_index
+def read_word_list(file_path: str) -> List[str]:
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return sorted(word for word in file.read().splitlines() if word)
+
+# DAWG (trie com sufixos compartilhados) construído incrementalmente sobre a lista ordenada (algoritmo de Daciuk):
+# ao sair de um ramo, cada estado é trocado por um equivalente já registrado (mesmo fim de palavra e mesmas arestas).
+# Devolve as arestas e o fim de palavra de cada estado, e o estado raiz
+def build_dawg(encoded: List[bytes]) -> Tuple[List[Optional[Dict[int, int]]], List[bool], int]:
+    edges: List[Optional[Dict[int, int]]] = [{}]
+    final: List[bool] = [False]
+    register: Dict[Tuple[bool, Tuple[Tuple[int, int], ...]], int] = {}
+    unchecked: List[Tuple[int, int, int]] = []  # (pai, letra, filho) do último ramo ainda não minimizado
+
+    def minimize(depth: int) -> None:
+        while len(unchecked) > depth:
+            parent, char, child = unchecked.pop()
+            signature = (final[child], tuple(edges[child].items()))  # Arestas inseridas em ordem de letra
+            state = register.get(signature)
+            if state is None:
+                register[signature] = child
+            else:
+                edges[parent][char] = state
+                edges[child] = None  # Estado descartado: o equivalente registrado o substitui
+
+    previous: bytes = b''
+    for word in encoded:
+        common: int = 0
+        while common < min(len(word), len(previous)) and word[common] == previous[common]:
+            common += 1
+        minimize(common)
+        node: int = unchecked[-1][2] if unchecked else 0
+        for char in word[common:]:
+            child = len(edges)
+            edges.append({})
+            final.append(False)
+            edges[node][char] = child
+            unchecked.append((node, char, child))
+            node = child
+        final[node] = True
+        previous = word
+    minimize(0)
+    return edges, final, 0
+
+# DAWG compactado em largura: as arestas de saída de cada estado ficam contíguas e ordenadas pela letra, e cada
+# registro aponta para o bloco de arestas do estado de destino. Estados compartilhados têm um único bloco,
+# então o formato (e a busca em MappedTrie) é o mesmo de uma trie compactada, só que menor
+def build_packed_trie(words: List[str]) -> List[Tuple[int, int, int, int]]:
+    edges, final, root = build_dawg(sorted(word.encode(ENCODING) for word in words))
+    first_edge: Dict[int, int] = {root: 1}
+    order: List[int] = [root]
+    position: int = 1 + len(edges[root])
+    for state in order:  # Percurso em largura: numera o bloco de cada estado na primeira visita
+        for child in edges[state].values():
+            if child not in first_edge:
+                first_edge[child] = position
+                position += len(edges[child])
+                order.append(child)
+    nodes: List[Tuple[int, int, int, int]] = [(first_edge[root], len(edges[root]), 0, int(final[root]))]
+    for state in order:
+        for char, child in edges[state].items():
+            nodes.append((first_edge[child], len(edges[child]), char, int(final[child])))
+    return nodes
+
+# Compila a lista de palavras para o arquivo binário
+def compile_index(source_path: str, index_path: str, scorer: Optional[str] = DEFAULT_SCORER) -> None:
+    size, mtime = source_stat(source_path)  # Antes da leitura: uma alteração durante a compilação força a conferência do checksum
+    words: List[str] = read_word_list(source_path)
+    word_size_map: Dict[int, List[str]] = preprocess_words_by_length(words)
+    lengths: List[int] = sorted(length for length, bucket in word_size_map.items() if bucket)
+    chunks: List[bytes] = []
+    offset: int = HEADER.size + LENGTH_ENTRY.size * len(lengths)
+    directory: List[bytes] = []
+    for length in lengths:
+        bucket_index = PatternIndex({length: word_size_map[length]}, scorer)  # Reaproveita a ordenação e os bitsets posicionais
+        bucket: List[str] = bucket_index.words_by_length[length]
+        words_blob: bytes = ''.join(bucket).encode(ENCODING)  # Falha se houver letras fora do latin-1
+        words_offset: int = offset
+        chunks.append(words_blob)
+        offset += len(words_blob)
+        if offset % SCORE.size:  # Alinha as pontuações para a visão do mmap como array de int64
+            padding: int = SCORE.size - offset % SCORE.size
+            chunks.append(bytes(padding))
+            offset += padding
+        scores_offset: int = offset
+        if scorer is not None:
+            scores_blob: bytes = b''.join(SCORE.pack(score) for score in bucket_index.scores[length])
+            chunks.append(scores_blob)
+            offset += len(scores_blob)
+        n_bytes: int = (len(bucket) + 7) // 8
+        entries: List[Tuple[int, int, int]] = []
+        bitsets: List[bytes] = []
+        for position, letters in enumerate(bucket_index.position_bits[length]):
+            for letter, bits in sorted(letters.items()):
+                entries.append((position, letter.encode(ENCODING)[0], 0))
+                bitsets.append(bits.to_bytes(n_bytes, 'little'))
+        table_offset: int = offset
+        offset += BITS_ENTRY.size * len(entries)
+        table: List[bytes] = []
+        for (position, letter, _), bitset in zip(entries, bitsets):
+            table.append(BITS_ENTRY.pack(position, letter, offset))
+            offset += len(bitset)
+        chunks.append(b''.join(table))
+        chunks.extend(bitsets)
+        directory.append(LENGTH_ENTRY.pack(length, len(bucket), words_offset, scores_offset, table_offset, len(entries)))
+    trie_nodes = build_packed_trie(words)
+    trie_offset: int = offset
+    chunks.append(b''.join(TRIE_NODE.pack(*node) for node in trie_nodes))
+    header: bytes = HEADER.pack(MAGIC, VERSION, len(lengths), source_checksum(source_path), (scorer or '').encode('ascii'),
+                                trie_offset, len(trie_nodes), size, mtime)
+    temporary_path: str = f'{index_path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(header)
+        file.writelines(directory)
+        file.writelines(chunks)
+    os.replace(temporary_path, index_path)  # Troca atômica: leitores nunca veem um arquivo pela metade
+
+# Lista de palavras de um tamanho lida diretamente do mmap (decodifica só a palavra acessada)
+class MappedWordList:
+    def __init__(self, buffer: mmap.mmap, offset: int, length: int, count: int):
+        self.buffer: mmap.mmap = buffer
+        self.offset: int = offset
+        self.length: int = length
+        self.count: int = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('índice fora da lista de palavras')
+        start: int = self.offset + index * self.length
+        return self.buffer[start:start + self.length].decode(ENCODING)
+
+    def __iter__(self) -> Iterator[str]:
+        blob: str = self.buffer[self.offset:self.offset + self.count * self.length].decode(ENCODING)
+        length = self.length
+        return (blob[i:i + length] for i in range(0, len(blob), length))
+
+# Trie compactada percorrida diretamente no mmap (mesma interface de busca da Trie)
+class MappedTrie:
+    def __init__(self, buffer: mmap.mmap, offset: int, count: int):
+        self.buffer: mmap.mmap = buffer
+        self.offset: int = offset
+        self.count: int = count
+
+    def node(self, index: int) -> Tuple[int, int, int, int]:
+        return TRIE_NODE.unpack_from(self.buffer, self.offset + index * TRIE_NODE.size)
+
+    # Busca binária da letra entre os filhos (contíguos e ordenados) do nó
+    def child(self, index: int, char: int) -> Optional[int]:
+        first, n_children, _, _ = self.node(index)
+        low, high = first, first + n_children
+        while low < high:
+            middle = (low + high) // 2
+            middle_char = self.node(middle)[2]
+            if middle_char == char:
+                return middle
+            if middle_char < char:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def __contains__(self, word: str) -> bool:
+        node: Optional[int] = 0
+        for char in word.encode(ENCODING, errors='replace'):
+            node = self.child(node, char)
+            if node is None:
+                return False
+        return self.node(node)[3] == 1
+
+    def search_with_pattern(self, pattern: str) -> List[str]:
+        words: List[str] = []
+        encoded: bytes = pattern.encode(ENCODING, errors='replace')
+        stack: List[Tuple[int, int, bytes]] = [(0, 0, b'')]  # (nó, posição no padrão, prefixo)
+        while stack:
+            node, position, prefix = stack.pop()
+            if position == len(encoded):
+                if self.node(node)[3]:
+                    words.append(prefix.decode(ENCODING))
+                continue
+            if encoded[position] == ord('?'):
+                first, n_children, _, _ = self.node(node)
+                for child in range(first + n_children - 1, first - 1, -1):
+                    stack.append((child, position + 1, prefix + bytes((self.node(child)[2],))))
+            else:
+                child = self.child(node, encoded[position])
+                if child is not None:
+                    stack.append((child, position + 1, prefix + encoded[position:position + 1]))
+        return words
+
+# Índice de padrões aberto a partir do arquivo compilado via mmap.
+# Nada é lido na abertura além do cabeçalho e do diretório. As palavras, as pontuações e o DAWG são lidos
+# direto do mmap, cujas páginas são compartilhadas entre processos que abrem o mesmo arquivo.
+# Limitação: as operações de bitset precisam de inteiros do Python, então na primeira consulta a um tamanho
+# os bitsets daquele tamanho são copiados para inteiros privados do processo (e a lista é decodificada).
+# Essas cópias só são compartilhadas se forem carregadas antes de um fork (cópia na escrita).
+class MappedPatternIndex(PatternIndex):
+    def __init__(self, index_path: str):
+        with open(index_path, 'rb') as file:
+            self.buffer: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_lengths, checksum, scorer, trie_offset, trie_nodes, size, mtime = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Arquivo de índice incompatível: {index_path}")
+        self.checksum: bytes = checksum
+        self.source_size: int = size
+        self.source_mtime: int = mtime
+        self.scorer: Optional[str] = scorer.rstrip(b'\0').decode('ascii') or None
+        self.trie: MappedTrie = MappedTrie(self.buffer, trie_offset, trie_nodes)
+        self.words_by_length: Dict[int, MappedWordList] = {}
+        self.full_masks: Dict[int, int] = {}
+        self.position_bits: Dict[int, List[Dict[str, int]]] = _LazyByLength(self, self.load_position_bits)
+        self.scores: Dict[int, Sequence[int]] = _LazyByLength(self, self.load_scores)
+        self.decoded: Dict[int, List[str]] = _LazyByLength(self, lambda length: list(self.words_by_length[length]))
+        self.tables: Dict[int, Tuple[int, int, int]] = {}  # {tamanho: (offset das pontuações, offset da tabela, n° de entradas)}
+        self.word_sets: Dict[int, FrozenSet[str]] = {}
+        for i in range(n_lengths):
+            length, count, words_offset, scores_offset, table_offset, entries = LENGTH_ENTRY.unpack_from(self.buffer, HEADER.size + i * LENGTH_ENTRY.size)
+            self.words_by_length[length] = MappedWordList(self.buffer, words_offset, length, count)
+            self.full_masks[length] = (1 << count) - 1
+            self.tables[length] = (scores_offset, table_offset, entries)
+
+    # Converte os bitsets posicionais de um tamanho (feito uma vez, sob demanda)
+    def load_position_bits(self, length: int) -> List[Dict[str, int]]:
+        _, table_offset, entries = self.tables[length]
+        n_bytes: int = (len(self.words_by_length[length]) + 7) // 8
+        position_bits: List[Dict[str, int]] = [{} for _ in range(length)]
+        for i in range(entries):
+            position, letter, offset = BITS_ENTRY.unpack_from(self.buffer, table_offset + i * BITS_ENTRY.size)
+            position_bits[position][bytes((letter,)).decode(ENCODING)] = int.from_bytes(self.buffer[offset:offset + n_bytes], 'little')
+        return position_bits
+
+    # As consultas decodificam a lista inteira do tamanho na primeira vez: acessar palavra a palavra no mmap
+    # dentro de words_from_mask custa uma chamada de método por bit ligado
+    def bucket(self, length: int) -> List[str]:
+        return self.decoded[length] if length in self.tables else []
+
+    # Pontuações de um tamanho, lidas do arquivo sem cópia (visão do mmap)
+    def load_scores(self, length: int) -> Sequence[int]:
+        if self.scorer is None:
+            raise KeyError(length)
+        scores_offset = self.tables[length][0]
+        return memoryview(self.buffer)[scores_offset:scores_offset + SCORE.size * len(self.words_by_length[length])].cast('q')
+
+    def close(self) -> None:
+        self.scores.clear()  # Libera as visões do mmap antes de fechá-lo
+        self.buffer.close()
+
+# Dicionário {tamanho: valor} preenchido sob demanda pelo carregador, na primeira consulta a cada tamanho
+class _LazyByLength(dict):
+    def __init__(self, index: MappedPatternIndex, loader: Callable[[int], Any]):
+        super().__init__()
+        self.index: MappedPatternIndex = index
+        self.loader: Callable[[int], Any] = loader
+
+    def __missing__(self, length: int) -> Any:
+        if length not in self.index.tables:
+            raise KeyError(length)
+        value = self.loader(length)
+        self[length] = value
+        return value
+
+# A lista fonte é a mesma da compilação? Tamanho e mtime iguais bastam; tamanho diferente já é mudança.
+# Só com o mtime diferente (ex.: `touch`, cópia) o checksum é calculado, e se bater o mtime novo é gravado no cabeçalho
+def source_unchanged(index: MappedPatternIndex, source_path: str, index_path: str) -> bool:
+    size, mtime = source_stat(source_path)
+    if size != index.source_size:
+        return False
+    if mtime == index.source_mtime:
+        return True
+    if index.checksum != source_checksum(source_path):
+        return False
+    try:
+        with open(index_path, 'r+b') as file:
+            file.seek(HEADER.size - SOURCE_STAT.size)
+            file.write(SOURCE_STAT.pack(size, mtime))
+    except OSError:
+        pass  # Arquivo só de leitura: o checksum volta a ser conferido na próxima carga
+    return True
+
+# Caminho padrão do arquivo compilado ao lado da lista de palavras
+def default_index_path(source_path: str) -> str:
+    return os.path.splitext(source_path)[0] + '.idx'
+
+# Abre o índice compilado, reconstruindo-o se não existir ou se o checksum da lista fonte (ou a pontuação) mudou.
+# Sem pontuação pedida (None), aceita a pontuação com que o arquivo foi compilado (DEFAULT_SCORER ao compilar).
+# `index_type` escolhe a classe que abre o arquivo (ex.: o motor NumPy sobre o mesmo mmap).
+# Palavras fora do latin-1 não cabem no formato: volta para o índice em memória com um aviso
+def ensure_compiled_index(source_path: str, index_path: Optional[str] = None, scorer: Optional[str] = None,
+                          index_type: Type[MappedPatternIndex] = MappedPatternIndex) -> PatternIndex:
+    index_path = index_path or default_index_path(source_path)
+    if os.path.exists(index_path):
+        try:
+            index = index_type(index_path)
+            if scorer in (None, index.scorer) and source_unchanged(index, source_path, index_path):
+                return index
+            index.close()
+        except (ValueError, struct.error):
+            pass  # Arquivo antigo ou corrompido: recompila
+    scorer = scorer or DEFAULT_SCORER
+    try:
+        compile_index(source_path, index_path, scorer)
+    except UnicodeEncodeError:
+        logger.warning(f"O dicionário tem letras fora do {ENCODING}: usando o índice em memória.")
+        return load_words_index(source_path, scorer)[0]
+    return index_type(index_path)
+
+# Equivalente a load_words_index, mas usando o dicionário compilado
+def load_compiled_words_index(source_path: str, scorer: Optional[str] = None) -> Tuple[PatternIndex, Dict[int, List[str]]]:
+    index = ensure_compiled_index(source_path, scorer=scorer)
+    return index, index.words_by_length
+
+# Carrega o dicionário pelo arquivo compilado (padrão) ou reconstruindo o índice a partir do texto
+def load_dictionary(source_path: str, compiled: bool = True, scorer: Optional[str] = None) -> Tuple[PatternIndex, Dict[int, List[str]]]:
+    if compiled:
+        return load_compiled_words_index(source_path, scorer)
+    return load_words_index(source_path, scorer or DEFAULT_SCORER)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compila a lista de palavras para o índice binário")
+    parser.add_argument('words', nargs='?', default='src/files/lista_palavras.txt')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--scorer', choices=sorted(WORD_SCORERS), default=DEFAULT_SCORER, help="pontuação pré-calculada que ordena as palavras")
+    args = parser.parse_args()
+    start_time = time.perf_counter()
+    compile_index(args.words, args.output or default_index_path(args.words), args.scorer)
+    print(f"Índice compilado em {time.perf_counter() - start_time:.2f} segundos")
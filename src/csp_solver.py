@@ -0,0 +1,416 @@
+import time
+from collections import deque
+from typing import List, Tuple, Dict, Optional, Deque, Iterator, Set
+from pattern_index import PatternIndex
+from slots import SlotGraph
+from grid import place_word, print_grid
+from heuristics import SlotStrategy, ValueStrategy, DefaultSlotOrder, VowelValueOrder
+from logger_config import setup_logger
+from tracing import tracer
+from metrics import SolveMetrics
+from anytime import AnytimeControl, BudgetExhausted, save_checkpoint, remove_checkpoint
+
+logger = setup_logger()
+
+# Domínios candidatos de cada slot como bitsets sobre a lista de palavras do tamanho do slot.
+# Junto com cada domínio guarda a explicação das podas (bitset dos slots atribuídos que as causaram),
+# usada pelo backjumping. Toda alteração é registrada em uma trilha (trail), então desfazer o
+# backtracking é só restaurar as entradas registradas desde a marca, sem copiar os domínios.
+class DomainStore:
+    def __init__(self, domains: List[int]):
+        self.domains: List[int] = domains
+        self.reasons: List[int] = [0] * len(domains)  # [slot] -> bitset dos slots responsáveis pelas podas
+        self.trail: List[Tuple[int, int, int]] = []  # [(slot, domínio anterior, explicação anterior)]
+
+    def mark(self) -> int:
+        return len(self.trail)
+
+    def set(self, slot_id: int, domain: int, reason: int = 0) -> None:
+        self.trail.append((slot_id, self.domains[slot_id], self.reasons[slot_id]))
+        self.domains[slot_id] = domain
+        self.reasons[slot_id] |= reason
+
+    def undo(self, mark: int) -> None:
+        trail, domains, reasons = self.trail, self.domains, self.reasons
+        while len(trail) > mark:
+            slot_id, domain, reason = trail.pop()
+            domains[slot_id] = domain
+            reasons[slot_id] = reason
+
+# Nível de decisão da busca iterativa: o slot, suas palavras candidatas e o conjunto de conflito acumulado
+class Frame:
+    __slots__ = ('slot_id', 'candidates', 'position', 'mark', 'conflict')
+
+    def __init__(self, slot_id: int, candidates: List[str], mark: int, conflict: int):
+        self.slot_id: int = slot_id
+        self.candidates: List[str] = candidates
+        self.position: int = 0  # Próxima candidata a tentar
+        self.mark: int = mark  # Marca da trilha antes de atribuir qualquer candidata deste nível
+        self.conflict: int = conflict  # Bitset dos slots que explicam as falhas deste nível
+
+# Resolvedor por satisfação de restrições: forward checking + consistência de arcos (AC-3)
+# sobre o grafo de slots, usando os bitsets posicionais do PatternIndex.
+# A busca é iterativa (pilha explícita, sem recursão) e, por padrão, usa conflict-directed
+# backjumping: ao esgotar um slot, volta direto ao slot mais recente que causou o conflito.
+class CSPSolver:
+    def __init__(self, grid: List[List[str]], words_index: PatternIndex, slot_graph: Optional[SlotGraph] = None,
+                 slot_strategy: Optional[SlotStrategy] = None, value_strategy: Optional[ValueStrategy] = None,
+                 backjumping: bool = True, metrics: Optional[SolveMetrics] = None, anytime: Optional[AnytimeControl] = None,
+                 excluded: Optional[Set[str]] = None):
+        self.grid = grid
+        self.words_index: PatternIndex = words_index
+        self.slot_graph: SlotGraph = slot_graph if slot_graph is not None else SlotGraph(grid)
+        self.lengths: List[int] = [slot.length for slot in self.slot_graph.slots]
+        self.slots_by_length: Dict[int, List[int]] = {}
+        for slot in self.slot_graph.slots:
+            self.slots_by_length.setdefault(slot.length, []).append(slot.id)
+        # O domínio inicial respeita as letras já presentes no grid
+        self.store: DomainStore = DomainStore([words_index.match_mask(self.slot_graph.pattern(slot.id)) for slot in self.slot_graph.slots])
+        for word in excluded or ():  # Palavras já usadas fora deste grid (ex.: em outro componente) saem de todos os domínios
+            for slot_id in self.slots_by_length.get(len(word), ()):
+                self.store.domains[slot_id] &= ~words_index.match_mask(word)
+        self.assignment: Dict[int, str] = {}  # {slot: palavra}
+        # Estratégias plugáveis; o padrão são as heurísticas atuais (ordem de find_free_spaces e prioritize_words)
+        self.slot_strategy: SlotStrategy = slot_strategy if slot_strategy is not None else DefaultSlotOrder()
+        self.value_strategy: ValueStrategy = value_strategy if value_strategy is not None else VowelValueOrder()
+        self.backjumping: bool = backjumping
+        self.nodes_expanded: int = 0
+        self.backtracks: int = 0
+        self.wipeout: int = -1  # Slot cujo domínio ficou vazio na última propagação
+        self.metrics: SolveMetrics = metrics if metrics is not None else SolveMetrics(timing=False)
+        self.slot_keys: List[Tuple[int, int, str]] = [(slot.row, slot.col, slot.direction) for slot in self.slot_graph.slots]
+        self.anytime: Optional[AnytimeControl] = anytime  # Prazo, orçamento de nós e checkpoints (opcional)
+        self.stack: List[Frame] = []  # Caminho de decisões da busca
+        self.levels: Dict[int, int] = {}  # {slot: nível na pilha}
+        self.symmetry: Optional[Tuple[int, int]] = None  # (líder, espelho): exige palavra(líder) < palavra(espelho)
+
+    # Letras possíveis na posição informada, dado o domínio do slot
+    def supported_letters(self, slot_id: int, index: int) -> List[str]:
+        return self.words_index.supported_letters(self.lengths[slot_id], index, self.store.domains[slot_id])
+
+    # Explicação do domínio atual de um slot: as podas que ele sofreu e, se atribuído, ele mesmo
+    def cause(self, slot_id: int) -> int:
+        reason: int = self.store.reasons[slot_id]
+        return reason | (1 << slot_id) if slot_id in self.assignment else reason
+
+    # Remove do domínio de target as palavras sem suporte em source no cruzamento. Retorna se houve mudança
+    def revise(self, target: int, target_index: int, source: int, source_index: int) -> bool:
+        domain: int = self.store.domains[target]
+        allowed: int = self.words_index.letters_mask(self.lengths[target], target_index, self.supported_letters(source, source_index))
+        if domain & allowed == domain:
+            return False
+        self.store.set(target, domain & allowed, self.cause(source))
+        return True
+
+    # AC-3 a partir dos slots alterados; retorna False assim que algum domínio fica vazio
+    def propagate(self, changed: List[int]) -> bool:
+        neighbors = self.slot_graph.neighbors
+        queue: Deque[Tuple[int, int, int, int]] = deque()
+        for source in changed:
+            for source_index, target, target_index in neighbors[source]:
+                queue.append((target, target_index, source, source_index))
+        while queue:
+            target, target_index, source, source_index = queue.popleft()
+            if self.revise(target, target_index, source, source_index):
+                if not self.store.domains[target]:
+                    self.wipeout = target
+                    return False
+                for index, other, other_index in neighbors[target]:
+                    if other != source:
+                        queue.append((other, other_index, target, index))
+        return True
+
+    # Atribui uma palavra ao slot, retira-a dos demais slots do mesmo tamanho (sem palavras repetidas) e propaga
+    def assign(self, slot_id: int, word_bit: int, word: str) -> bool:
+        self.store.set(slot_id, word_bit)
+        self.assignment[slot_id] = word
+        changed: List[int] = [slot_id]
+        for other in self.slots_by_length[self.lengths[slot_id]]:
+            if other != slot_id and self.store.domains[other] & word_bit:
+                self.store.set(other, self.store.domains[other] & ~word_bit, 1 << slot_id)
+                if not self.store.domains[other]:
+                    self.wipeout = other
+                    return False
+                changed.append(other)
+        if self.symmetry is not None and slot_id in self.symmetry:
+            # Quebra de simetria (lex-leader): o slot espelhado fica só com palavras do lado certo da atribuída
+            leader, mirror = self.symmetry
+            other = mirror if slot_id == leader else leader
+            bound: int = self.store.domains[other] & self.ordered_mask(self.lengths[other], word, slot_id == leader)
+            if bound != self.store.domains[other]:
+                self.store.set(other, bound, 1 << slot_id)
+                if not bound:
+                    self.wipeout = other
+                    return False
+                changed.append(other)
+        return self.propagate(changed)
+
+    # Bitset das palavras do tamanho estritamente maiores (ou menores) que a palavra, em ordem lexicográfica
+    def ordered_mask(self, length: int, word: str, greater: bool) -> int:
+        bits: str = ''.join('1' if (other > word if greater else other < word) else '0' for other in reversed(self.words_index.bucket(length)))
+        return int(bits, 2) if bits else 0
+
+    # Bit da palavra dentro da lista do seu tamanho
+    def word_bit(self, slot_id: int, word: str) -> int:
+        return self.words_index.match_mask(word) & self.store.domains[slot_id]
+
+    # Abre um novo nível de decisão para o próximo slot escolhido pela estratégia
+    def open_frame(self, slot_id: int) -> Frame:
+        start: float = time.perf_counter()
+        candidates: List[str] = self.value_strategy.order(self, slot_id, self.words_index.words_from_mask(self.lengths[slot_id], self.store.domains[slot_id]))
+        self.metrics.add_time('lookup', time.perf_counter() - start)
+        self.metrics.pattern_queries += 1
+        return Frame(slot_id, candidates, self.store.mark(), self.store.reasons[slot_id])
+
+    # Tenta as candidatas restantes do nível; retorna True ao conseguir atribuir uma delas
+    def try_next_value(self, frame: Frame) -> bool:
+        slot_bit: int = 1 << frame.slot_id
+        while frame.position < len(frame.candidates):
+            if self.anytime is not None:  # Aqui o topo da pilha está sem atribuição: estado consistente para o checkpoint
+                self.anytime.tick(self.nodes_expanded, self.checkpoint_state)
+            word: str = frame.candidates[frame.position]
+            frame.position += 1
+            self.nodes_expanded += 1
+            self.slot_strategy.nodes_expanded += 1
+            self.value_strategy.nodes_expanded += 1
+            self.metrics.node(len(self.assignment))
+            self.metrics.examine(self.slot_keys[frame.slot_id])
+            if tracer.progress:
+                tracer.node(len(self.assignment), len(self.assignment), len(self.lengths))
+            if self.metrics.timed('propagation', self.assign, frame.slot_id, self.word_bit(frame.slot_id, word), word):
+                if tracer.steps:
+                    self.trace_slot('assign', frame.slot_id, word)
+                if self.anytime is not None:
+                    self.anytime.offer(len(self.assignment), lambda: dict(self.assignment))
+                return True
+            # Os slots que explicam o domínio esvaziado entram no conjunto de conflito deste nível
+            frame.conflict |= self.cause(self.wipeout) & ~slot_bit
+            self.store.undo(frame.mark)
+            del self.assignment[frame.slot_id]
+        return False
+
+    # Volta da pilha após esgotar o nível do topo. Retorna False se não houver para onde voltar
+    def backtrack(self, stack: List[Frame], levels: Dict[int, int]) -> bool:
+        exhausted: Frame = stack.pop()
+        del levels[exhausted.slot_id]
+        self.backtracks += 1
+        self.metrics.backtracks += 1
+        if not stack:
+            return False
+        if self.backjumping:
+            # Nível mais profundo entre os slots do conjunto de conflito
+            conflict: int = exhausted.conflict
+            target: int = -1
+            while conflict:
+                low_bit = conflict & -conflict
+                target = max(target, levels.get(low_bit.bit_length() - 1, -1))
+                conflict ^= low_bit
+            if target < 0:  # Nenhuma decisão explica a falha: não há solução
+                return False
+        else:
+            target = len(stack) - 1
+        while len(stack) - 1 > target:
+            skipped: Frame = stack.pop()
+            del levels[skipped.slot_id]
+            del self.assignment[skipped.slot_id]
+            if tracer.steps:
+                self.trace_slot('unassign', skipped.slot_id)
+        frame: Frame = stack[target]
+        self.store.undo(frame.mark)
+        del self.assignment[frame.slot_id]
+        if tracer.steps:
+            self.trace_slot('unassign', frame.slot_id)
+        frame.conflict |= exhausted.conflict & ~(1 << frame.slot_id)
+        return True
+
+    # Evento de rastreamento (nível full) com a posição do slot, para a reprodução
+    def trace_slot(self, kind: str, slot_id: int, word: Optional[str] = None) -> None:
+        slot = self.slot_graph.slots[slot_id]
+        if word is None:
+            tracer.event(kind, r=slot.row, c=slot.col, d=slot.direction)
+        else:
+            tracer.event(kind, w=word, r=slot.row, c=slot.col, d=slot.direction, depth=len(self.assignment))
+
+    # Busca iterativa com pilha explícita: a profundidade não depende do limite de recursão do Python.
+    # Ao retomar de um checkpoint, a pilha já vem montada com o topo sem atribuição.
+    def search(self) -> bool:
+        stack, levels = self.stack, self.levels
+        resumed: bool = bool(stack)
+        while True:
+            if not resumed:
+                slot_id: Optional[int] = self.slot_strategy.select(self)
+                if slot_id is None:  # Todos os slots atribuídos
+                    return True
+                levels[slot_id] = len(stack)
+                stack.append(self.open_frame(slot_id))
+            resumed = False
+            while not self.try_next_value(stack[-1]):
+                if not self.backtrack(stack, levels):
+                    return False
+
+    # Propagação inicial e preparação das estratégias; retorna False se algum slot já começa sem candidatas
+    def prepare(self) -> bool:
+        if not all(self.store.domains) or not self.propagate(list(range(len(self.lengths)))):
+            logger.info("Algum espaço do grid não tem palavras compatíveis.")
+            return False
+        self.slot_strategy.prepare(self)
+        self.value_strategy.prepare(self)
+        return True
+
+    def solve(self) -> bool:
+        if not self.prepare():
+            return False
+        anytime = self.anytime
+        if anytime is not None:
+            anytime.start(len(self.lengths))
+            if anytime.resume_state is not None:
+                self.restore(anytime.resume_state)
+        try:
+            solved: bool = self.search()
+        except (BudgetExhausted, KeyboardInterrupt) as interruption:
+            if anytime is not None and anytime.checkpoint_path is not None:
+                save_checkpoint(anytime.checkpoint_path, self.checkpoint_state())
+                logger.info(f"Checkpoint gravado em {anytime.checkpoint_path} ({len(self.stack)} níveis de decisão).")
+            if isinstance(interruption, KeyboardInterrupt) or anytime is None:
+                raise
+            anytime.exhausted = True
+            logger.info(f"Orçamento esgotado após {self.nodes_expanded} nós: melhor parcial com {anytime.best_filled}/{len(self.lengths)} slots.")
+            self.metrics.timed('update', self.write_partial, anytime.best or {})
+            return False
+        logger.info(f"Estratégias {self.slot_strategy.name}/{self.value_strategy.name}: {self.nodes_expanded} nós expandidos, {self.backtracks} retrocessos.")
+        if anytime is not None:
+            remove_checkpoint(anytime.checkpoint_path)  # Busca concluída: o checkpoint não serve mais
+        if solved:
+            self.metrics.timed('update', self.write_solution)
+        return solved
+
+    # Enumera as soluções sob demanda, até `limit`. Cada solução é uma cópia imutável das linhas do grid; o grid
+    # original não é alterado, então o consumidor pode gravar as soluções enquanto a busca continua.
+    # Com `symmetry`, um grid simétrico pela diagonal principal só gera uma solução de cada par transposto.
+    def solutions(self, limit: Optional[int] = None, symmetry: bool = True) -> Iterator[Tuple[str, ...]]:
+        if symmetry:
+            self.symmetry = transposition_pair(self.grid, self.slot_graph)
+            if self.symmetry is not None:
+                logger.info(f"Grid simétrico pela diagonal: quebra de simetria entre os slots {self.symmetry[0]} e {self.symmetry[1]}.")
+        if (limit is not None and limit <= 0) or not self.prepare():
+            return
+        anytime = self.anytime
+        if anytime is not None:
+            anytime.start(len(self.lengths))
+        seen: Set[Tuple[str, ...]] = set()  # Listas com palavras repetidas geram atribuições distintas com o mesmo grid
+        while True:
+            try:
+                if not self.search():
+                    break
+            except BudgetExhausted:
+                anytime.exhausted = True
+                logger.info(f"Orçamento esgotado após {self.nodes_expanded} nós: {len(seen)} soluções enumeradas.")
+                break
+            snapshot: Tuple[str, ...] = self.metrics.timed('update', self.snapshot)
+            if snapshot not in seen:
+                seen.add(snapshot)
+                yield snapshot
+                if limit is not None and len(seen) >= limit:
+                    break
+            if not self.release_solution():
+                break
+        logger.info(f"Estratégias {self.slot_strategy.name}/{self.value_strategy.name}: {len(seen)} soluções, {self.nodes_expanded} nós expandidos, {self.backtracks} retrocessos.")
+        self.metrics.finish()
+
+    # Desfaz a atribuição do topo para a busca seguir para a próxima solução. Abaixo de uma solução nenhum nível
+    # pode ser pulado: o conjunto de conflito do topo passa a conter todos os níveis anteriores.
+    def release_solution(self) -> bool:
+        if not self.stack:
+            return False
+        frame: Frame = self.stack[-1]
+        for level in self.stack[:-1]:
+            frame.conflict |= 1 << level.slot_id
+        self.store.undo(frame.mark)
+        del self.assignment[frame.slot_id]
+        if tracer.steps:
+            self.trace_slot('unassign', frame.slot_id)
+        return True
+
+    # Linhas do grid com a atribuição atual sobreposta, sem alterar o grid
+    def snapshot(self) -> Tuple[str, ...]:
+        rows: List[List[str]] = [list(line) for line in self.grid]
+        for slot_id, word in self.assignment.items():
+            for (row, col), letter in zip(self.slot_graph.slots[slot_id].cells, word):
+                rows[row][col] = letter
+        return tuple(''.join(row) for row in rows)
+
+    # Estado serializável da busca: o caminho de decisões (slot, próxima candidata, conjunto de conflito) de cada
+    # nível. Todos os níveis abaixo do topo estão atribuídos com a candidata anterior à posição salva.
+    def checkpoint_state(self) -> Dict[str, object]:
+        return {
+            'mode': 'ac3',
+            'rows': [''.join(line) for line in self.grid],
+            'slot_order': self.slot_strategy.name,
+            'value_order': self.value_strategy.name,
+            'backjumping': self.backjumping,
+            'nodes_expanded': self.nodes_expanded,
+            'backtracks': self.backtracks,
+            'path': [[frame.slot_id, frame.position, frame.conflict] for frame in self.stack],
+            'best': {str(slot_id): word for slot_id, word in (self.anytime.best or {}).items()} if self.anytime is not None else {},
+        }
+
+    # Reconstrói a pilha a partir de um checkpoint, repetindo as atribuições (a propagação é determinística)
+    def restore(self, state: Dict[str, object]) -> None:
+        if (state['rows'] != [''.join(line) for line in self.grid] or state['slot_order'] != self.slot_strategy.name
+                or state['value_order'] != self.value_strategy.name or state['backjumping'] != self.backjumping):
+            raise ValueError("O checkpoint foi gravado para outro grid ou outra configuração do resolvedor.")
+        path: List[List[int]] = state['path']
+        for level, (slot_id, position, conflict) in enumerate(path):
+            self.levels[slot_id] = len(self.stack)
+            frame: Frame = self.open_frame(slot_id)
+            frame.position, frame.conflict = position, conflict
+            self.stack.append(frame)
+            if level < len(path) - 1:
+                word: str = frame.candidates[position - 1]
+                if not self.assign(slot_id, self.word_bit(slot_id, word), word):
+                    raise ValueError("O checkpoint não corresponde a este dicionário.")
+        self.nodes_expanded = state['nodes_expanded']
+        self.backtracks = state['backtracks']
+        best: Dict[int, str] = {int(slot_id): word for slot_id, word in state['best'].items()}
+        self.anytime.offer(len(best), lambda: best)
+        logger.info(f"Busca retomada do checkpoint: {len(path)} níveis de decisão, {self.nodes_expanded} nós já expandidos.")
+
+    # Escreve o melhor parcial no grid (as palavras atribuídas são todas válidas e compatíveis entre si)
+    def write_partial(self, assignment: Dict[int, str]) -> None:
+        for slot_id, word in assignment.items():
+            slot = self.slot_graph.slots[slot_id]
+            place_word(self.grid, word, slot.row, slot.col, slot.direction, self.slot_graph)
+        print_grid(self.grid, force=True)
+
+    # Escreve as palavras atribuídas no grid
+    def write_solution(self) -> None:
+        for slot_id, word in self.assignment.items():
+            slot = self.slot_graph.slots[slot_id]
+            place_word(self.grid, word, slot.row, slot.col, slot.direction, self.slot_graph)
+        print_grid(self.grid, force=True)
+
+# Par de slots para a quebra de simetria: se o grid (blocos e letras) é igual ao seu transposto, transpor uma
+# solução dá outra solução com as mesmas palavras. O primeiro slot horizontal e seu transposto (vertical) formam
+# o par; como não há palavras repetidas, exigir palavra(H) < palavra(V) mantém exatamente uma de cada par.
+def transposition_pair(grid: List[List[str]], slot_graph: SlotGraph) -> Optional[Tuple[int, int]]:
+    size: int = slot_graph.height
+    if size != slot_graph.width or any(grid[row][col] != grid[col][row] for row in range(size) for col in range(row)):
+        return None
+    for slot in slot_graph.slots:
+        if slot.direction == 'H':
+            return slot.id, slot_graph.slot_at[(slot.col, slot.row, 'V')]
+    return None
+
+# Modo de resolução com forward checking e AC-3
+def solve_ac3(grid: List[List[str]], words_index: PatternIndex, slot_graph: Optional[SlotGraph] = None,
+              slot_strategy: Optional[SlotStrategy] = None, value_strategy: Optional[ValueStrategy] = None,
+              backjumping: bool = True, metrics: Optional[SolveMetrics] = None, anytime: Optional[AnytimeControl] = None) -> bool:
+    return CSPSolver(grid, words_index, slot_graph, slot_strategy, value_strategy, backjumping, metrics, anytime).solve()
+
+# Enumera até `limit` soluções distintas do grid (modo ac3), sem alterar o grid
+def enumerate_solutions(grid: List[List[str]], words_index: PatternIndex, limit: Optional[int] = None, slot_graph: Optional[SlotGraph] = None,
+                        slot_strategy: Optional[SlotStrategy] = None, value_strategy: Optional[ValueStrategy] = None,
+                        backjumping: bool = True, symmetry: bool = True, metrics: Optional[SolveMetrics] = None,
+                        anytime: Optional[AnytimeControl] = None) -> Iterator[Tuple[str, ...]]:
+    solver = CSPSolver(grid, words_index, slot_graph, slot_strategy, value_strategy, backjumping, metrics, anytime)
+    return solver.solutions(limit, symmetry)
@@ -0,0 +1,307 @@
+import contextlib
+import multiprocessing
+import multiprocessing.pool
+from typing import List, Tuple, Dict, Optional, Any, Set, Iterator
+from pattern_index import PatternIndex
+from slots import SlotGraph
+from csp_solver import CSPSolver
+from heuristics import SLOT_STRATEGIES, VALUE_STRATEGIES
+from grid import place_word, print_grid
+from logger_config import setup_logger
+from metrics import SolveMetrics
+from anytime import AnytimeControl
+
+logger = setup_logger()
+
+# Índice de palavras herdado pelos processos filhos (com 'fork' não é copiado nem serializado)
+_shared: Dict[str, Any] = {}
+
+MAX_CUT_CROSSINGS = 64  # Combinações distintas de letras nos cruzamentos do corte tentadas antes de resolver o componente inteiro
+
+# Região a resolver: linhas do grid restrito à região e posições (linha, coluna, direção) dos seus slots
+Task = Tuple[List[str], List[Tuple[int, int, str]], Dict[str, Any], List[str]]
+
+# Grid restrito a uma região: as células que não pertencem aos seus slots viram bloqueios e as palavras de `fixed`
+# (slots de fora que a cruzam) só deixam as letras dos cruzamentos. Os slots da região não mudam, pois nenhum deles
+# se estende por células de fora dela; letras vizinhas de um corte podem formar trechos que não são slots da
+# região, por isso quem resolve usa as posições da tarefa (SlotGraph com `only`).
+def component_rows(grid: List[List[str]], slot_graph: SlotGraph, component: List[int], fixed: Optional[Dict[int, str]] = None) -> List[str]:
+    letters: Dict[Tuple[int, int], str] = {(row, col): grid[row][col] for slot_id in component for row, col in slot_graph.slots[slot_id].cells}
+    for slot_id, word in (fixed or {}).items():
+        for cell, letter in zip(slot_graph.slots[slot_id].cells, word):
+            if cell in letters:
+                letters[cell] = letter
+    return [''.join(letters.get((row, col), '.') for col in range(slot_graph.width)) for row in range(slot_graph.height)]
+
+# Posições dos slots de uma região, para reconstruí-los no grid restrito
+def component_keys(slot_graph: SlotGraph, component: List[int]) -> List[Tuple[int, int, str]]:
+    return [(slot_graph.slots[slot_id].row, slot_graph.slots[slot_id].col, slot_graph.slots[slot_id].direction) for slot_id in component]
+
+# Palavras de cada slot do componente, lidas das linhas preenchidas
+def component_words(slot_graph: SlotGraph, component: List[int], rows: Tuple[str, ...]) -> Dict[int, str]:
+    return {slot_id: ''.join(rows[row][col] for row, col in slot_graph.slots[slot_id].cells) for slot_id in component}
+
+# Partes em que o componente se divide sem o slot de corte, da maior para a menor
+def split_at(slot_graph: SlotGraph, component: List[int], cut: int) -> List[List[int]]:
+    remaining: Set[int] = set(component) - {cut}
+    parts: List[List[int]] = []
+    for start in sorted(remaining):
+        if start not in remaining:
+            continue
+        remaining.discard(start)
+        part: List[int] = [start]
+        stack: List[int] = [start]
+        while stack:
+            for _, other, _ in slot_graph.neighbors[stack.pop()]:
+                if other in remaining:
+                    remaining.discard(other)
+                    part.append(other)
+                    stack.append(other)
+        parts.append(sorted(part))
+    parts.sort(key=len, reverse=True)
+    return parts
+
+# Slot de corte do componente: o de articulação que deixa a maior parte menor. Só vale a pena se sobrarem ao menos
+# duas partes com mais de um slot (um slot pendurado sozinho a propagação do AC-3 já resolve).
+def choose_cut(slot_graph: SlotGraph, component: List[int], cuts: Set[int]) -> Optional[Tuple[int, List[List[int]]]]:
+    best: Optional[Tuple[int, List[List[int]]]] = None
+    for cut in sorted(cuts.intersection(component)):
+        parts = split_at(slot_graph, component, cut)
+        if len(parts[1]) > 1 and (best is None or len(parts[0]) < len(best[1][0])):
+            best = (cut, parts)
+    return best
+
+# Resolve uma região isolada (modo ac3) sem as palavras excluídas, com o orçamento `anytime` da região.
+# Devolve {'rows': linhas preenchidas ou None, 'exhausted': orçamento esgotado, 'cancelled': cancelado,
+# 'partial': palavras do melhor parcial como (linha, coluna, direção, palavra), 'metrics': métricas da busca}
+def solve_component(task: Task, anytime: Optional[AnytimeControl] = None) -> Dict[str, Any]:
+    rows, keys, options, excluded = task
+    metrics = SolveMetrics(timing=False)  # Devolvidas ao processo principal, que as soma às da resolução
+    grid: List[List[str]] = [list(row) for row in rows]
+    solver = CSPSolver(grid, _shared['words_index'], SlotGraph(grid, set(keys)),
+                       SLOT_STRATEGIES[options['slot_order']](options['seed']), VALUE_STRATEGIES[options['value_order']](options['seed']),
+                       options['backjumping'], metrics, anytime, excluded=set(excluded))
+    solution: Optional[Tuple[str, ...]] = next(solver.solutions(1, symmetry=False), None)
+    slots = solver.slot_graph.slots
+    return {
+        'rows': solution,
+        'exhausted': anytime is not None and anytime.exhausted,
+        'cancelled': anytime is not None and anytime.cancelled,
+        'partial': [(slots[slot_id].row, slots[slot_id].col, slots[slot_id].direction, word)
+                    for slot_id, word in (anytime.best or {}).items()] if anytime is not None and anytime.exhausted else [],
+        'metrics': metrics,
+    }
+
+# Orçamento de uma região: o prazo e os nós que restam do orçamento da resolução
+def region_budget(anytime: Optional[AnytimeControl], metrics: SolveMetrics) -> Optional[AnytimeControl]:
+    return anytime.child(metrics.nodes_expanded) if anytime is not None else None
+
+# Resolve as regiões; em paralelo quando há pool e mais de uma região (cada uma recebe o orçamento de nós que
+# restava no início). Um pedido de cancelamento (função do chamador, que não vai num pickle) mantém a resolução
+# em série. Em série, para na primeira região sem solução ou sem orçamento: as seguintes não importam.
+def solve_all(tasks: List[Task], pool: Optional[multiprocessing.pool.Pool], metrics: SolveMetrics,
+              anytime: Optional[AnytimeControl]) -> List[Dict[str, Any]]:
+    if pool is not None and len(tasks) > 1 and (anytime is None or anytime.stop is None):
+        budget: Optional[AnytimeControl] = region_budget(anytime, metrics)
+        results: List[Dict[str, Any]] = pool.starmap(solve_component, [(task, budget) for task in tasks])
+        for result in results:
+            metrics.merge(result['metrics'])
+        return results
+    results = []
+    for task in tasks:
+        result = solve_component(task, region_budget(anytime, metrics))
+        metrics.merge(result['metrics'])
+        results.append(result)
+        if result['exhausted'] or result['rows'] is None:
+            break
+    return results
+
+# Pool de processos ('fork') para as regiões independentes, ou None quando a resolução é em série
+@contextlib.contextmanager
+def region_pool(workers: int) -> Iterator[Optional[multiprocessing.pool.Pool]]:
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context('fork').Pool(processes=workers) as pool:
+            yield pool
+    else:
+        yield None
+
+# Resolve as regiões que ainda não estão no cache ({(linhas do grid restrito, palavras excluídas): resultado}) e
+# devolve os resultados na ordem das tarefas. As linhas já trazem as letras dos cruzamentos com slots de fora, então
+# palavras de corte com as mesmas letras nos cruzamentos reaproveitam o resultado. Resultados com orçamento esgotado
+# não entram no cache. Se a resolução em série parar numa falha, a lista termina nela.
+def solve_cached(tasks: List[Task], cache: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Dict[str, Any]],
+                 pool: Optional[multiprocessing.pool.Pool], metrics: SolveMetrics, anytime: Optional[AnytimeControl]) -> List[Dict[str, Any]]:
+    keys = [(tuple(rows), tuple(excluded)) for rows, _, _, excluded in tasks]
+    missing: List[Task] = [task for task, key in zip(tasks, keys) if key not in cache]
+    fresh: Iterator[Dict[str, Any]] = iter(solve_all(missing, pool, metrics, anytime))
+    results: List[Dict[str, Any]] = []
+    for key in keys:
+        result: Optional[Dict[str, Any]] = cache.get(key)
+        if result is None:
+            result = next(fresh, None)
+            if result is None:
+                break
+            if not result['exhausted']:
+                cache[key] = result
+        results.append(result)
+    return results
+
+# Junta regiões resolvidas de forma independente sob a regra de não repetir palavras: as maiores entram primeiro e
+# uma região que repete palavras já usadas é resolvida de novo sem elas. `fixed` são os slots de corte já atribuídos
+# (cada região recebe só as letras dos cruzamentos com eles) e `excluded`, as palavras usadas fora das regiões.
+# Devolve (situação, atribuição, resultado que interrompeu a junção), com situação 'solved', 'unsolvable' (alguma
+# região não tem solução: prova de que não há solução com `fixed`), 'clash' (só repetindo palavras) ou 'exhausted'.
+def join_regions(grid: List[List[str]], slot_graph: SlotGraph, regions: List[List[int]], fixed: Dict[int, str], excluded: Set[str],
+                 options: Dict[str, Any], pool: Optional[multiprocessing.pool.Pool], metrics: SolveMetrics,
+                 anytime: Optional[AnytimeControl], cache: Optional[Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Dict[str, Any]]] = None
+                 ) -> Tuple[str, Dict[int, str], Optional[Dict[str, Any]]]:
+    cache = cache if cache is not None else {}
+    regions = sorted(regions, key=len, reverse=True)
+    tasks: List[Task] = [(component_rows(grid, slot_graph, region, fixed), component_keys(slot_graph, region), options, sorted(excluded))
+                         for region in regions]
+    for rows, _, _, region_excluded in tasks:
+        known: Optional[Dict[str, Any]] = cache.get((tuple(rows), tuple(region_excluded)))
+        if known is not None and known['rows'] is None:  # Já se sabe que a região falha com essas letras: nada a resolver
+            return 'unsolvable', dict(fixed), None
+    results = solve_cached(tasks, cache, pool, metrics, anytime)
+    used: Set[str] = excluded | set(fixed.values())
+    assignment: Dict[int, str] = dict(fixed)
+    for index, result in enumerate(results):
+        if result['exhausted']:
+            return 'exhausted', assignment, result
+        if result['rows'] is None:
+            logger.info(f"A região {index} ({len(regions[index])} slots) não tem solução.")
+            return 'unsolvable', assignment, None
+        words = component_words(slot_graph, regions[index], result['rows'])
+        if used.intersection(words.values()):
+            result = solve_cached([(tasks[index][0], tasks[index][1], options, sorted(used))], cache, None, metrics, anytime)[0]
+            if result['exhausted']:
+                return 'exhausted', assignment, result
+            if result['rows'] is None:
+                return 'clash', assignment, None
+            words = component_words(slot_graph, regions[index], result['rows'])
+        used.update(words.values())
+        assignment.update(words)
+    return 'solved', assignment, None
+
+# Resolve um componente pelo slot de corte: cada palavra do domínio do corte (já reduzido pelo AC-3 no componente
+# inteiro) fixa as letras dos cruzamentos, e as partes que sobram viram subproblemas independentes. Uma parte sem
+# solução descarta a palavra do corte sem retrocesso nas outras partes. Cada parte só vê as letras dos cruzamentos,
+# então o resultado de uma parte vale para todas as palavras do corte com as mesmas letras ali (cache da junção).
+# Depois de MAX_CUT_CROSSINGS combinações sem sucesso, o componente é resolvido inteiro, como uma região só.
+def solve_cut(grid: List[List[str]], words_index: PatternIndex, slot_graph: SlotGraph, component: List[int], cut: int,
+              parts: List[List[int]], excluded: Set[str], options: Dict[str, Any], pool: Optional[multiprocessing.pool.Pool],
+              metrics: SolveMetrics, anytime: Optional[AnytimeControl]) -> Tuple[str, Dict[int, str], Optional[Dict[str, Any]]]:
+    rows = component_rows(grid, slot_graph, component)
+    solver = CSPSolver([list(row) for row in rows], words_index, None, metrics=metrics, excluded=excluded)
+    if not solver.prepare():
+        return 'unsolvable', {}, None
+    cut_slot = slot_graph.slots[cut]
+    local_cut: int = solver.slot_graph.slot_at[(cut_slot.row, cut_slot.col, cut_slot.direction)]
+    words: List[str] = words_index.words_from_mask(cut_slot.length, solver.store.domains[local_cut])
+    indices: List[int] = sorted(index for index, _, _ in slot_graph.neighbors[cut])
+    cache: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Dict[str, Any]] = {}
+    tried: Set[Tuple[str, ...]] = set()  # Combinações de letras nos cruzamentos já tentadas
+    status: str = 'unsolvable'
+    for word in words:
+        crossing: Tuple[str, ...] = tuple(word[index] for index in indices)
+        if crossing not in tried and len(tried) >= MAX_CUT_CROSSINGS:
+            logger.info(f"Corte no slot {cut}: {len(tried)} combinações de letras nos cruzamentos sem solução; resolvendo o componente inteiro.")
+            return join_regions(grid, slot_graph, [component], {}, excluded, options, pool, metrics, anytime)
+        tried.add(crossing)
+        if anytime is not None and anytime.expired(metrics.nodes_expanded):  # Partes que falham sem expandir nós não consultam o relógio
+            return 'exhausted', {}, {'partial': [], 'cancelled': anytime.cancelled}
+        outcome, assignment, interrupted = join_regions(grid, slot_graph, parts, {cut: word}, excluded, options, pool, metrics, anytime, cache)
+        if outcome in ('solved', 'exhausted'):
+            return outcome, assignment, interrupted
+        if outcome == 'clash':
+            status = 'clash'  # Sem a prova de que a palavra do corte não serve: a decomposição não é conclusiva
+    return status, {}, None
+
+# Orçamento esgotado numa região: o melhor parcial são as palavras já juntadas mais o melhor parcial da região
+# interrompida (sem as palavras que já aparecem nas outras)
+def stop_decomposed(grid: List[List[str]], slot_graph: SlotGraph, assignment: Dict[int, str], result: Dict[str, Any],
+                    anytime: AnytimeControl, metrics: SolveMetrics) -> bool:
+    used: Set[str] = set(assignment.values())
+    for row, col, direction, word in result['partial']:
+        if word not in used:
+            assignment[slot_graph.slot_at[(row, col, direction)]] = word
+    anytime.exhausted = True
+    anytime.cancelled = anytime.cancelled or result['cancelled']
+    anytime.offer(len(assignment), lambda: dict(assignment))
+    logger.info(f"Orçamento esgotado após {metrics.nodes_expanded} nós: melhor parcial com {anytime.best_filled}/{len(slot_graph.slots)} slots.")
+    write_assignment(grid, slot_graph, assignment)
+    return False
+
+# Escreve no grid as palavras já atribuídas e mostra o resultado
+def write_assignment(grid: List[List[str]], slot_graph: SlotGraph, assignment: Dict[int, str]) -> None:
+    for slot_id, word in assignment.items():
+        slot = slot_graph.slots[slot_id]
+        place_word(grid, word, slot.row, slot.col, slot.direction, slot_graph)
+    print_grid(grid, force=True)
+
+# Resolve o grid por decomposição. Cada componente conexo do grafo de slots é um subproblema independente, e um
+# componente com slot de articulação é dividido nele: atribuído o corte, as partes também são independentes. Assim
+# uma falha em uma região não provoca retrocesso nas outras. Na junção vale a regra global de não repetir palavras:
+# os componentes sem corte são resolvidos juntos (em paralelo, com `workers`) e os com corte entram em seguida, sem
+# as palavras já usadas. Se a junção não for conclusiva, o grid inteiro é resolvido de uma vez (a decomposição
+# nunca perde soluções).
+def solve_decomposed(grid: List[List[str]], words_index: PatternIndex, slot_graph: Optional[SlotGraph] = None,
+                     slot_order: str = 'default', value_order: str = 'default', backjumping: bool = True,
+                     seed: Optional[int] = None, workers: int = 1, metrics: Optional[SolveMetrics] = None,
+                     anytime: Optional[AnytimeControl] = None) -> bool:
+    slot_graph = slot_graph if slot_graph is not None else SlotGraph(grid)
+    metrics = metrics if metrics is not None else SolveMetrics(timing=False)
+    components: List[List[int]] = slot_graph.components()
+    cuts: Set[int] = slot_graph.articulation_slots()
+    split: List[Tuple[List[int], Tuple[int, List[List[int]]]]] = []
+    plain: List[List[int]] = []
+    for component in sorted(components, key=len, reverse=True):
+        cut = choose_cut(slot_graph, component, cuts)
+        if cut is None:
+            plain.append(component)
+        else:
+            split.append((component, cut))
+    logger.info(f"Decomposição: {len(components)} componentes independentes {[len(component) for component in components]}, "
+                f"{len(cuts)} slots de articulação, cortes em {[(cut, [len(part) for part in parts]) for _, (cut, parts) in split]}.")
+    _shared['words_index'] = words_index
+    if anytime is not None:
+        anytime.start(len(slot_graph.slots))  # Um único prazo para todas as regiões
+    options: Dict[str, Any] = {'slot_order': slot_order, 'value_order': value_order, 'backjumping': backjumping, 'seed': seed}
+
+    assignment: Dict[int, str] = {}
+    with region_pool(workers if len(plain) > 1 or split else 1) as pool:  # Um componente só, sem corte: nada a paralelizar
+        status: str = 'solved'
+        interrupted: Optional[Dict[str, Any]] = None
+        if plain:
+            status, words, interrupted = join_regions(grid, slot_graph, plain, {}, set(), options, pool, metrics, anytime)
+            assignment.update(words)
+        for component, (cut, parts) in split:
+            if status != 'solved':
+                break
+            excluded: Set[str] = set(assignment.values())
+            status, words, interrupted = solve_cut(grid, words_index, slot_graph, component, cut, parts, excluded, options, pool, metrics, anytime)
+            assignment.update(words)
+            if status == 'unsolvable' and excluded:
+                status = 'clash'  # Sem solução só porque as palavras dos outros componentes foram excluídas
+    if status == 'exhausted':
+        return stop_decomposed(grid, slot_graph, assignment, interrupted, anytime, metrics)
+    if status == 'unsolvable':
+        return False
+    if status == 'clash':
+        logger.info("Os componentes só têm solução repetindo palavras: resolvendo o grid inteiro.")
+        return solve_whole(grid, words_index, slot_graph, slot_order, value_order, backjumping, seed, metrics, anytime)
+    write_assignment(grid, slot_graph, assignment)
+    return True
+
+# Último recurso: o grid inteiro de uma vez, com o orçamento que resta
+def solve_whole(grid: List[List[str]], words_index: PatternIndex, slot_graph: SlotGraph, slot_order: str, value_order: str,
+                backjumping: bool, seed: Optional[int], metrics: SolveMetrics, anytime: Optional[AnytimeControl]) -> bool:
+    child: Optional[AnytimeControl] = anytime.child(metrics.nodes_expanded) if anytime is not None else None
+    solved: bool = CSPSolver(grid, words_index, slot_graph, SLOT_STRATEGIES[slot_order](seed),
+                             VALUE_STRATEGIES[value_order](seed), backjumping, metrics, child).solve()
+    if child is not None and child.exhausted:
+        anytime.exhausted = True
+        anytime.cancelled = anytime.cancelled or child.cancelled
+        anytime.offer(child.best_filled, lambda: child.best)
+    return solved
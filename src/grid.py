@@ -1,7 +1,11 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from logger_config import setup_logger
 from utils import priority_removal_criteria, find_intersections
-from trie import Trie
+from pattern_index import PatternIndex
+from slots import SlotGraph
+from placements import PlacedWords, cell_has_owner
+from compact_grid import Grid
+from tracing import tracer
 
 logger = setup_logger()
 
@@ -14,10 +18,13 @@ def load_grid(file_path: str) -> List[List[str]]:
 
 # Defina uma variável global para armazenar o último grid impresso
 last_printed_grid = ""
-def print_grid(grid: List[List[str]]) -> None:
+# Só imprime no rastreamento passo a passo (nível full) ou quando forçado (grid final)
+def print_grid(grid: List[List[str]], force: bool = False) -> None:
     global last_printed_grid
-    # Constrói o grid como uma string para comparação
-    current_grid = '\n'.join(''.join(line) for line in grid)
+    if not (force or tracer.steps):
+        return
+    # Constrói o grid como uma string para comparação (o grid compacto decodifica o buffer de uma vez)
+    current_grid = grid.to_text() if isinstance(grid, Grid) else '\n'.join(''.join(line) for line in grid)
     
     # Só imprime o grid se ele for diferente do último grid impresso
     if current_grid != last_printed_grid:
@@ -27,29 +34,18 @@ def print_grid(grid: List[List[str]]) -> None:
 
 # Função para verificar se o grid foi completamente preenchido
 def is_grid_complete(grid: List[List[str]]) -> bool:
+    if isinstance(grid, Grid):
+        return grid.is_complete()
     for row in grid:
         if '?' in row:
             return False
     return True
 
-# Verifica se todas as palavras no grid estão na lista de palavras/Trie
-def validate_all_words_in_grid(grid: List[List[str]], words_trie: Trie) -> bool:
-    # Captura todas as palavras horizontais e verticais do grid
-    all_words = get_all_words_from_grid(grid)
-    invalid_words = []  # Lista para armazenar palavras inválidas
-    
-    # Verifica cada palavra, se não estiver na Trie, adiciona à lista de inválidas
-    for word, row, col, direction in all_words:
-        if not words_trie.search_with_pattern(word):
-            invalid_words.append((word, row, col, direction))  # Adiciona a palavra inválida com sua posição e direção
-    
-    # Se houver palavras inválidas, as imprime
-    if invalid_words:
-        for word, row, col, direction in invalid_words:
-            logger.info(f"Palavra inválida encontrada: {word} na direção {direction} na posição ({row}, {col})")
-        return False  # Retorna False se houver palavras inválidas
-    
-    return True  # Todas as palavras são válidas
+# Todas as palavras do grid que não estão no dicionário, em uma única varredura
+# (pertinência exata pelos conjuntos de palavras por tamanho, sem consulta por padrão)
+def find_invalid_words(grid: List[List[str]], words_index: PatternIndex) -> List[Tuple[str, int, int, str]]:
+    return [(word, row, col, direction) for word, row, col, direction in get_all_words_from_grid(grid)
+            if word not in words_index.word_set(len(word))]
 
 # Função para capturar todas as palavras horizontais e verticais no grid
 def get_all_words_from_grid(grid: List[List[str]]) -> List[Tuple[str, int, int, str]]:
@@ -89,6 +85,14 @@ def get_all_words_from_grid(grid: List[List[str]]) -> List[Tuple[str, int, int,
 def find_intersecting_words(grid: List[List[str]], row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]]) -> List[Tuple[str, int, int, str]]:
     intersecting_words: List[Tuple[str, int, int, str]] = [] # [(palavra, linha, coluna, direção)]
 
+    if isinstance(used_words, PlacedWords):  # Consulta o índice de posse das células em vez de varrer used_words
+        other_direction: str = 'V' if direction == 'H' else 'H'
+        cells = ((row, i) for i in range(len(grid[0]))) if direction == 'H' else ((i, col) for i in range(len(grid)))
+        for cell_row, cell_col in cells:
+            if grid[cell_row][cell_col] != '.' and grid[cell_row][cell_col] != '?':
+                intersecting_words.extend(owner for owner in used_words.owners(cell_row, cell_col) if owner[3] == other_direction)
+        return intersecting_words
+
     if direction == 'H':  # Verifica interceptação horizontal
         for i in range(len(grid[0])): # Percorre todas as colunas na linha especificada para verificar a possível interseção com uma palavra vertical
             if grid[row][i] != '.' and grid[row][i] != '?': # Verifica se há uma letra, logo está sendo interceptada por uma palavra
@@ -106,9 +110,11 @@ def find_intersecting_words(grid: List[List[str]], row: int, col: int, direction
     return intersecting_words  # Retorna as palavras que interceptam
 
 # Coloca uma palavra em um espaço no grid
-def place_word(grid: List[List[str]], word: str, row: int, col: int, direction: str) -> None:
+def place_word(grid: List[List[str]], word: str, row: int, col: int, direction: str, slot_graph: Optional[SlotGraph] = None) -> None:
     # Verifica se a palavra pode ser colocada e faz a impressão apenas uma vez
-    logger.info(f"\nColocando palavra '{word}' na posição ({row}, {col}) na direção {direction}.")
+    if tracer.steps:
+        logger.info(f"\nColocando palavra '{word}' na posição ({row}, {col}) na direção {direction}.")
+        tracer.event('place', w=word, r=row, c=col, d=direction)
     
     if direction == 'H':  # Direção horizontal
         for i in range(len(word)):
@@ -116,56 +122,64 @@ def place_word(grid: List[List[str]], word: str, row: int, col: int, direction:
     elif direction == 'V':  # Direção vertical
         for i in range(len(word)):
             grid[row + i][col] = word[i]  # Preenche o grid com cada letra da palavra
+    if slot_graph is not None:
+        slot_graph.sync_word(grid, row, col, direction, len(word))  # Atualiza o estado dos slots em O(tamanho da palavra)
 
     print_grid(grid)  # Apenas uma impressão do grid após colocar a palavra
 
 # Remove uma palavra em um espaço no grid
-def remove_word(grid: List[List[str]], word: str, row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]]) -> None:
-    logger.info(f"\nRemovendo palavra '{word}' da posição ({row}, {col}) na direção {direction}.")
+def remove_word(grid: List[List[str]], word: str, row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]], slot_graph: Optional[SlotGraph] = None) -> None:
+    if tracer.steps:
+        logger.info(f"\nRemovendo palavra '{word}' da posição ({row}, {col}) na direção {direction}.")
     length: int = len(word)
     if direction == 'H':
         for i in range(length):
             if col + i < len(grid[0]) and grid[row][col + i] == word[i]:
                 # Verifica se uma das letras da palavra removida pertence a outra palavra também.
-                # (c == col + i): Verifica se a palavra vertical está na mesma coluna da letra atual da palavra a ser removida.
-                # (r <= row < r + len(w)): Verifica se a palavra vertical se estende de forma que inclua a linha atual.
-                if not any(w for w, r, c, d in used_words if d == 'V' and c == col + i and r <= row < r + len(w)):
+                # Com PlacedWords a consulta é O(1) pelo índice de posse; com uma lista comum, varredura linear de referência.
+                if not cell_has_owner(used_words, row, col + i, 'V'):
                     grid[row][col + i] = '?'  # Substitui a letra por '?'
     elif direction == 'V':
         for i in range(length):
             if row + i < len(grid) and grid[row + i][col] == word[i]:
                 # Verifica se uma das letras da palavra removida pertence a outra palavra também.
-                # (r == row + i): Verifica se a palavra horizontal está na mesma linha da letra atual da palavra a ser removida.
-                # (c <= col < c + len(w)): Verifica se a palavra horizontal se estende de forma que inclua a linha atual.
-                if not any(w for w, r, c, d in used_words if d == 'H' and r == row + i and c <= col < c + len(w)): # Verifica se uma das letras da palavra removida pertence a outra palavra também
+                # Com PlacedWords a consulta é O(1) pelo índice de posse; com uma lista comum, varredura linear de referência.
+                if not cell_has_owner(used_words, row + i, col, 'H'): # Verifica se uma das letras da palavra removida pertence a outra palavra também
                     grid[row + i][col] = '?'  # Substitui a letra por '?'
+    if slot_graph is not None:
+        slot_graph.sync_word(grid, row, col, direction, length)
+    if tracer.steps:  # Registra as letras que ficaram (pertencem a palavras cruzadas) para a reprodução
+        left = ''.join(grid[row][col + i] if direction == 'H' else grid[row + i][col] for i in range(length))
+        tracer.event('remove', w=word, r=row, c=col, d=direction, left=left)
     # Imprime o grid após a palavra ser removida
     print_grid(grid)  # A impressão acontece após a remoção
 
 # Função para remover palavras que cruzam uma palavra inválida
-def remove_intersecting_words_for_invalid(grid: List[List[str]], word: str, row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]], words_trie: Trie) -> None:
+def remove_intersecting_words_for_invalid(grid: List[List[str]], word: str, row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]], words_index: PatternIndex, slot_graph: Optional[SlotGraph] = None) -> None:
     intersecting_words = find_intersecting_words(grid, row, col, direction, used_words)
     
     # Remover todas as palavras que interceptam a palavra inválida
     for intersect_word, wr, wc, wd in intersecting_words:
-        logger.info(f"Removendo palavra interceptada: {intersect_word} na posição ({wr}, {wc}) na direção {wd}.")
-        remove_word_if_exists(grid, intersect_word, wr, wc, wd, used_words)
+        if tracer.steps:
+            logger.info(f"Removendo palavra interceptada: {intersect_word} na posição ({wr}, {wc}) na direção {wd}.")
+        remove_word_if_exists(grid, intersect_word, wr, wc, wd, used_words, slot_graph)
 
 # Remove uma palavra do grid e da lista de palavras usadas, se estiver presente
-def remove_word_if_exists(grid: List[List[str]], word: str, row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]]) -> None:
+def remove_word_if_exists(grid: List[List[str]], word: str, row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]], slot_graph: Optional[SlotGraph] = None) -> None:
     if (word, row, col, direction) in used_words:
-        remove_word(grid, word, row, col, direction, used_words)
+        remove_word(grid, word, row, col, direction, used_words, slot_graph)
         used_words.remove((word, row, col, direction))
-    else:
+    elif tracer.steps:
         logger.info(f"Tentativa de remover palavra '{word}' falhou: não encontrada em used_words.")
 
 MAX_REMOVALS = 5  # Limite de tentativas de remoção por palavra, para evitar loops
 # Remove palavras que estão bloqueando o preenchimento correto do grid de palavras cruzadas
-def remove_blocking_words(grid: List[List[str]], row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]], removed_words: List[str], removal_attempts: Dict[str, int]) -> bool:
+def remove_blocking_words(grid: List[List[str]], row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]], removal_attempts: Dict[str, int], slot_graph: Optional[SlotGraph] = None) -> bool:
     intersecting_words: List[Tuple[str, int, int, str]] = find_intersecting_words(grid, row, col, direction, used_words)
 
     if intersecting_words:  # Se encontrar palavras que interceptam
-        logger.info(f"Verificando palavras que interceptam o espaço ({row}, {col}) na direção {direction}.")
+        if tracer.steps:
+            logger.info(f"Verificando palavras que interceptam o espaço ({row}, {col}) na direção {direction}.")
 
         # Ordena as palavras pela prioridade de remoção
         # Palavras com mais letras comuns são menos prioritárias para a remoção
@@ -178,14 +192,15 @@ def remove_blocking_words(grid: List[List[str]], row: int, col: int, direction:
             if removal_attempts.get(word_to_remove[0], 0) >= MAX_REMOVALS:
                 continue
 
-            logger.info(f"Removendo palavra menos prioritária '{word_to_remove[0]}' que está na posição ({word_to_remove[1]}, {word_to_remove[2]}) na direção {word_to_remove[3]}.")
+            if tracer.steps:
+                logger.info(f"Removendo palavra menos prioritária '{word_to_remove[0]}' que está na posição ({word_to_remove[1]}, {word_to_remove[2]}) na direção {word_to_remove[3]}.")
 
             # Remove a palavra do grid
-            remove_word(grid, word_to_remove[0], word_to_remove[1], word_to_remove[2], word_to_remove[3], used_words)
+            remove_word(grid, word_to_remove[0], word_to_remove[1], word_to_remove[2], word_to_remove[3], used_words, slot_graph)
             used_words.remove(word_to_remove)  # Remove da lista de palavras usadas
-            removed_words.append(word_to_remove[0])  # Adiciona à lista de removidas
             removal_attempts[word_to_remove[0]] = removal_attempts.get(word_to_remove[0], 0) + 1  # Incrementa a contagem de tentativas de remoção
-            logger.info(f"Palavra '{word_to_remove[0]}' removida {removal_attempts[word_to_remove[0]]} vezes.")
+            if tracer.steps:
+                logger.info(f"Palavra '{word_to_remove[0]}' removida {removal_attempts[word_to_remove[0]]} vezes.")
 
             print_grid(grid)  # Imprime o grid após a remoção
             return True
@@ -263,6 +278,10 @@ def find_max_word_length_and_existing_letters(grid: List[List[str]], row: int, c
     max_length: int = 0
     existing_letters: Dict[int, str] = {}
 
+    if isinstance(grid, Grid) and (row, col, direction) in grid.slot_indices:  # Lê o padrão pelos índices pré-calculados
+        pattern: str = grid.pattern(row, col, direction)
+        return len(pattern), {i: char for i, char in enumerate(pattern) if char != '?'}
+
     if direction == 'H':  # Direção horizontal
         while col + max_length < len(grid[0]) and grid[row][col + max_length] != '.':
             if grid[row][col + max_length] != '?':  # Captura letras já presentes
@@ -0,0 +1,145 @@
+import math
+import random
+from collections import Counter
+from typing import List, Dict, Optional, Type, Iterable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from csp_solver import CSPSolver
+
+# Frequência de cada letra em cada posição, por tamanho de palavra: {tamanho: [posição] -> {letra: contagem}}
+def position_letter_frequencies(word_size_map: Dict[int, List[str]]) -> Dict[int, List[Dict[str, int]]]:
+    frequencies: Dict[int, List[Dict[str, int]]] = {}
+    for length, words in word_size_map.items():
+        frequencies[length] = [dict(Counter(word[position] for word in words)) for position in range(length)]
+    return frequencies
+
+# Base das estratégias plugáveis. Cada estratégia conta os nós (atribuições tentadas) que expandiu.
+# Com uma semente, os empates da heurística são desfeitos aleatoriamente (usado pelo portfólio).
+class Strategy:
+    name: str = ''
+
+    def __init__(self, seed: Optional[int] = None):
+        self.nodes_expanded: int = 0
+        self.random: Optional[random.Random] = random.Random(seed) if seed is not None else None
+
+    # Embaralha os itens se houver semente; a ordenação estável seguinte só reordena os empates
+    def shuffled(self, items: Iterable) -> list:
+        items = list(items)
+        if self.random is not None:
+            self.random.shuffle(items)
+        return items
+
+    # Chamado uma vez pelo resolvedor antes da busca
+    def prepare(self, solver: 'CSPSolver') -> None:
+        pass
+
+# --- Escolha do próximo slot ---
+
+class SlotStrategy(Strategy):
+    def select(self, solver: 'CSPSolver') -> Optional[int]:
+        raise NotImplementedError
+
+# Heurística atual (padrão): mais interseções, depois maior comprimento, depois mais letras fixas (ordem de find_free_spaces)
+class DefaultSlotOrder(SlotStrategy):
+    name = 'default'
+
+    def prepare(self, solver: 'CSPSolver') -> None:
+        graph = solver.slot_graph
+        self.order: List[int] = sorted(self.shuffled(range(len(graph.slots))),
+                                       key=lambda slot_id: (-graph.adjacent_letters[slot_id], -graph.slots[slot_id].length, -graph.fixed_counts[slot_id]))
+
+    def select(self, solver: 'CSPSolver') -> Optional[int]:
+        for slot_id in self.order:
+            if slot_id not in solver.assignment:
+                return slot_id
+        return None
+
+# Minimum remaining values: o slot com menos candidatos; empate pelo maior número de cruzamentos com slots livres
+class MRVSlotOrder(SlotStrategy):
+    name = 'mrv'
+
+    def prepare(self, solver: 'CSPSolver') -> None:
+        self.ranks: List[int] = [0] * len(solver.lengths)  # Desempate final (aleatório se houver semente)
+        for rank, slot_id in enumerate(self.shuffled(range(len(solver.lengths)))):
+            self.ranks[slot_id] = rank
+
+    def select(self, solver: 'CSPSolver') -> Optional[int]:
+        assignment = solver.assignment
+        domains = solver.store.domains
+        neighbors = solver.slot_graph.neighbors
+        best: Optional[int] = None
+        best_key = None
+        for slot_id in range(len(domains)):
+            if slot_id in assignment:
+                continue
+            remaining: int = domains[slot_id].bit_count()
+            if best_key is not None and remaining > best_key[0]:
+                continue
+            degree: int = sum(1 for _, other, _ in neighbors[slot_id] if other not in assignment)
+            key = (remaining, -degree, self.ranks[slot_id])
+            if best_key is None or key < best_key:
+                best, best_key = slot_id, key
+        return best
+
+# Slots de articulação primeiro (MRV entre eles), depois MRV. Com os slots de corte atribuídos, o restante do
+# componente se divide em partes independentes e o backjumping não retrocede de uma parte para a outra
+class CutSlotOrder(MRVSlotOrder):
+    name = 'cut'
+
+    def prepare(self, solver: 'CSPSolver') -> None:
+        super().prepare(solver)
+        self.cuts: List[int] = sorted(solver.slot_graph.articulation_slots())
+
+    def select(self, solver: 'CSPSolver') -> Optional[int]:
+        best: Optional[int] = None
+        best_key = None
+        for slot_id in self.cuts:
+            if slot_id in solver.assignment:
+                continue
+            key = (solver.store.domains[slot_id].bit_count(), self.ranks[slot_id])
+            if best_key is None or key < best_key:
+                best, best_key = slot_id, key
+        return best if best is not None else super().select(solver)
+
+# --- Ordenação das palavras candidatas ---
+
+class ValueStrategy(Strategy):
+    def order(self, solver: 'CSPSolver', slot_id: int, words: List[str]) -> List[str]:
+        raise NotImplementedError
+
+# Heurística atual (padrão): ordem da pontuação do índice (--scorer; priority = mais vogais primeiro, menos caracteres especiais)
+class VowelValueOrder(ValueStrategy):
+    name = 'default'
+
+    def order(self, solver: 'CSPSolver', slot_id: int, words: List[str]) -> List[str]:
+        if self.random is None:
+            return solver.words_index.prioritize(words)  # Candidatas na ordem dos bits: já ordenadas se o índice tem pontuação
+        return solver.words_index.sort_by_score(self.shuffled(words))
+
+# Least constraining value: prefere palavras cujas letras nos cruzamentos com slots livres são comuns
+# naquela posição do slot vizinho (frequências pré-calculadas a partir do word_size_map)
+class LCVValueOrder(ValueStrategy):
+    name = 'lcv'
+
+    def __init__(self, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.log_frequencies: Dict[int, List[Dict[str, float]]] = {}
+
+    def prepare(self, solver: 'CSPSolver') -> None:
+        if not self.log_frequencies:
+            histograms = getattr(solver.words_index, 'letter_histograms', None)  # Motor NumPy: contagem vetorizada
+            frequencies = histograms() if histograms is not None else position_letter_frequencies(solver.words_index.words_by_length)
+            self.log_frequencies = {
+                length: [{letter: math.log(count + 1) for letter, count in position.items()} for position in positions]
+                for length, positions in frequencies.items()
+            }
+
+    def order(self, solver: 'CSPSolver', slot_id: int, words: List[str]) -> List[str]:
+        crossings = [(index, self.log_frequencies[solver.lengths[other]][other_index])
+                     for index, other, other_index in solver.slot_graph.neighbors[slot_id] if other not in solver.assignment]
+        if not crossings:
+            return solver.words_index.sort_by_score(self.shuffled(words))
+        return sorted(self.shuffled(words), key=lambda word: sum(frequencies.get(word[index], 0.0) for index, frequencies in crossings), reverse=True)
+
+SLOT_STRATEGIES: Dict[str, Type[SlotStrategy]] = {'default': DefaultSlotOrder, 'mrv': MRVSlotOrder, 'cut': CutSlotOrder}
+VALUE_STRATEGIES: Dict[str, Type[ValueStrategy]] = {'default': VowelValueOrder, 'lcv': LCVValueOrder}
@@ -1,28 +1,125 @@
+import argparse
 import time
-from trie import load_words
-from grid import load_grid
-from solver import fill_grid_max
+from typing import Optional
+from numpy_index import ENGINES, load_dictionary_with_engine
+from compact_grid import Grid
+from pattern_index import PatternIndex
+from modes import SOLVER_MODES, solve_with_mode
+from heuristics import SLOT_STRATEGIES, VALUE_STRATEGIES
+from csp_solver import enumerate_solutions
+from pattern_cache import DEFAULT_CAPACITY
 from logger_config import setup_logger
+from tracing import TRACE_LEVELS, DEFAULT_TRACE_PATH, configure_trace
+from metrics import SolveMetrics, run_profiled, run_sampled, DEFAULT_SAMPLE_INTERVAL
+from anytime import AnytimeControl, load_checkpoint
+from utils import WORD_SCORERS
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolvedor de palavras cruzadas")
+    parser.add_argument('--grid', default='grids/grid-0.txt')
+    parser.add_argument('--words', default='src/files/lista_palavras.txt')
+    parser.add_argument('--mode', choices=SOLVER_MODES, default='legacy', help="legacy: preenchimento máximo + backtracking; ac3: forward checking com AC-3; components: ac3 por componente independente")
+    parser.add_argument('--slot-order', choices=sorted(SLOT_STRATEGIES), default='default', help="escolha do próximo slot (modo ac3)")
+    parser.add_argument('--value-order', choices=sorted(VALUE_STRATEGIES), default='default', help="ordem das palavras candidatas (modo ac3)")
+    parser.add_argument('--backjumping', action=argparse.BooleanOptionalAction, default=True, help="conflict-directed backjumping (modo ac3)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CAPACITY, help="capacidade do cache LRU de padrões (modo legacy; 0 desativa)")
+    parser.add_argument('--compiled-index', action=argparse.BooleanOptionalAction, default=True, help="usa o dicionário binário compilado (recompilado se a lista mudar)")
+    parser.add_argument('--scorer', choices=sorted(WORD_SCORERS), default=None, help="pontuação que ordena as palavras candidatas (padrão: a do índice compilado, ou priority)")
+    parser.add_argument('--engine', choices=ENGINES, default='bitset', help="numpy: filtragem vetorizada (opcional; sem NumPy usa os bitsets)")
+    parser.add_argument('--trace', choices=TRACE_LEVELS, default='progress', help="off: sem log passo a passo; progress: progresso periódico; full: passo a passo + eventos JSONL")
+    parser.add_argument('--trace-file', default=DEFAULT_TRACE_PATH, help="arquivo de eventos do nível full (reproduzível com tracing.py)")
+    parser.add_argument('--metrics', default=None, metavar='ARQUIVO', help="grava as métricas da busca em JSON")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='ARQUIVO', help="executa a resolução sob o cProfile (opcionalmente grava o .prof)")
+    parser.add_argument('--sample', nargs='?', const='', default=None, metavar='ARQUIVO', help="amostra as pilhas durante a resolução (opcionalmente grava as pilhas no formato collapsed)")
+    parser.add_argument('--sample-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL, metavar='SEGUNDOS')
+    parser.add_argument('--workers', type=int, default=1, help="processos para resolver os componentes em paralelo (modo components)")
+    parser.add_argument('--time-limit', type=float, default=None, metavar='SEGUNDOS', help="prazo; ao esgotar, devolve o melhor preenchimento parcial")
+    parser.add_argument('--node-limit', type=int, default=None, metavar='NÓS', help="orçamento de nós; ao esgotar, devolve o melhor preenchimento parcial")
+    parser.add_argument('--checkpoint', default=None, metavar='ARQUIVO', help="grava checkpoints periódicos da busca (modo ac3)")
+    parser.add_argument('--checkpoint-interval', type=float, default=30.0, metavar='SEGUNDOS')
+    parser.add_argument('--resume', action='store_true', help="retoma a busca do arquivo de --checkpoint")
+    parser.add_argument('--solutions', type=int, default=None, metavar='K', help="enumera até K soluções distintas (modo ac3), gravadas à medida que são encontradas")
+    parser.add_argument('--symmetry', action=argparse.BooleanOptionalAction, default=True, help="na enumeração, descarta soluções transpostas de grids simétricos")
+    parser.add_argument('--solutions-file', default='src/files/solucoes.txt', metavar='ARQUIVO')
+    args = parser.parse_args()
+    if args.solutions is not None and (args.mode != 'ac3' or args.checkpoint):
+        parser.error("--solutions exige --mode ac3 e não suporta --checkpoint")
+    if args.mode == 'components' and (args.checkpoint or args.resume):
+        parser.error("o modo components não suporta --checkpoint nem --resume")
+    if args.mode == 'legacy' and (args.checkpoint or args.resume):
+        parser.error("--checkpoint e --resume exigem --mode ac3 (o modo legacy só aceita --time-limit e --node-limit)")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume exige --checkpoint")
+    if args.profile is not None and args.sample is not None:
+        parser.error("use --profile ou --sample, não os dois")
+
     start_time = time.time()
 
     logger = setup_logger()  # Configura o logger
-    logger.info('Construindo a árvore Trie!')
+    tracer = configure_trace(args.trace, args.trace_file)
+    logger.info('Construindo o índice de palavras!')
 
-    words_trie, word_size_map = load_words('src/files/lista_palavras.txt')  # Carrega palavras na Trie
-    grid = load_grid('grids/grid-0.txt')  # Carrega o grid
+    words_index, word_size_map = load_dictionary_with_engine(args.words, args.engine, args.compiled_index, args.scorer)  # Carrega palavras no índice de padrões
+    grid = Grid.from_file(args.grid)  # Carrega o grid em um buffer compacto
 
-    logger.info("Preenchendo o grid ao máximo antes do backtracking...")
+    if args.mode == 'ac3':
+        logger.info("Resolvendo o grid com forward checking e AC-3...")
+    elif args.mode == 'components':
+        logger.info("Resolvendo cada componente independente do grid com forward checking e AC-3...")
+    else:
+        logger.info("Preenchendo o grid ao máximo antes do backtracking...")
+    metrics = SolveMetrics(timing=bool(args.metrics))  # Sem --metrics, o caminho quente não mede tempo
+    anytime = None
+    if args.time_limit is not None or args.node_limit is not None or args.checkpoint:
+        resume_state = load_checkpoint(args.checkpoint) if args.resume and args.checkpoint else None
+        anytime = AnytimeControl(args.time_limit, args.node_limit, args.checkpoint, args.checkpoint_interval, resume_state)
+    if args.solutions is not None:
+        enumerate_to_file(args, grid, words_index, metrics, anytime)
+        if args.metrics:
+            metrics.write_json(args.metrics)
+        logger.info(f"Enumeração concluída em {time.time() - start_time:.2f} segundos")
+        tracer.close()
+        return
+    solve_args = (grid, words_index, word_size_map, args.mode, args.slot_order, args.value_order, args.backjumping)
+    if args.profile is not None:
+        solved, profile_summary = run_profiled(solve_with_mode, *solve_args, output=args.profile or None, cache_size=args.cache_size, metrics=metrics, anytime=anytime, workers=args.workers)
+        logger.info(profile_summary)
+    elif args.sample is not None:
+        solved, sample_summary = run_sampled(solve_with_mode, *solve_args, output=args.sample or None, interval=args.sample_interval, cache_size=args.cache_size, metrics=metrics, anytime=anytime, workers=args.workers)
+        logger.info(sample_summary)
+    else:
+        solved = solve_with_mode(*solve_args, cache_size=args.cache_size, metrics=metrics, anytime=anytime, workers=args.workers)
+    if args.metrics:
+        metrics.write_json(args.metrics)
 
-    if fill_grid_max(grid, words_trie, word_size_map):  # Tenta preencher o grid ao máximo
+    if solved:
         with open('src/files/resultado.txt', 'w') as file:  # Se bem sucedido, salva o resultado
             for line in grid:
                 file.write(''.join(line) + '\n')
         logger.info(f"Grid preenchido com sucesso em {time.time() - start_time:.2f} segundos")
+    elif anytime is not None and anytime.exhausted:
+        with open('src/files/resultado_parcial.txt', 'w') as file:  # Melhor preenchimento parcial encontrado no orçamento
+            for line in grid:
+                file.write(''.join(line) + '\n')
+        logger.info(f"Orçamento esgotado: melhor parcial com {anytime.best_filled}/{anytime.total_slots} slots salvo em src/files/resultado_parcial.txt")
     else:
         logger.info("Não foi possível preencher o grid ao máximo.")
+    tracer.close()  # Esvazia a fila de log assíncrono (nível full)
 
+# Grava cada solução no arquivo assim que é encontrada (separadas por uma linha em branco)
+def enumerate_to_file(args: argparse.Namespace, grid: Grid, words_index: PatternIndex, metrics: SolveMetrics, anytime: Optional[AnytimeControl]) -> None:
+    logger = setup_logger()
+    solutions = enumerate_solutions(grid, words_index, args.solutions, None, SLOT_STRATEGIES[args.slot_order](None),
+                                    VALUE_STRATEGIES[args.value_order](None), args.backjumping, args.symmetry, metrics, anytime)
+    count = 0
+    with open(args.solutions_file, 'w') as file:
+        for rows in solutions:
+            count += 1
+            file.write('\n'.join(rows) + '\n\n')
+            file.flush()
+            logger.info(f"Solução {count} gravada em {args.solutions_file}")
+    if not count:
+        logger.info("Nenhuma solução encontrada.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,183 @@
+import cProfile
+import collections
+import io
+import json
+import math
+import pstats
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple, Optional, Any, Callable, Hashable
+
+DEFAULT_SAMPLE_INTERVAL = 0.005  # Intervalo entre amostras de pilha, em segundos
+
+# Métricas de uma resolução: contadores da busca, candidatas examinadas por slot, tempo por categoria
+# (consulta ao índice, varredura do grid, atualização do grid, log, propagação) e fator de ramificação por profundidade.
+# Sem `timing`, timed apenas chama a função: os contadores continuam, mas o caminho quente não paga o relógio.
+class SolveMetrics:
+    def __init__(self, timing: bool = True):
+        self.nodes_expanded: int = 0
+        self.backtracks: int = 0
+        self.max_depth: int = 0
+        self.pattern_queries: int = 0
+        self.nodes_by_depth: Dict[int, int] = {}
+        self.candidates: Dict[Hashable, int] = {}  # {slot: candidatas examinadas}
+        self.timings: Dict[str, float] = {}
+        self.cache_stats: Optional[Dict[str, float]] = None
+        self.nogood_stats: Optional[Dict[str, int]] = None
+        self.start_time: float = time.perf_counter()
+        self.elapsed: Optional[float] = None
+        if not timing:
+            self.timed = self.untimed
+
+    def node(self, depth: int) -> None:
+        self.nodes_expanded += 1
+        self.nodes_by_depth[depth] = self.nodes_by_depth.get(depth, 0) + 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def examine(self, slot: Hashable) -> None:
+        self.candidates[slot] = self.candidates.get(slot, 0) + 1
+
+    def add_time(self, section: str, seconds: float) -> None:
+        self.timings[section] = self.timings.get(section, 0.0) + seconds
+
+    # Executa a função acumulando o tempo gasto na categoria
+    def timed(self, section: str, function: Callable[..., Any], *args: Any) -> Any:
+        start: float = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.timings[section] = self.timings.get(section, 0.0) + time.perf_counter() - start
+
+    @staticmethod
+    def untimed(section: str, function: Callable[..., Any], *args: Any) -> Any:
+        return function(*args)
+
+    # Soma as métricas de uma busca feita à parte (ex.: uma região resolvida em outro processo)
+    def merge(self, other: 'SolveMetrics') -> None:
+        self.nodes_expanded += other.nodes_expanded
+        self.backtracks += other.backtracks
+        self.pattern_queries += other.pattern_queries
+        self.max_depth = max(self.max_depth, other.max_depth)
+        for depth, count in other.nodes_by_depth.items():
+            self.nodes_by_depth[depth] = self.nodes_by_depth.get(depth, 0) + count
+        for slot, count in other.candidates.items():
+            self.candidates[slot] = self.candidates.get(slot, 0) + count
+        for section, seconds in other.timings.items():
+            self.timings[section] = self.timings.get(section, 0.0) + seconds
+
+    def finish(self) -> None:
+        self.elapsed = time.perf_counter() - self.start_time
+
+    # Fator de ramificação efetivo: nós na profundidade d + 1 por nó na profundidade d
+    def branching_factors(self) -> Dict[int, float]:
+        return {depth: round(self.nodes_by_depth.get(depth + 1, 0) / count, 4)
+                for depth, count in sorted(self.nodes_by_depth.items()) if depth + 1 in self.nodes_by_depth}
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed: float = self.elapsed if self.elapsed is not None else time.perf_counter() - self.start_time
+        return {
+            'seconds': round(elapsed, 6),
+            'nodes_expanded': self.nodes_expanded,
+            'backtracks': self.backtracks,
+            'max_depth': self.max_depth,
+            'pattern_queries': self.pattern_queries,
+            'cache': self.cache_stats,
+            'nogoods': self.nogood_stats,
+            'candidates_examined': sum(self.candidates.values()),
+            'candidates_per_slot': {slot_label(slot): count for slot, count in self.candidates.items()},
+            'timings': {section: round(seconds, 6) for section, seconds in sorted(self.timings.items())},
+            'branching_factor': self.branching_factors(),
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+# Rótulo legível de um slot: (linha, coluna, direção) vira "linha,coluna,direção"; ids do modo ac3 ficam como estão
+def slot_label(slot: Hashable) -> str:
+    if isinstance(slot, tuple):
+        return ','.join(str(part) for part in slot)
+    return str(slot)
+
+# Percentil pelo método do posto mais próximo (sem interpolação: com poucas repetições é um valor observado)
+def percentile(values: List[float], fraction: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+# Executa a função sob o cProfile; grava o perfil (se houver caminho) e devolve o resultado e o resumo das funções mais caras
+def run_profiled(function: Callable[..., Any], *args: Any, output: Optional[str] = None, limit: int = 25, **kwargs: Any) -> Tuple[Any, str]:
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args, **kwargs)
+    if output:
+        profiler.dump_stats(output)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(limit)
+    return result, summary.getvalue()
+
+# Amostrador de pilhas: uma thread lê a pilha da thread que resolve a cada `interval` segundos (sem instrumentar
+# as chamadas, então o custo não cresce com o número de chamadas como no cProfile). Acumula as pilhas no formato
+# "collapsed" (funções separadas por ';' e o número de amostras), lido por ferramentas de flame graph.
+class StackSampler:
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval: float = interval
+        self.stacks: Dict[Tuple[str, ...], int] = collections.Counter()
+        self.samples: int = 0
+        self.target: Optional[int] = None
+        self.stopped: threading.Event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.target = threading.get_ident()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name='stack-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in sorted(self.stacks.items()):
+                file.write(f"{';'.join(stack)} {count}\n")
+
+    # Funções com mais amostras no topo da pilha (tempo próprio) e em qualquer nível (tempo acumulado)
+    def summary(self, limit: int = 25) -> str:
+        own: Dict[str, int] = collections.Counter()
+        total: Dict[str, int] = collections.Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+        lines: List[str] = [f"{self.samples} amostras a cada {self.interval * 1000:.1f} ms", "  próprio  acumulado  função"]
+        for function, count in sorted(total.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]:
+            lines.append(f"  {own[function] / max(self.samples, 1):7.1%}  {count / max(self.samples, 1):9.1%}  {function}")
+        return '\n'.join(lines)
+
+# Executa a função sob o amostrador de pilhas; grava as pilhas (se houver caminho) e devolve o resultado e o resumo
+def run_sampled(function: Callable[..., Any], *args: Any, output: Optional[str] = None, interval: float = DEFAULT_SAMPLE_INTERVAL,
+                limit: int = 25, **kwargs: Any) -> Tuple[Any, str]:
+    sampler = StackSampler(interval)
+    sampler.start()
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        sampler.stop()
+    if output:
+        sampler.write_collapsed(output)
+    return result, sampler.summary(limit)
@@ -0,0 +1,58 @@
+from typing import List, Dict, Optional
+from pattern_index import PatternIndex
+from slots import SlotGraph
+from session import SolverSession
+from pattern_cache import PatternCache, DEFAULT_CAPACITY
+from solver import fill_grid_max
+from csp_solver import solve_ac3
+from decomposition import solve_decomposed
+from heuristics import SLOT_STRATEGIES, VALUE_STRATEGIES
+from logger_config import setup_logger
+from tracing import tracer
+from metrics import SolveMetrics
+from anytime import AnytimeControl, BudgetExhausted, restore_grid
+
+logger = setup_logger()
+
+# legacy: preenchimento máximo + backtracking; ac3: forward checking com AC-3;
+# components: ac3 em cada componente independente do grafo de slots, com junção sem palavras repetidas
+SOLVER_MODES = ('legacy', 'ac3', 'components')
+
+# Resolve um grid com o modo escolhido (ponto único usado pelo main e pelo processamento em lote)
+def solve_with_mode(grid: List[List[str]], words_index: PatternIndex, word_size_map: Dict[int, List[str]], mode: str = 'legacy',
+                    slot_order: str = 'default', value_order: str = 'default', backjumping: bool = True,
+                    seed: Optional[int] = None, cache_size: int = DEFAULT_CAPACITY, metrics: Optional[SolveMetrics] = None,
+                    anytime: Optional[AnytimeControl] = None, workers: int = 1) -> bool:
+    if mode not in SOLVER_MODES:
+        raise ValueError(f"Modo de resolução desconhecido: {mode}")
+    metrics = metrics if metrics is not None else SolveMetrics(timing=False)
+    slot_graph = SlotGraph(grid)  # Pré-calcula os slots e cruzamentos uma única vez
+    if tracer.steps:
+        tracer.event('start', mode=mode, rows=[''.join(line) for line in grid])
+    if mode == 'ac3':
+        solved = solve_ac3(grid, words_index, slot_graph, SLOT_STRATEGIES[slot_order](seed), VALUE_STRATEGIES[value_order](seed), backjumping, metrics, anytime)
+    elif mode == 'components':
+        solved = solve_decomposed(grid, words_index, slot_graph, slot_order, value_order, backjumping, seed, workers, metrics, anytime)
+    else:
+        session = SolverSession(slot_graph, PatternCache(words_index, cache_size), metrics, anytime)
+        if anytime is not None:
+            anytime.start(len(slot_graph.slots))  # O modo legacy é recursivo: não há checkpoint, só prazo e orçamento
+        try:
+            solved = fill_grid_max(grid, words_index, word_size_map, session)
+        except (BudgetExhausted, RecursionError):
+            if anytime is None:
+                raise
+            # Com orçamento, estourar a pilha da recursão também encerra a busca com o melhor parcial
+            solved = False
+            anytime.exhausted = True
+            if anytime.best is not None:
+                restore_grid(grid, anytime.best)
+            logger.info(f"Orçamento esgotado após {metrics.nodes_expanded} nós: melhor parcial com {anytime.best_filled}/{anytime.total_slots} slots.")
+        metrics.cache_stats = session.pattern_cache.stats()
+        metrics.nogood_stats = session.nogoods.stats()
+        logger.info(f"Cache de padrões: {metrics.cache_stats}")
+        logger.info(f"Nogoods: {metrics.nogood_stats}")
+    metrics.finish()
+    if tracer.steps:
+        tracer.event('end', solved=solved, nodes=tracer.nodes)
+    return solved
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from typing import Dict, Tuple, FrozenSet, Set, List, Optional
+from pattern_index import PatternIndex
+
+DEFAULT_NOGOOD_CAPACITY = 65536
+
+Nogood = Tuple[int, FrozenSet[Tuple[int, str]]]  # (tamanho do slot, {(posição, letra)})
+
+# Letras fixas de um padrão como pares (posição, letra)
+def pattern_letters(pattern: str) -> List[Tuple[int, str]]:
+    return [(position, char) for position, char in enumerate(pattern) if char != '?']
+
+# Nogoods do solver legado: atribuições parciais de letras de cruzamento que esvaziaram um slot. Quando um slot
+# fica sem candidatas, as letras fixas do seu padrão são minimizadas (sai cada letra cuja retirada ainda deixa o
+# padrão sem palavras no dicionário) e o nogood guarda só as que sobram, com o tamanho do slot. Um padrão está
+# bloqueado se contém algum nogood do seu tamanho (subsunção): as mesmas letras nas mesmas posições, quaisquer
+# que sejam as outras. Isso depende apenas do dicionário (não das palavras em uso, dos outros slots nem dos limites
+# de tentativas e de profundidade), então um nogood nunca poda uma solução válida e vale em qualquer parte da busca
+# e em qualquer slot do mesmo tamanho. Subárvores que falharam não são registradas: a busca legada é incompleta
+# (limites de tentativas), e a falha dela não prova que a atribuição não tem solução.
+# A memória é limitada: acima da capacidade, o nogood usado há mais tempo é descartado (LRU).
+class NogoodStore:
+    def __init__(self, capacity: int = DEFAULT_NOGOOD_CAPACITY):
+        self.capacity: int = capacity
+        self.entries: 'OrderedDict[Nogood, None]' = OrderedDict()
+        self.postings: Dict[Tuple[int, int, str], Set[Nogood]] = {}  # {(tamanho, posição, letra): nogoods com esse par}
+        self.recorded: int = 0
+        self.hits: int = 0  # Candidatas descartadas por um nogood
+        self.evictions: int = 0
+        self.dropped_letters: int = 0  # Letras retiradas pela minimização
+        self.lookups: Dict[str, Optional[Nogood]] = {}  # Padrões já consultados; esvaziado quando os nogoods mudam
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # O padrão contém algum nogood? (sem contar acerto nem renovar o nogood)
+    def __contains__(self, pattern: str) -> bool:
+        return self.find(pattern) is not None
+
+    # Nogood do tamanho do padrão cujas letras estão todas no padrão, se houver
+    def find(self, pattern: str) -> Optional[Nogood]:
+        if pattern in self.lookups:
+            return self.lookups[pattern]
+        nogood: Optional[Nogood] = self.search(pattern)
+        if len(self.lookups) >= self.capacity:
+            self.lookups.clear()
+        self.lookups[pattern] = nogood
+        return nogood
+
+    def search(self, pattern: str) -> Optional[Nogood]:
+        length: int = len(pattern)
+        empty: Nogood = (length, frozenset())
+        if empty in self.entries:  # Nenhuma palavra do tamanho: qualquer padrão está bloqueado
+            return empty
+        matched: Dict[Nogood, int] = {}
+        for position, letter in pattern_letters(pattern):
+            for nogood in self.postings.get((length, position, letter), ()):
+                count: int = matched.get(nogood, 0) + 1
+                if count == len(nogood[1]):
+                    return nogood
+                matched[nogood] = count
+        return None
+
+    # Registra um padrão sem candidatas no dicionário, minimizado às letras que causam a falha
+    def add(self, pattern: str, words_index: PatternIndex) -> None:
+        if self.capacity <= 0:
+            return
+        known: Optional[Nogood] = self.find(pattern)
+        if known is not None:  # Já coberto por um nogood igual ou menor
+            self.entries.move_to_end(known)
+            return
+        letters: List[str] = list(pattern)
+        for position, _ in pattern_letters(pattern):
+            kept: str = letters[position]
+            letters[position] = '?'
+            if words_index.count_pattern(''.join(letters)):
+                letters[position] = kept  # Sem esta letra o padrão já tem palavras: ela faz parte do conflito
+            else:
+                self.dropped_letters += 1
+        nogood: Nogood = (len(pattern), frozenset(pattern_letters(''.join(letters))))
+        self.entries[nogood] = None
+        self.lookups.clear()
+        for position, letter in nogood[1]:
+            self.postings.setdefault((nogood[0], position, letter), set()).add(nogood)
+        self.recorded += 1
+        if len(self.entries) > self.capacity:
+            self.discard(self.entries.popitem(last=False)[0])
+            self.evictions += 1
+
+    # Tira um nogood descartado do índice de (tamanho, posição, letra)
+    def discard(self, nogood: Nogood) -> None:
+        for position, letter in nogood[1]:
+            key = (nogood[0], position, letter)
+            self.postings[key].discard(nogood)
+            if not self.postings[key]:
+                del self.postings[key]
+
+    # O padrão contém letras que já se mostraram sem nenhuma palavra?
+    def blocked(self, pattern: str) -> bool:
+        nogood: Optional[Nogood] = self.find(pattern)
+        if nogood is None:
+            return False
+        self.entries.move_to_end(nogood)
+        self.hits += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'recorded': self.recorded,
+            'hits': self.hits,
+            'evictions': self.evictions,
+            'dropped_letters': self.dropped_letters,
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.postings.clear()
+        self.lookups.clear()
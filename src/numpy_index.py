@@ -0,0 +1,135 @@
+from typing import List, Tuple, Dict, Optional
+from pattern_index import PatternIndex, score_bucket
+from compiled_index import ENCODING, MappedPatternIndex, ensure_compiled_index, load_dictionary
+from trie import preprocess_words_by_length
+from utils import DEFAULT_SCORER
+from logger_config import setup_logger
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele, o índice de bitsets atende sozinho
+    np = None
+
+logger = setup_logger()
+
+NUMPY_AVAILABLE: bool = np is not None
+ENGINES = ('bitset', 'numpy')  # bitset: índice posicional padrão; numpy: consultas vetorizadas sobre matrizes uint8
+
+# Matriz palavras × posições com os bytes de cada palavra (a codificação do dicionário compilado).
+# Palavras fora do latin-1 não cabem em uint8: quem carrega o índice volta para os bitsets
+def words_matrix(words: List[str], length: int) -> 'np.ndarray':
+    data: bytes = ''.join(words).encode(ENCODING)
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(words), length)
+
+# Máscara booleana (um item por palavra) -> bitset int no formato do PatternIndex (bit i = palavra i)
+def mask_to_bits(mask: 'np.ndarray') -> int:
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+# Bitset int -> máscara booleana com `count` itens
+def bits_to_mask(bits: int, count: int) -> 'np.ndarray':
+    data = np.frombuffer(bits.to_bytes((count + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, count=count, bitorder='little').astype(bool)
+
+# Motor NumPy, comum aos índices em memória e compilado. Os bitsets continuam sendo a interface (os domínios do
+# modo ac3 são ints), mas são calculados a partir da matriz uint8 das palavras de cada tamanho (self.matrices),
+# na mesma ordem dos bits: os bitsets posicionais (position_bits) não são construídos nem carregados.
+# Filtrar por padrão, listar as letras com suporte num domínio, podar um domínio num cruzamento e contar letras
+# por posição (ordenação de valores) viram operações com máscaras booleanas sobre a matriz.
+class NumpyEngine:
+    matrices: Dict[int, 'np.ndarray']
+    full_masks: Dict[int, int]
+
+    # Bitset das palavras que casam com o padrão: comparação das colunas fixas de uma vez
+    def match_mask(self, pattern: str) -> int:
+        matrix = self.matrices.get(len(pattern))
+        if matrix is None:
+            return 0
+        positions: List[int] = [i for i, char in enumerate(pattern) if char != '?']
+        if not positions:
+            return self.full_masks[len(pattern)]
+        try:
+            letters = np.frombuffer(''.join(pattern[i] for i in positions).encode(ENCODING), dtype=np.uint8)
+        except UnicodeEncodeError:  # Letra fora da codificação: nenhuma palavra do dicionário a contém
+            return 0
+        return mask_to_bits((matrix[:, positions] == letters).all(axis=1))
+
+    # Letras presentes na posição entre as palavras do domínio (suporte para os vizinhos no cruzamento)
+    def supported_letters(self, length: int, index: int, domain: int) -> List[str]:
+        matrix = self.matrices[length]
+        column = matrix[bits_to_mask(domain, len(matrix)), index]
+        return [bytes((code,)).decode(ENCODING) for code in np.flatnonzero(np.bincount(column, minlength=256))]
+
+    # Bitset das palavras que têm, na posição, alguma das letras
+    def letters_mask(self, length: int, index: int, letters: List[str]) -> int:
+        matrix = self.matrices.get(length)
+        if matrix is None or not letters:
+            return 0
+        codes = np.frombuffer(''.join(letters).encode(ENCODING, 'ignore'), dtype=np.uint8)  # Letra fora da codificação não casa
+        return mask_to_bits(np.isin(matrix[:, index], codes))
+
+    # Contagem de cada letra em cada posição, por tamanho (as frequências usadas pela ordenação LCV)
+    def letter_histograms(self) -> Dict[int, List[Dict[str, int]]]:
+        return {length: self.position_histogram(matrix) for length, matrix in self.matrices.items()}
+
+    @staticmethod
+    def position_histogram(matrix: 'np.ndarray') -> List[Dict[str, int]]:
+        histogram: List[Dict[str, int]] = []
+        for position in range(matrix.shape[1]):
+            counts = np.bincount(matrix[:, position], minlength=256)
+            histogram.append({bytes((int(code),)).decode(ENCODING): int(counts[code]) for code in np.flatnonzero(counts)})
+        return histogram
+
+# Índice em memória com motor NumPy: cada tamanho guarda só a lista e a matriz, sem os bitsets posicionais
+class NumpyPatternIndex(NumpyEngine, PatternIndex):
+    def __init__(self, word_size_map: Dict[int, List[str]], scorer: Optional[str] = None):
+        if np is None:
+            raise ImportError("O motor numpy exige o pacote NumPy.")
+        self.matrices = {}
+        super().__init__(word_size_map, scorer)
+
+    def add_bucket(self, length: int, words: List[str]) -> None:
+        if self.scorer is not None:
+            words, self.scores[length] = score_bucket(words, self.scorer)
+        self.matrices[length] = words_matrix(words, length)
+        self.words_by_length[length] = words
+        self.full_masks[length] = (1 << len(words)) - 1
+
+# Índice compilado com motor NumPy: cada matriz é uma visão (sem cópia) da área de palavras do arquivo, que já
+# guarda as palavras de um tamanho com largura fixa e um byte por letra. As páginas continuam compartilhadas
+# entre os processos que abrem o mesmo arquivo, e os bitsets posicionais do arquivo nunca são convertidos em ints
+class MappedNumpyPatternIndex(NumpyEngine, MappedPatternIndex):
+    def __init__(self, index_path: str):
+        if np is None:
+            raise ImportError("O motor numpy exige o pacote NumPy.")
+        super().__init__(index_path)
+        self.matrices = {
+            length: np.frombuffer(self.buffer, dtype=np.uint8, count=words.count * length, offset=words.offset).reshape(words.count, length)
+            for length, words in self.words_by_length.items()
+        }
+
+    def close(self) -> None:
+        self.matrices.clear()  # Libera as visões do mmap antes de fechá-lo
+        super().close()
+
+# Carrega a lista de palavras no índice com motor NumPy, já ordenado por prioridade
+def load_numpy_index(file_path: str, scorer: Optional[str] = DEFAULT_SCORER) -> Tuple[NumpyPatternIndex, Dict[int, List[str]]]:
+    with open(file_path, 'r', encoding='utf-8') as file:
+        words = sorted(word for word in file.read().splitlines() if word)
+    words_index = NumpyPatternIndex(preprocess_words_by_length(words), scorer)
+    return words_index, words_index.words_by_length
+
+# Carrega o dicionário com o motor escolhido; com o dicionário compilado, o motor NumPy lê as matrizes do próprio
+# arquivo. Sem NumPy (ou com palavras fora do latin-1), volta para o índice de bitsets com um aviso
+def load_dictionary_with_engine(source_path: str, engine: str = 'bitset', compiled: bool = True, scorer: Optional[str] = None) -> Tuple[PatternIndex, Dict[int, List[str]]]:
+    if engine == 'numpy':
+        if np is None:
+            logger.warning("NumPy não está instalado: usando o motor de bitsets.")
+        elif compiled:
+            words_index = ensure_compiled_index(source_path, scorer=scorer, index_type=MappedNumpyPatternIndex)  # Sem latin-1: o aviso vem do compilador
+            return words_index, words_index.words_by_length
+        else:
+            try:
+                return load_numpy_index(source_path, scorer or DEFAULT_SCORER)
+            except UnicodeEncodeError:
+                logger.warning(f"O dicionário tem letras fora do {ENCODING}: usando o motor de bitsets.")
+    return load_dictionary(source_path, compiled, scorer)
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from operator import itemgetter
+from typing import List, Tuple, Dict, Callable, Optional
+from pattern_index import PatternIndex
+
+DEFAULT_CAPACITY = 4096
+DEFAULT_GENERALIZE_LIMIT = 2048  # Acima disso, filtrar o resultado em cache custa mais do que consultar o índice
+
+# Cache LRU das consultas por padrão: guarda a tupla de candidatas já ordenada por prioridade.
+# Um padrão ausente pode ser respondido filtrando um padrão menos específico que esteja em cache
+# (o mesmo padrão com uma letra fixa a menos, ou o padrão todo '?'). Como a ordenação é estável,
+# filtrar uma tupla ordenada dá exatamente a mesma ordem que ordenar o resultado da consulta.
+class PatternCache:
+    def __init__(self, words_index: PatternIndex, capacity: int = DEFAULT_CAPACITY,
+                 order: Optional[Callable[[List[str]], List[str]]] = None,
+                 generalize_limit: int = DEFAULT_GENERALIZE_LIMIT):
+        self.words_index: PatternIndex = words_index
+        self.capacity: int = capacity
+        self.order: Callable[[List[str]], List[str]] = order or words_index.prioritize  # Sem custo se o índice já está ordenado por prioridade
+        self.generalize_limit: int = generalize_limit
+        self.entries: 'OrderedDict[str, Tuple[str, ...]]' = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.generalized: int = 0  # Faltas respondidas filtrando um padrão menos específico
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self.entries
+
+    # Candidatas para o padrão, em ordem de prioridade
+    def candidates(self, pattern: str) -> Tuple[str, ...]:
+        words = self.entries.get(pattern)
+        if words is not None:
+            self.entries.move_to_end(pattern)
+            self.hits += 1
+            return words
+        self.misses += 1
+        words = self.from_general(pattern)
+        if words is None:
+            words = tuple(self.order(self.words_index.search_with_pattern(pattern)))
+        else:
+            self.generalized += 1
+        self.store(pattern, words)
+        return words
+
+    def store(self, pattern: str, words: Tuple[str, ...]) -> None:
+        if self.capacity <= 0:
+            return
+        self.entries[pattern] = words
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    # Procura em cache um padrão mais geral e filtra suas candidatas pelas letras fixas do padrão pedido
+    def from_general(self, pattern: str) -> Optional[Tuple[str, ...]]:
+        fixed: List[int] = [i for i, char in enumerate(pattern) if char != '?']
+        if not fixed:
+            return None
+        parents: List[str] = [pattern[:i] + '?' + pattern[i + 1:] for i in fixed]
+        if len(fixed) > 1:
+            parents.append('?' * len(pattern))
+        for parent in parents:
+            words = self.entries.get(parent)
+            if words is not None and len(words) <= self.generalize_limit:
+                self.entries.move_to_end(parent)
+                getter = itemgetter(*fixed)
+                target = getter(pattern)
+                return tuple(word for word in words if getter(word) == target)
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        lookups: int = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'generalized': self.generalized,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
@@ -0,0 +1,142 @@
+from array import array
+from collections import defaultdict
+from typing import List, Tuple, Dict, Optional, Sequence, FrozenSet
+from trie import preprocess_words_by_length
+from utils import WORD_SCORERS, prioritize_words
+
+# Posições dos bits ligados em cada valor de byte (usado para decodificar os bitsets)
+_BYTE_BITS: List[Tuple[int, ...]] = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+# Índice de padrões particionado por tamanho.
+# Para cada tamanho guarda a lista de palavras e, para cada (posição, letra), um bitset (int do Python)
+# em que o bit i indica que a i-ésima palavra daquele tamanho tem aquela letra naquela posição.
+# Uma consulta faz a interseção (AND) dos bitsets das letras fixas do padrão e retorna apenas palavras do tamanho exato.
+# Com uma função de pontuação (WORD_SCORERS), cada lista é ordenada por pontuação decrescente antes de construir os
+# bitsets, e as pontuações ficam num array paralelo: a ordem dos bits passa a ser a ordem de prioridade.
+class PatternIndex:
+    def __init__(self, word_size_map: Dict[int, List[str]], scorer: Optional[str] = None):
+        self.words_by_length: Dict[int, List[str]] = {}
+        self.position_bits: Dict[int, List[Dict[str, int]]] = {}  # {tamanho: [posição] -> {letra: bitset}}
+        self.full_masks: Dict[int, int] = {}  # {tamanho: bitset com todas as palavras daquele tamanho}
+        self.scorer: Optional[str] = scorer
+        self.scores: Dict[int, Sequence[int]] = {}  # {tamanho: pontuação da i-ésima palavra}
+        self.word_sets: Dict[int, FrozenSet[str]] = {}  # {tamanho: conjunto das palavras}, criado sob demanda
+        for length, words in word_size_map.items():
+            if words:
+                self.add_bucket(length, list(words))
+
+    # Constrói os bitsets posicionais de um tamanho de palavra
+    def add_bucket(self, length: int, words: List[str]) -> None:
+        if self.scorer is not None:
+            words, self.scores[length] = score_bucket(words, self.scorer)
+        count: int = len(words)
+        n_bytes: int = (count + 7) // 8
+        position_bits: List[Dict[str, int]] = []
+        for position in range(length):
+            buffers: Dict[str, bytearray] = defaultdict(lambda: bytearray(n_bytes))
+            for i, word in enumerate(words):
+                buffers[word[position]][i >> 3] |= 1 << (i & 7)
+            position_bits.append({letter: int.from_bytes(buffer, 'little') for letter, buffer in buffers.items()})
+        self.words_by_length[length] = words
+        self.position_bits[length] = position_bits
+        self.full_masks[length] = (1 << count) - 1
+
+    # Retorna o bitset das palavras que casam com o padrão ('?' é coringa)
+    def match_mask(self, pattern: str) -> int:
+        length: int = len(pattern)
+        mask: int = self.full_masks.get(length, 0)
+        if not mask:
+            return 0
+        position_bits = self.position_bits[length]
+        for position, char in enumerate(pattern):
+            if char != '?':
+                mask &= position_bits[position].get(char, 0)
+                if not mask:
+                    return 0
+        return mask
+
+    # Lista de palavras de um tamanho, indexada pelos bits
+    def bucket(self, length: int) -> List[str]:
+        return self.words_by_length.get(length, [])
+
+    # Conjunto das palavras de um tamanho: teste de pertinência exato por hash, sem percorrer bitsets
+    def word_set(self, length: int) -> FrozenSet[str]:
+        words = self.word_sets.get(length)
+        if words is None:
+            words = self.word_sets[length] = frozenset(self.bucket(length))
+        return words
+
+    # Converte um bitset em palavras, mantendo a ordem da lista do tamanho
+    def words_from_mask(self, length: int, mask: int) -> List[str]:
+        words: List[str] = self.bucket(length)
+        if not mask:
+            return []
+        if mask == self.full_masks[length]:
+            return list(words)
+        result: List[str] = []
+        if mask.bit_count() * 64 < len(words):  # Poucos bits ligados: isola o bit menos significativo a cada passo
+            while mask:
+                low_bit = mask & -mask
+                result.append(words[low_bit.bit_length() - 1])
+                mask ^= low_bit
+            return result
+        data: bytes = mask.to_bytes((len(words) + 7) // 8, 'little')
+        for byte_index, value in enumerate(data):
+            if value:
+                base: int = byte_index << 3
+                for bit in _BYTE_BITS[value]:
+                    result.append(words[base + bit])
+        return result
+
+    # Letras presentes na posição entre as palavras do domínio (bitset)
+    def supported_letters(self, length: int, index: int, domain: int) -> List[str]:
+        return [letter for letter, bits in self.position_bits[length][index].items() if domain & bits]
+
+    # Bitset das palavras que têm, na posição, alguma das letras (o que sobra de um domínio após um cruzamento)
+    def letters_mask(self, length: int, index: int, letters: List[str]) -> int:
+        position_bits: Dict[str, int] = self.position_bits[length][index]
+        mask: int = 0
+        for letter in letters:
+            mask |= position_bits.get(letter, 0)
+        return mask
+
+    # Busca todas as palavras com o tamanho exato do padrão
+    def search_with_pattern(self, pattern: str) -> List[str]:
+        return self.words_from_mask(len(pattern), self.match_mask(pattern))
+
+    # Modo apenas contagem: não materializa as palavras
+    def count_pattern(self, pattern: str) -> int:
+        return self.match_mask(pattern).bit_count()
+
+    def __contains__(self, word: str) -> bool:
+        return self.match_mask(word) != 0 and '?' not in word
+
+    # Ordena candidatas pela pontuação do índice. Se as listas já estão ordenadas por uma pontuação, qualquer
+    # resultado de consulta (que preserva a ordem da lista) já está ordenado e nada precisa ser feito.
+    def prioritize(self, words: List[str]) -> List[str]:
+        if self.scorer is not None:
+            return list(words)
+        return prioritize_words(words)
+
+    # Ordena palavras fora da ordem da lista (ex.: embaralhadas) pela mesma pontuação do índice
+    def sort_by_score(self, words: List[str]) -> List[str]:
+        if self.scorer is None:
+            return prioritize_words(words)
+        return sorted(words, key=WORD_SCORERS[self.scorer], reverse=True)
+
+# Ordena uma lista de palavras por pontuação decrescente (estável: empates mantêm a ordem original, como em
+# prioritize_words) e devolve também o array paralelo de pontuações
+def score_bucket(words: List[str], scorer: str) -> Tuple[List[str], array]:
+    score = WORD_SCORERS[scorer]
+    scores: List[int] = [score(word) for word in words]
+    order: List[int] = sorted(range(len(words)), key=scores.__getitem__, reverse=True)
+    return [words[i] for i in order], array('q', [scores[i] for i in order])
+
+# Carrega a lista de palavras diretamente no índice de padrões (sem construir a Trie),
+# com as pontuações pré-calculadas e as listas já ordenadas por prioridade
+def load_words_index(file_path: str, scorer: Optional[str] = 'priority') -> Tuple[PatternIndex, Dict[int, List[str]]]:
+    with open(file_path, 'r', encoding='utf-8') as file:
+        words = sorted(word for word in file.read().splitlines() if word)  # Mesma filtragem de read_word_list
+    word_size_map = preprocess_words_by_length(words)
+    words_index = PatternIndex(word_size_map, scorer)
+    return words_index, words_index.words_by_length
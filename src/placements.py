@@ -0,0 +1,142 @@
+from typing import List, Tuple, Dict, Iterable, Iterator, Union, Any
+
+PlacedWord = Tuple[str, int, int, str]  # (palavra, linha, coluna, direção)
+
+# Células ocupadas por uma palavra colocada no grid
+def word_cells(word: str, row: int, col: int, direction: str) -> Iterator[Tuple[int, int]]:
+    if direction == 'H':
+        return ((row, col + i) for i in range(len(word)))
+    return ((row + i, col) for i in range(len(word)))
+
+# Lista de palavras usadas com um índice de posse das células sempre sincronizado.
+# Continua sendo uma lista (append/remove/pop, atribuição e remoção por índice ou fatia funcionam como antes), mas também mantém
+# célula -> palavras H/V que passam por ela (o tamanho da lista é a contagem de referências da célula),
+# o que torna "essa letra é compartilhada?" e "quantos cruzamentos essa palavra tem?" O(1) por célula.
+# Uma lista comum continua sendo aceita pelas funções do grid como modo de referência (varredura linear).
+class PlacedWords(list):
+    def __init__(self, placed: Iterable[PlacedWord] = ()):
+        super().__init__()
+        self.cell_owners: Dict[Tuple[int, int], List[PlacedWord]] = {}
+        self.entry_counts: Dict[PlacedWord, int] = {}
+        self.word_counts: Dict[str, int] = {}
+        self.extend(placed)
+
+    def _index(self, placed: PlacedWord) -> None:
+        for cell in word_cells(*placed):
+            self.cell_owners.setdefault(cell, []).append(placed)
+        self.entry_counts[placed] = self.entry_counts.get(placed, 0) + 1
+        self.word_counts[placed[0]] = self.word_counts.get(placed[0], 0) + 1
+
+    def _unindex(self, placed: PlacedWord) -> None:
+        for cell in word_cells(*placed):
+            owners = self.cell_owners[cell]
+            owners.remove(placed)
+            if not owners:
+                del self.cell_owners[cell]
+        for counts, key in ((self.entry_counts, placed), (self.word_counts, placed[0])):
+            counts[key] -= 1
+            if not counts[key]:
+                del counts[key]
+
+    def append(self, placed: PlacedWord) -> None:
+        super().append(placed)
+        self._index(placed)
+
+    def extend(self, placed: Iterable[PlacedWord]) -> None:
+        for item in placed:
+            self.append(item)
+
+    def insert(self, index: int, placed: PlacedWord) -> None:
+        super().insert(index, placed)
+        self._index(placed)
+
+    def remove(self, placed: PlacedWord) -> None:
+        super().remove(placed)
+        self._unindex(placed)
+
+    def pop(self, index: int = -1) -> PlacedWord:
+        placed = super().pop(index)
+        self._unindex(placed)
+        return placed
+
+    def clear(self) -> None:
+        super().clear()
+        self.cell_owners.clear()
+        self.entry_counts.clear()
+        self.word_counts.clear()
+
+    # Atribuição por índice ou fatia: reindexa as entradas substituídas (o índice só muda se a lista mudou)
+    def __setitem__(self, index: Union[int, slice], placed: Any) -> None:
+        if isinstance(index, slice):
+            replaced: List[PlacedWord] = self[index]
+            placed = list(placed)
+            super().__setitem__(index, placed)
+        else:
+            replaced = [self[index]]
+            super().__setitem__(index, placed)
+            placed = [placed]
+        for item in replaced:
+            self._unindex(item)
+        for item in placed:
+            self._index(item)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        removed: List[PlacedWord] = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for item in removed:
+            self._unindex(item)
+
+    def __iadd__(self, placed: Iterable[PlacedWord]) -> 'PlacedWords':
+        self.extend(list(placed))  # Cópia: `lista += lista` não pode iterar sobre a lista que cresce
+        return self
+
+    def __imul__(self, times: int) -> 'PlacedWords':
+        if times <= 0:
+            self.clear()
+        else:
+            self.extend(list(self) * (times - 1))
+        return self
+
+    # sort e reverse só reordenam as entradas: o índice (um multiconjunto por célula) continua válido
+
+    # Reconstrói o índice ao ser serializada (por exemplo, ao enviar para outro processo)
+    def __reduce__(self):
+        return (PlacedWords, (list(self),))
+
+    def __contains__(self, placed: object) -> bool:
+        return placed in self.entry_counts
+
+    # Palavras colocadas que passam pela célula
+    def owners(self, row: int, col: int) -> List[PlacedWord]:
+        return self.cell_owners.get((row, col), [])
+
+    # Contagem de referências da célula (quantas palavras colocadas a usam)
+    def cell_refcount(self, row: int, col: int) -> int:
+        return len(self.cell_owners.get((row, col), ()))
+
+    # Verifica se alguma palavra na direção informada passa pela célula
+    def has_owner(self, row: int, col: int, direction: str) -> bool:
+        return any(owner[3] == direction for owner in self.cell_owners.get((row, col), ()))
+
+    # Número de células da palavra cruzadas por palavras da direção oposta
+    def count_crossings(self, word: str, row: int, col: int, direction: str) -> int:
+        other_direction: str = 'V' if direction == 'H' else 'H'
+        return sum(1 for cell_row, cell_col in word_cells(word, row, col, direction) if self.has_owner(cell_row, cell_col, other_direction))
+
+    # Verifica se a palavra (apenas o texto) já foi usada em qualquer posição
+    def contains_word(self, word: str) -> bool:
+        return word in self.word_counts
+
+# Modo de referência: varredura linear de used_words (mantido para testes diferenciais)
+def has_owner_linear(used_words: List[PlacedWord], row: int, col: int, direction: str) -> bool:
+    if direction == 'V':
+        # A palavra vertical está na mesma coluna e se estende de forma que inclua a linha
+        return any(w for w, r, c, d in used_words if d == 'V' and c == col and r <= row < r + len(w))
+    # A palavra horizontal está na mesma linha e se estende de forma que inclua a coluna
+    return any(w for w, r, c, d in used_words if d == 'H' and r == row and c <= col < c + len(w))
+
+# Verifica se alguma palavra na direção informada passa pela célula, usando o índice quando disponível
+def cell_has_owner(used_words: List[PlacedWord], row: int, col: int, direction: str) -> bool:
+    if isinstance(used_words, PlacedWords):
+        return used_words.has_owner(row, col, direction)
+    return has_owner_linear(used_words, row, col, direction)
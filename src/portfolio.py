@@ -0,0 +1,70 @@
+import argparse
+import json
+import time
+from typing import List, Dict, Optional, Any, Tuple
+from batch import make_pool, solve_grid_file
+from logger_config import setup_logger
+from utils import WORD_SCORERS
+
+logger = setup_logger()
+
+# Configurações base do portfólio: combinações de heurísticas do modo ac3
+BASE_CONFIGS: List[Dict[str, Any]] = [
+    {'mode': 'ac3', 'slot_order': 'mrv', 'value_order': 'lcv'},
+    {'mode': 'ac3', 'slot_order': 'mrv', 'value_order': 'default'},
+    {'mode': 'ac3', 'slot_order': 'default', 'value_order': 'lcv'},
+    {'mode': 'ac3', 'slot_order': 'default', 'value_order': 'default'},
+]
+
+# Monta N configurações: primeiro as combinações base, depois variações com sementes (desempates aleatórios)
+def build_portfolio(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    configs: List[Dict[str, Any]] = []
+    for i in range(size):
+        config = dict(BASE_CONFIGS[i % len(BASE_CONFIGS)])
+        if i >= len(BASE_CONFIGS):
+            config['seed'] = seed + i
+        configs.append(config)
+    return configs
+
+def _solve_config(task: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    path, config = task
+    result = solve_grid_file(path, config)
+    result['config'] = config
+    return result
+
+# Executa todas as configurações em paralelo sobre o mesmo grid; a primeira a preencher o grid vence
+# e as demais são canceladas (o pool é encerrado).
+def solve_portfolio(path: str, words_path: str, configs: List[Dict[str, Any]], workers: Optional[int] = None,
+                    scorer: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    start_time = time.perf_counter()
+    pool = make_pool(words_path, {}, workers or len(configs), scorer)
+    try:
+        for result in pool.imap_unordered(_solve_config, [(path, config) for config in configs]):
+            if result['solved']:
+                result['wall_seconds'] = round(time.perf_counter() - start_time, 4)
+                return result
+            logger.info(f"Configuração {result['config']} terminou sem solução.")
+        return None
+    finally:
+        pool.terminate()  # Cancela as buscas que ainda estão rodando
+        pool.join()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Corrida de várias configurações do solver sobre um grid")
+    parser.add_argument('grid')
+    parser.add_argument('--words', default='src/files/lista_palavras.txt')
+    parser.add_argument('--size', type=int, default=8, help="número de configurações no portfólio")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--scorer', choices=sorted(WORD_SCORERS), default=None, help="pontuação que ordena as palavras (padrão: a do índice compilado)")
+    args = parser.parse_args()
+
+    result = solve_portfolio(args.grid, args.words, build_portfolio(args.size, args.seed), args.workers, args.scorer)
+    if result is None:
+        logger.info("Nenhuma configuração conseguiu preencher o grid.")
+        return
+    logger.info(f"Configuração vencedora: {result['config']} em {result['wall_seconds']:.2f} segundos")
+    print(json.dumps(result, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
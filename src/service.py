@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import List, Dict, Optional, Any, Tuple, Deque, Callable, Awaitable
+from batch import _init_worker, _shared
+from compiled_index import ensure_compiled_index
+from compact_grid import Grid
+from modes import SOLVER_MODES, solve_with_mode
+from heuristics import SLOT_STRATEGIES, VALUE_STRATEGIES
+from metrics import SolveMetrics, percentile
+from anytime import AnytimeControl
+from logger_config import setup_logger
+from utils import WORD_SCORERS
+
+logger = setup_logger()
+
+# Serviço de resolução de longa duração: o dicionário é carregado uma vez e os pedidos chegam como linhas JSON
+# (stdin/stdout ou um socket Unix), atendidos por um pool de processos. Operações:
+#   {"id": 1, "op": "solve", "grid": ["..?.", ...] | "path": "grids/grid-0.txt", "mode": "ac3", "timeout": 5}
+#   {"id": 2, "op": "cancel", "target": 1}
+#   {"id": 3, "op": "stats"}
+#   {"id": 4, "op": "shutdown"}
+# Cada resposta é uma linha JSON com o mesmo "id". Pedidos de resolução são concorrentes: as respostas
+# saem na ordem em que terminam.
+
+DEFAULT_TIMEOUT = 30.0
+TIMEOUT_GRACE = 5.0  # Folga além do prazo cooperativo antes de desistir de esperar o worker
+CANCEL_SLOTS = 4096  # Tamanho do anel de cancelamentos compartilhado com os workers
+LATENCY_WINDOW = 1000  # Latências mais recentes usadas nos percentis
+SOLVE_OPTIONS = ('mode', 'slot_order', 'value_order', 'backjumping', 'seed', 'cache_size')
+
+Respond = Callable[[Dict[str, Any]], Awaitable[None]]  # Envia uma resposta ao cliente do pedido
+
+# Anel de cancelamentos: o worker do pedido de número `seq` para quando cancelled[seq % CANCEL_SLOTS] == seq
+_cancelled: Dict[str, Any] = {}
+
+def _init_service_worker(words_path: Optional[str], cancelled: Any, scorer: Optional[str] = None) -> None:
+    _init_worker(words_path, {}, scorer)
+    _cancelled['ring'] = cancelled
+
+# Resolve um pedido no processo filho. O prazo e o cancelamento são cooperativos (AnytimeControl): ao esgotar,
+# a resposta traz o melhor preenchimento parcial
+def solve_request(seq: int, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    ring = _cancelled['ring']
+    start_time = time.perf_counter()
+    grid = Grid.from_file(request['path']) if 'path' in request else Grid([list(row) for row in request['grid']])
+    options: Dict[str, Any] = {key: request[key] for key in SOLVE_OPTIONS if key in request}
+    metrics = SolveMetrics(timing=False)  # Só a contagem de nós entra na resposta
+    anytime = AnytimeControl(time_limit=timeout, stop=lambda: ring[seq % CANCEL_SLOTS] == seq)
+    words_index = _shared['words_index']
+    solved: bool = solve_with_mode(grid, words_index, words_index.words_by_length, metrics=metrics, anytime=anytime, **options)
+    if solved:
+        status = 'solved'
+    elif anytime.cancelled:
+        status = 'cancelled'
+    elif anytime.exhausted:  # Prazo esgotado ou, no modo legacy, limite de recursão: devolve o melhor parcial
+        status = 'timeout' if time.perf_counter() - start_time >= timeout else 'partial'
+    else:
+        status = 'unsolvable'
+    return {
+        'status': status,
+        'rows': [''.join(line) for line in grid] if solved or anytime.exhausted else None,
+        'filled': anytime.best_filled if anytime.exhausted else None,
+        'nodes': metrics.nodes_expanded,
+        'solve_seconds': round(time.perf_counter() - start_time, 4),
+        'pid': os.getpid(),
+    }
+
+class SolverService:
+    def __init__(self, words_path: str, workers: Optional[int] = None, default_timeout: float = DEFAULT_TIMEOUT,
+                 scorer: Optional[str] = None):
+        self.default_timeout: float = default_timeout
+        self.workers: int = workers or os.cpu_count() or 1
+        words_index = ensure_compiled_index(words_path, scorer=scorer)  # Compila (se preciso) uma vez, antes dos workers
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            _shared['words_index'] = words_index  # Herdado pelos filhos
+            init_path: Optional[str] = None
+        else:
+            context = multiprocessing.get_context()
+            init_path = words_path
+        self.cancelled = context.Array('q', [-1] * CANCEL_SLOTS, lock=False)
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_service_worker,
+                                                               initargs=(init_path, self.cancelled, scorer))
+        self.slots: Optional[asyncio.Semaphore] = None  # Criado no loop de eventos: no máximo `workers` pedidos em execução
+        self.tasks: Dict[Any, Tuple[int, 'asyncio.Task[None]']] = {}  # {id do pedido: (seq, tarefa)}
+        self.seq: int = 0
+        self.queued: int = 0
+        self.running: int = 0
+        self.counts: Dict[str, int] = collections.Counter()
+        self.latencies: Deque[float] = collections.deque(maxlen=LATENCY_WINDOW)
+        self.start_time: float = time.perf_counter()
+        self.closing: Optional[asyncio.Event] = None
+
+    # Atende uma linha do protocolo; pedidos de resolução viram tarefas e respondem quando terminam
+    async def handle_line(self, line: str, respond: Respond) -> None:
+        try:
+            request: Dict[str, Any] = json.loads(line)
+            op: str = request.get('op', 'solve')
+        except (ValueError, AttributeError) as error:
+            await respond({'id': None, 'status': 'error', 'error': f"JSON inválido: {error}"})
+            return
+        request_id = request.get('id')
+        if op == 'solve':
+            if request_id in self.tasks:
+                await respond({'id': request_id, 'status': 'error', 'error': "id já em uso"})
+                return
+            self.seq += 1
+            self.tasks[request_id] = (self.seq, asyncio.ensure_future(self.run(request_id, self.seq, request, respond)))
+        elif op == 'cancel':
+            await respond({'id': request_id, 'status': 'ok', 'cancelled': self.cancel(request.get('target'))})
+        elif op == 'stats':
+            await respond(dict({'id': request_id, 'status': 'ok'}, **self.stats()))
+        elif op == 'shutdown':
+            await respond({'id': request_id, 'status': 'ok'})
+            self.closing.set()
+        else:
+            await respond({'id': request_id, 'status': 'error', 'error': f"operação desconhecida: {op}"})
+
+    async def solve(self, seq: int, request: Dict[str, Any]) -> Dict[str, Any]:
+        arrival: float = time.perf_counter()
+        try:
+            timeout: float = float(request.get('timeout', self.default_timeout))
+        except (TypeError, ValueError):
+            return {'status': 'error', 'error': "timeout inválido"}
+        if request.get('mode', 'legacy') not in SOLVER_MODES or request.get('slot_order', 'default') not in SLOT_STRATEGIES \
+                or request.get('value_order', 'default') not in VALUE_STRATEGIES or not ('grid' in request or 'path' in request):
+            return {'status': 'error', 'error': "pedido inválido (grid/path, mode, slot_order ou value_order)"}
+        self.queued += 1
+        try:
+            await self.slots.acquire()  # Aguardando aqui = na fila
+        finally:
+            self.queued -= 1
+        self.running += 1
+        try:
+            work = self.executor.submit(solve_request, seq, request, timeout)
+        except Exception as error:  # Pool quebrado ou encerrado: o pedido nem chegou a um worker
+            self.release_slot()
+            return {'status': 'error', 'error': repr(error), 'latency': round(time.perf_counter() - arrival, 4)}
+        # O worker só fica livre quando o pedido termina de fato: o slot é devolvido por ele, não por quem desistiu de esperar
+        loop = asyncio.get_running_loop()
+        work.add_done_callback(lambda _: loop.is_closed() or loop.call_soon_threadsafe(self.release_slot))
+        try:
+            result: Dict[str, Any] = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(work)), timeout + TIMEOUT_GRACE)
+        except asyncio.TimeoutError:
+            self.cancelled[seq % CANCEL_SLOTS] = seq  # O worker para no próximo ponto de verificação
+            result = {'status': 'timeout', 'rows': None, 'error': "o worker não respondeu dentro do prazo"}
+        except asyncio.CancelledError:
+            self.cancelled[seq % CANCEL_SLOTS] = seq
+            raise
+        except Exception as error:  # Um pedido com problema não derruba o serviço
+            result = {'status': 'error', 'error': repr(error)}
+        result['latency'] = round(time.perf_counter() - arrival, 4)
+        return result
+
+    def release_slot(self) -> None:
+        self.running -= 1
+        self.slots.release()
+
+    # Cancela um pedido: se ainda está na fila, nunca chega a um worker; se está em execução, o worker para
+    # no próximo ponto de verificação e a resposta sai como 'cancelled'
+    def cancel(self, request_id: Any) -> bool:
+        entry = self.tasks.get(request_id)
+        if entry is None:
+            return False
+        seq, task = entry
+        self.cancelled[seq % CANCEL_SLOTS] = seq
+        task.cancel()
+        return True
+
+    # Resolve o pedido e envia a resposta (também quando ele é cancelado)
+    async def run(self, request_id: Any, seq: int, request: Dict[str, Any], respond: Respond) -> None:
+        try:
+            result: Dict[str, Any] = await self.solve(seq, request)
+            if 'latency' in result:
+                self.latencies.append(result['latency'])
+        except asyncio.CancelledError:
+            result = {'status': 'cancelled'}
+        self.tasks.pop(request_id, None)
+        self.counts[result['status']] += 1
+        await respond(dict({'id': request_id}, **result))
+
+    def stats(self) -> Dict[str, Any]:
+        latencies: List[float] = list(self.latencies)
+        return {
+            'queue_depth': self.queued,
+            'running': self.running,
+            'workers': self.workers,
+            'completed': dict(self.counts),
+            'latency_ms': {name: round(percentile(latencies, fraction) * 1000, 2) for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))}
+                          if latencies else None,
+            'uptime': round(time.perf_counter() - self.start_time, 2),
+        }
+
+    # Lê pedidos de um stream até o fim (ou até um shutdown) e espera as respostas pendentes
+    async def serve_stream(self, reader: asyncio.StreamReader, respond: Respond) -> None:
+        while not self.closing.is_set():
+            read = asyncio.ensure_future(reader.readline())
+            closing = asyncio.ensure_future(self.closing.wait())
+            done, _ = await asyncio.wait({read, closing}, return_when=asyncio.FIRST_COMPLETED)
+            if read not in done:
+                read.cancel()
+                break
+            closing.cancel()
+            line: bytes = read.result()
+            if not line:
+                break
+            if line.strip():
+                await self.handle_line(line.decode('utf-8'), respond)
+
+    async def drain(self) -> None:
+        pending = [task for _, task in self.tasks.values()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # Protocolo por stdin/stdout (uma linha JSON por pedido e por resposta)
+    async def serve_stdio(self) -> None:
+        self.start_loop_state()
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        async def respond(message: Dict[str, Any]) -> None:
+            sys.stdout.write(json.dumps(message, ensure_ascii=False) + '\n')
+            sys.stdout.flush()
+
+        await self.serve_stream(reader, respond)
+        await self.drain()
+
+    # Protocolo por socket Unix: cada conexão é um stream independente, com pedidos concorrentes
+    async def serve_unix(self, path: str) -> None:
+        self.start_loop_state()
+
+        async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            async def respond(message: Dict[str, Any]) -> None:
+                if not writer.is_closing():
+                    writer.write((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+                    await writer.drain()
+
+            await self.serve_stream(reader, respond)
+            await self.drain()
+            writer.close()
+
+        if os.path.exists(path):
+            os.remove(path)
+        server = await asyncio.start_unix_server(connection, path)
+        logger.info(f"Serviço escutando em {path}")
+        async with server:
+            await self.closing.wait()
+        await self.drain()
+        os.remove(path)
+
+    def start_loop_state(self) -> None:
+        self.slots = asyncio.Semaphore(self.workers)
+        self.closing = asyncio.Event()
+
+    def close(self) -> None:
+        for seq, _ in self.tasks.values():
+            self.cancelled[seq % CANCEL_SLOTS] = seq
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serviço de resolução: pedidos em linhas JSON por stdin/stdout ou socket Unix")
+    parser.add_argument('--words', default='src/files/lista_palavras.txt')
+    parser.add_argument('--scorer', choices=sorted(WORD_SCORERS), default=None, help="pontuação que ordena as palavras (padrão: a do índice compilado)")
+    parser.add_argument('--workers', type=int, default=None, help="processos (padrão: todos os núcleos)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="prazo padrão por pedido, em segundos")
+    parser.add_argument('--socket', default=None, metavar='CAMINHO', help="atende por um socket Unix em vez de stdin/stdout")
+    args = parser.parse_args()
+
+    logger.setLevel('WARNING')  # O log por pedido só geraria ruído; o protocolo usa apenas o stdout
+    service = SolverService(args.words, args.workers, args.timeout, args.scorer)
+    try:
+        if args.socket:
+            asyncio.run(service.serve_unix(args.socket))
+        else:
+            asyncio.run(service.serve_stdio())
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()
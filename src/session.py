@@ -0,0 +1,32 @@
+from typing import Dict, Tuple, Set, Optional
+from placements import PlacedWords
+from slots import SlotGraph
+from pattern_cache import PatternCache
+from metrics import SolveMetrics
+from anytime import AnytimeControl
+from nogoods import NogoodStore
+from validation import GridValidator
+
+SlotKey = Tuple[int, int, str]  # (linha, coluna, direção)
+
+# Estado de uma única resolução do solver legado (solve/fill_grid_max).
+# Antes esse estado ficava em argumentos padrão mutáveis e vazava entre chamadas no mesmo processo;
+# agora cada pedido cria a sua sessão, e o mesmo dicionário carregado pode atender muitas resoluções.
+class SolverSession:
+    __slots__ = ('used_words', 'attempt_count', 'tried_words', 'nogoods', 'removal_attempts', 'slot_graph', 'pattern_cache', 'metrics', 'anytime', 'validator')
+
+    def __init__(self, slot_graph: Optional[SlotGraph] = None, pattern_cache: Optional[PatternCache] = None,
+                 metrics: Optional[SolveMetrics] = None, anytime: Optional[AnytimeControl] = None):
+        self.used_words: PlacedWords = PlacedWords()  # Palavras colocadas, com índice de células e de texto
+        self.attempt_count: Dict[SlotKey, int] = {}
+        self.tried_words: Dict[SlotKey, Set[str]] = {}
+        self.nogoods: NogoodStore = NogoodStore()  # Padrões sem palavras no dicionário (conflitos reais), com memória limitada
+        self.removal_attempts: Dict[str, int] = {}
+        self.slot_graph: Optional[SlotGraph] = slot_graph
+        self.pattern_cache: Optional[PatternCache] = pattern_cache  # Consultas por padrão memorizadas (o resultado depende só do dicionário)
+        self.metrics: SolveMetrics = metrics if metrics is not None else SolveMetrics(timing=False)
+        self.anytime: Optional[AnytimeControl] = anytime  # Prazo e orçamento de nós, com o melhor parcial
+        self.validator: Optional[GridValidator] = None  # Validação incremental pelo grafo de slots (criada na primeira validação)
+
+    def is_word_used(self, word: str) -> bool:
+        return self.used_words.contains_word(word)
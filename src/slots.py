@@ -0,0 +1,188 @@
+from typing import List, Tuple, Dict, Optional, Set
+
+# Espaço (slot) horizontal ou vertical do grid, com a lista de células que ocupa
+class Slot:
+    __slots__ = ('id', 'row', 'col', 'direction', 'length', 'cells')
+
+    def __init__(self, slot_id: int, row: int, col: int, direction: str, length: int):
+        self.id: int = slot_id
+        self.row: int = row
+        self.col: int = col
+        self.direction: str = direction
+        self.length: int = length
+        if direction == 'H':
+            self.cells: List[Tuple[int, int]] = [(row, col + i) for i in range(length)]
+        else:
+            self.cells = [(row + i, col) for i in range(length)]
+
+# Grafo de slots construído uma única vez a partir do grid carregado.
+# Guarda todos os slots H/V, a tabela de cruzamentos (slot, índice) -> (outro slot, índice)
+# e o estado de cada slot (padrão atual, letras fixas, células abertas), atualizado
+# incrementalmente a cada célula alterada, sem reescanear o grid.
+# Com `only`, apenas os slots com essas posições (linha, coluna, direção) entram no grafo: as células dos outros
+# trechos contínuos valem como letras fixas dos slots que passam por elas (ex.: um recorte do grid).
+class SlotGraph:
+    def __init__(self, grid: List[List[str]], only: Optional[Set[Tuple[int, int, str]]] = None):
+        self.height: int = len(grid)
+        self.width: int = len(grid[0]) if grid else 0
+        self.slots: List[Slot] = []
+        self.slot_at: Dict[Tuple[int, int, str], int] = {}  # {(linha, coluna, direção): id do slot}
+        self.cell_slots: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}  # {célula: [(id do slot, índice na palavra)]}
+        self.crossings: Dict[Tuple[int, int], Tuple[int, int]] = {}  # {(slot, índice): (outro slot, índice)}
+        self.neighbors: List[List[Tuple[int, int, int]]] = []  # [slot] -> [(índice, outro slot, índice no outro)]
+        self.cells: Dict[Tuple[int, int], str] = {}  # Conteúdo atual das células que pertencem a algum slot
+
+        self._find_slots(grid, 'H', only)
+        self._find_slots(grid, 'V', only)
+        for cell, owners in self.cell_slots.items():
+            if len(owners) == 2:
+                (first, first_index), (second, second_index) = owners
+                self.crossings[(first, first_index)] = (second, second_index)
+                self.crossings[(second, second_index)] = (first, first_index)
+                self.neighbors[first].append((first_index, second, second_index))
+                self.neighbors[second].append((second_index, first, first_index))
+
+        # Estado incremental de cada slot
+        self.patterns: List[List[str]] = [[self.cells[cell] for cell in slot.cells] for slot in self.slots]
+        self.fixed_counts: List[int] = [sum(1 for char in pattern if char != '?') for pattern in self.patterns]
+        self.open_counts: List[int] = [slot.length - fixed for slot, fixed in zip(self.slots, self.fixed_counts)]
+        self.open_cells: int = sum(1 for char in self.cells.values() if char == '?')
+        self.dirty: Set[int] = set(range(len(self.slots)))  # Slots com células alteradas desde a última validação
+        # Mesma métrica de interseções usada por find_free_spaces: letras nas células vizinhas perpendiculares
+        self.adjacent_letters: List[int] = [0] * len(self.slots)
+        for row in range(self.height):
+            for col in range(self.width):
+                if grid[row][col] not in '.?':
+                    self._update_adjacent(row, col, 1)
+
+    # Detecta os slots (duas ou mais células) em uma direção, na mesma ordem de find_free_spaces
+    def _find_slots(self, grid: List[List[str]], direction: str, only: Optional[Set[Tuple[int, int, str]]] = None) -> None:
+        outer, inner = (self.height, self.width) if direction == 'H' else (self.width, self.height)
+        for line in range(outer):
+            position = 0
+            while position < inner:
+                row, col = (line, position) if direction == 'H' else (position, line)
+                if grid[row][col] == '.':
+                    position += 1
+                    continue
+                start = position
+                while position < inner and (grid[line][position] if direction == 'H' else grid[position][line]) != '.':
+                    position += 1
+                row, col = (line, start) if direction == 'H' else (start, line)
+                if position - start > 1 and (only is None or (row, col, direction) in only):
+                    slot = Slot(len(self.slots), row, col, direction, position - start)
+                    self.slots.append(slot)
+                    self.neighbors.append([])
+                    self.slot_at[(row, col, direction)] = slot.id
+                    for index, (cell_row, cell_col) in enumerate(slot.cells):
+                        self.cell_slots.setdefault((cell_row, cell_col), []).append((slot.id, index))
+                        self.cells[(cell_row, cell_col)] = grid[cell_row][cell_col]
+
+    # Atualiza o contador de letras vizinhas dos slots perpendiculares à célula alterada
+    def _update_adjacent(self, row: int, col: int, delta: int) -> None:
+        for neighbor_row, neighbor_col, direction in ((row - 1, col, 'H'), (row + 1, col, 'H'), (row, col - 1, 'V'), (row, col + 1, 'V')):
+            for slot_id, _ in self.cell_slots.get((neighbor_row, neighbor_col), ()):
+                if self.slots[slot_id].direction == direction:
+                    self.adjacent_letters[slot_id] += delta
+
+    # Altera uma célula e atualiza em O(1) o estado dos (no máximo dois) slots que passam por ela
+    def set_cell(self, row: int, col: int, char: str) -> None:
+        old_char: Optional[str] = self.cells.get((row, col))
+        if old_char is None or old_char == char:
+            return
+        self.cells[(row, col)] = char
+        opened: bool = char == '?'
+        if old_char == '?' or opened:
+            delta = -1 if opened else 1
+            self.open_cells -= delta
+            self._update_adjacent(row, col, delta)
+        for slot_id, index in self.cell_slots[(row, col)]:
+            self.patterns[slot_id][index] = char
+            self.dirty.add(slot_id)
+            if old_char == '?':
+                self.fixed_counts[slot_id] += 1
+                self.open_counts[slot_id] -= 1
+            elif opened:
+                self.fixed_counts[slot_id] -= 1
+                self.open_counts[slot_id] += 1
+
+    # Relê do grid as células de uma palavra colocada/removida: O(tamanho da palavra)
+    def sync_word(self, grid: List[List[str]], row: int, col: int, direction: str, length: int) -> None:
+        for i in range(length):
+            cell_row, cell_col = (row, col + i) if direction == 'H' else (row + i, col)
+            self.set_cell(cell_row, cell_col, grid[cell_row][cell_col])
+
+    def pattern(self, slot_id: int) -> str:
+        return ''.join(self.patterns[slot_id])
+
+    def pattern_at(self, row: int, col: int, direction: str) -> str:
+        return self.pattern(self.slot_at[(row, col, direction)])
+
+    def is_complete(self) -> bool:
+        return self.open_cells == 0
+
+    # Equivalente a find_free_spaces, mas lido do estado incremental (independe da área do grid)
+    def free_spaces(self) -> List[Tuple[int, int, int, str, int, int]]:
+        free_spaces: List[Tuple[int, int, int, str, int, int]] = [
+            (slot.row, slot.col, slot.length, slot.direction, self.fixed_counts[slot.id], self.adjacent_letters[slot.id])
+            for slot in self.slots
+        ]
+        free_spaces.sort(key=lambda x: (-x[5], -x[2], -x[4]))
+        return free_spaces
+
+    # Componentes conexos do grafo de cruzamentos: slots de componentes diferentes não compartilham células
+    def components(self) -> List[List[int]]:
+        seen: List[bool] = [False] * len(self.slots)
+        components: List[List[int]] = []
+        for start in range(len(self.slots)):
+            if seen[start]:
+                continue
+            seen[start] = True
+            component: List[int] = [start]
+            stack: List[int] = [start]
+            while stack:
+                for _, other, _ in self.neighbors[stack.pop()]:
+                    if not seen[other]:
+                        seen[other] = True
+                        component.append(other)
+                        stack.append(other)
+            components.append(sorted(component))
+        return components
+
+    # Slots de articulação (Tarjan, DFS iterativa): removê-los separa o componente em partes independentes
+    def articulation_slots(self) -> Set[int]:
+        count: int = len(self.slots)
+        discovery: List[int] = [-1] * count
+        low: List[int] = [0] * count
+        cuts: Set[int] = set()
+        time: int = 0
+        for root in range(count):
+            if discovery[root] >= 0:
+                continue
+            discovery[root] = low[root] = time
+            time += 1
+            root_children: int = 0
+            stack: List[Tuple[int, int, int]] = [(root, -1, 0)]  # (slot, pai, próximo vizinho a visitar)
+            while stack:
+                slot_id, parent, position = stack[-1]
+                neighbors = self.neighbors[slot_id]
+                if position < len(neighbors):
+                    stack[-1] = (slot_id, parent, position + 1)
+                    other: int = neighbors[position][1]
+                    if discovery[other] < 0:
+                        discovery[other] = low[other] = time
+                        time += 1
+                        stack.append((other, slot_id, 0))
+                        if slot_id == root:
+                            root_children += 1
+                    elif other != parent:
+                        low[slot_id] = min(low[slot_id], discovery[other])
+                    continue
+                stack.pop()
+                if parent >= 0:
+                    low[parent] = min(low[parent], low[slot_id])
+                    if parent != root and low[slot_id] >= discovery[parent]:
+                        cuts.add(parent)
+            if root_children > 1:
+                cuts.add(root)
+        return cuts
@@ -1,69 +1,96 @@
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Tuple, Set, Optional
 from grid import *
 from utils import *
-from trie import Trie
+from pattern_index import PatternIndex
+from slots import SlotGraph
+from compact_grid import Grid
+from session import SolverSession
+from nogoods import NogoodStore
+from pattern_cache import PatternCache
+from tracing import tracer
+from anytime import snapshot_grid
+from validation import GridValidator
 from logger_config import setup_logger
 
 logger = setup_logger()
 
-def solve(grid: List[List[str]], words_trie: Trie, word_size_map: Dict[int, List[str]], 
-          used_words: List[Tuple[str, int, int, str]] = [], 
-          attempt_count: Dict[Tuple[int, int, str], int] = {}, 
-          depth: int = 0, max_depth: int = 99999, 
-          tried_words: Dict[Tuple[int, int, str], Set[str]] = {}, 
-          removed_words: List[str] = [], retry_limit: int = 10, removal_attempts: Dict[str, int] = {}) -> bool:
-
-    # Verifica se o grid está completamente preenchido
-    if is_grid_complete(grid):
-        # Verifica se todas as palavras formadas no grid são válidas
-        if validate_all_words_in_grid(grid, words_trie):
+def solve(grid: List[List[str]], words_index: PatternIndex, word_size_map: Dict[int, List[str]],
+          session: Optional[SolverSession] = None,
+          depth: int = 0, max_depth: int = 99999, retry_limit: int = 10) -> bool:
+    # Todo o estado da resolução fica na sessão (criada por chamada, nunca compartilhada entre resoluções)
+    if session is None:
+        session = SolverSession()
+    used_words = session.used_words
+    attempt_count = session.attempt_count
+    tried_words = session.tried_words
+    nogoods = session.nogoods
+    slot_graph = session.slot_graph
+    metrics = session.metrics
+    metrics.node(depth)  # Cada chamada é um nó da busca
+    if session.anytime is not None:  # Prazo/orçamento: levanta BudgetExhausted; guarda o parcial com mais slots válidos
+        session.anytime.tick(metrics.nodes_expanded)
+        session.anytime.offer(count_valid_slots(words_index, session, len(used_words)), lambda: snapshot_grid(grid))
+    if tracer.progress:  # Amostragem de progresso
+        tracer.node(depth, len(used_words), len(slot_graph.slots) if slot_graph is not None else 0)
+
+    # Verifica se o grid está completamente preenchido (pelo estado incremental dos slots, se disponível)
+    if slot_graph.is_complete() if slot_graph is not None else is_grid_complete(grid):
+        # Verifica se todas as palavras formadas no grid são válidas (todas as inválidas são listadas em uma passada)
+        invalid_words: List[Tuple[str, int, int, str]] = metrics.timed('validation', get_invalid_words, grid, words_index, session)
+        if not invalid_words:
             logger.info("O jogo foi concluído com sucesso!")  # Mensagem de sucesso
-            print_grid(grid)  # Imprime o grid final
+            print_grid(grid, force=True)  # Imprime o grid final
             # Listar todas as palavras utilizadas
-            logger.info("\nPalavras utilizadas no grid:")
-            for word, row, col, direction in used_words:
-                logger.info(f"Palavra: {word} | Posição: ({row}, {col}) | Direção: {direction}")
+            if tracer.steps:
+                logger.info("\nPalavras utilizadas no grid:")
+                for word, row, col, direction in used_words:
+                    logger.info(f"Palavra: {word} | Posição: ({row}, {col}) | Direção: {direction}")
             return True
         else:
             # Se palavras inválidas forem detectadas, remove as que cruzam a palavra inválida
-            logger.info("Grid completo, mas com palavras inválidas. Iniciando backtracking para corrigir...")
-            for word, row, col, direction in get_all_words_from_grid(grid):
-                if not words_trie.search_with_pattern(word):
-                    logger.info(f"Palavra inválida detectada: {word} na posição ({row}, {col}) na direção {direction}.")
-                    # Remover todas as palavras que cruzam essa palavra inválida
-                    remove_intersecting_words_for_invalid(grid, word, row, col, direction, used_words, words_trie)
-
-                    # Agora tentar encontrar uma nova palavra para substituir o espaço onde estava a palavra inválida
-                    logger.info(f"Tentando preencher o espaço onde estava '{word}' na posição ({row}, {col}) na direção {direction}.")
-                    
-                    # Obter o tamanho máximo e as letras existentes naquele espaço
-                    max_length, existing_letters = find_max_word_length_and_existing_letters(grid, row, col, direction)
-                    pattern: str = create_pattern_from_existing_letters(max_length, existing_letters)
-                    
-                    # Encontrar novas palavras que podem ser colocadas naquele espaço
-                    matching_words = words_trie.search_with_pattern(pattern)
-                    matching_words = [w for w in matching_words if len(w) == max_length and w not in removed_words]
-                    
-                    if matching_words:
-                        matching_words = prioritize_words(matching_words)
-                        new_word = matching_words[0]  # Escolher a nova palavra a ser colocada
-                        place_word(grid, new_word, row, col, direction)
-                        logger.info(f"Nova palavra '{new_word}' colocada na posição ({row}, {col}) na direção {direction}.")
-                        used_words.append((new_word, row, col, direction))
-                        print_grid(grid)
-                    else:
-                        logger.info(f"Não foi possível encontrar uma nova palavra para substituir '{word}'. Continuando backtracking...")
-                    return solve(grid, words_trie, word_size_map, used_words, attempt_count, depth, max_depth, tried_words, removed_words, retry_limit)
+            if tracer.steps:
+                logger.info("Grid completo, mas com palavras inválidas. Iniciando backtracking para corrigir...")
+            # Repara a primeira palavra inválida (o validador já listou todas; as demais são revistas na próxima chamada)
+            word, row, col, direction = invalid_words[0]
+            if tracer.steps:
+                logger.info(f"Palavra inválida detectada: {word} na posição ({row}, {col}) na direção {direction}.")
+            # Remover todas as palavras que cruzam essa palavra inválida
+            remove_intersecting_words_for_invalid(grid, word, row, col, direction, used_words, words_index, slot_graph)
+
+            # Agora tentar encontrar uma nova palavra para substituir o espaço onde estava a palavra inválida
+            if tracer.steps:
+                logger.info(f"Tentando preencher o espaço onde estava '{word}' na posição ({row}, {col}) na direção {direction}.")
+            
+            # Obter o tamanho máximo e as letras existentes naquele espaço
+            pattern: str = get_slot_pattern(grid, row, col, direction, slot_graph)
+            
+            # Encontrar novas palavras que podem ser colocadas naquele espaço
+            matching_words = get_candidates(words_index, pattern, session)
+            if not matching_words:
+                nogoods.add(pattern, words_index)  # Conflito real: nenhuma palavra do dicionário tem estas letras de cruzamento
+            # Escolher a nova palavra a ser colocada (a primeira que não completa um nogood num slot cruzado)
+            new_word = next((w for w in matching_words if not crosses_nogood(w, row, col, direction, nogoods, slot_graph)), None)
+            
+            if new_word is not None:
+                place_word(grid, new_word, row, col, direction, slot_graph)
+                if tracer.steps:
+                    logger.info(f"Nova palavra '{new_word}' colocada na posição ({row}, {col}) na direção {direction}.")
+                used_words.append((new_word, row, col, direction))
+                print_grid(grid)
+            elif tracer.steps:
+                logger.info(f"Não foi possível encontrar uma nova palavra para substituir '{word}'. Continuando backtracking...")
+            return solve(grid, words_index, word_size_map, session, depth, max_depth, retry_limit)
 
     # Encontra todos os espaços livres disponíveis no grid, priorizando interseções
-    free_spaces: List[Tuple[int, int, int, str, int, int]] = find_free_spaces(grid)
+    free_spaces: List[Tuple[int, int, int, str, int, int]] = metrics.timed('scan', get_free_spaces, grid, slot_graph)
 
     # Itera sobre cada espaço livre encontrado
     for row, col, length, direction, fixed_letters, intersecoes in free_spaces:
-        max_length, existing_letters = find_max_word_length_and_existing_letters(grid, row, col, direction)
-        pattern: str = create_pattern_from_existing_letters(max_length, existing_letters)
-        matching_words: List[str] = [word for word in words_trie.search_with_pattern(pattern) if len(word) == max_length and word not in removed_words]
-        matching_words = prioritize_words(matching_words)
+        pattern: str = metrics.timed('scan', get_slot_pattern, grid, row, col, direction, slot_graph)
+        # Candidatas já ordenadas por prioridade (cache LRU da sessão)
+        matching_words: Tuple[str, ...] = get_candidates(words_index, pattern, session)
+        if not matching_words:
+            nogoods.add(pattern, words_index)  # Conflito real: nenhuma palavra do dicionário tem estas letras de cruzamento
 
         # Controle de tentativas e colocação de palavras
         if (row, col, direction) not in tried_words:
@@ -73,49 +100,66 @@ def solve(grid: List[List[str]], words_trie: Trie, word_size_map: Dict[int, List
             attempt_count[(row, col, direction)] = 0
 
         if attempt_count[(row, col, direction)] >= 10:
-            logger.info(f"Tentativas esgotadas para o espaço ({row}, {col}) na direção {direction}. Tentando outro espaço.")
+            if tracer.steps:
+                logger.info(f"Tentativas esgotadas para o espaço ({row}, {col}) na direção {direction}. Tentando outro espaço.")
             continue  # Passa para o próximo espaço disponível
 
         for word in matching_words:
             if word in tried_words[(row, col, direction)]:
                 continue
+            metrics.examine((row, col, direction))
 
-            if word not in [w[0] for w in used_words] and can_place_word(grid, word, row, col, direction):
+            # O teste de nogood (consultas memorizadas) vem antes da varredura do grid: a maioria das descartadas para nele
+            if (not session.is_word_used(word) and not crosses_nogood(word, row, col, direction, nogoods, slot_graph)
+                    and metrics.timed('scan', can_place_word, grid, word, row, col, direction)):
                 # Apenas uma vez log e impressão
-                place_word(grid, word, row, col, direction)
+                metrics.timed('update', place_word, grid, word, row, col, direction, slot_graph)
                 used_words.append((word, row, col, direction))
-                print_grid(grid)  # Imprime o grid após colocar a palavra
+                metrics.timed('logging', print_grid, grid)  # Imprime o grid após colocar a palavra
 
                 attempt_count[(row, col, direction)] = 0
 
-                if solve(grid, words_trie, word_size_map, used_words, attempt_count, depth + 1, max_depth, tried_words, removed_words, retry_limit):
+                if solve(grid, words_index, word_size_map, session, depth + 1, max_depth, retry_limit):
                     return True
 
-                logger.info(f"Backtracking: removendo palavra '{word}' da posição ({row}, {col}) na direção {direction}.")
-                remove_word(grid, word, row, col, direction, used_words)  # Remoção também ocorre uma vez
-                used_words.pop()
-                removed_words.append(word)
+                if tracer.steps:
+                    logger.info(f"Backtracking: removendo palavra '{word}' da posição ({row}, {col}) na direção {direction}.")
+                # A palavra pode já ter saído numa remoção de palavras bloqueantes mais abaixo na recursão:
+                # o topo da lista não é necessariamente ela
+                if (word, row, col, direction) in used_words:
+                    metrics.timed('update', remove_word, grid, word, row, col, direction, used_words, slot_graph)  # Remoção também ocorre uma vez
+                    used_words.remove((word, row, col, direction))
+                metrics.backtracks += 1
                 attempt_count[(row, col, direction)] += 1
                 tried_words[(row, col, direction)].add(word)
         
         # Se o espaço não puder ser preenchido, tenta remover palavras bloqueantes
         if not matching_words or attempt_count[(row, col, direction)] >= retry_limit:
-            if is_grid_complete(grid):
+            if slot_graph.is_complete() if slot_graph is not None else is_grid_complete(grid):
                 # Validação adicional para garantir que o grid está quase completo
-                logger.info("O grid está quase completo, validando antes de remover palavras.")
-                if validate_all_words_in_grid(grid, words_trie):
+                if tracer.steps:
+                    logger.info("O grid está quase completo, validando antes de remover palavras.")
+                if not metrics.timed('validation', get_invalid_words, grid, words_index, session):
                     return True
-            if remove_blocking_words(grid, row, col, direction, used_words, removed_words, removal_attempts):
+            if metrics.timed('update', remove_blocking_words, grid, row, col, direction, used_words, session.removal_attempts, slot_graph):
+                metrics.backtracks += 1
                 attempt_count[(row, col, direction)] = 0
-                if solve(grid, words_trie, word_size_map, used_words, attempt_count, depth + 1, max_depth, tried_words, removed_words, retry_limit):
+                if solve(grid, words_index, word_size_map, session, depth + 1, max_depth, retry_limit):
                     return True
 
     return False
 
 # Função para preencher o grid ao máximo antes do backtracking, priorizando palavras com mais interseções e maior comprimento
-def fill_grid_max(grid: List[List[str]], words_trie: Trie, word_size_map: Dict[int, List[str]], used_words: List[Tuple[str, int, int, str]] = []) -> bool:
+def fill_grid_max(grid: List[List[str]], words_index: PatternIndex, word_size_map: Dict[int, List[str]],
+                  session: Optional[SolverSession] = None) -> bool:
+    if session is None:
+        session = SolverSession()
+    used_words = session.used_words
+    slot_graph = session.slot_graph
+    metrics = session.metrics
+
     # Encontra todos os espaços livres no grid
-    free_spaces: List[Tuple[int, int, int, str, int, int]] = find_free_spaces(grid)
+    free_spaces: List[Tuple[int, int, int, str, int, int]] = metrics.timed('scan', get_free_spaces, grid, slot_graph)
 
     # Continua tentando preencher enquanto houver espaços livres
     while free_spaces:
@@ -126,27 +170,23 @@ def fill_grid_max(grid: List[List[str]], words_trie: Trie, word_size_map: Dict[i
 
         # Itera sobre cada espaço livre encontrado
         for row, col, length, direction, fixed_letters, intersecoes in free_spaces:  
-            # Para o espaço atual, calcula o comprimento máximo possível e as letras já presentes
-            max_length, existing_letters = find_max_word_length_and_existing_letters(grid, row, col, direction)
-            # Cria um padrão com base nas letras já presentes no grid
-            pattern: str = create_pattern_from_existing_letters(max_length, existing_letters)
-            # Encontra palavras que se encaixam no padrão e têm o comprimento correto
+            # Cria um padrão com base nas letras já presentes no espaço atual
+            pattern: str = metrics.timed('scan', get_slot_pattern, grid, row, col, direction, slot_graph)
+            # Encontra palavras que se encaixam no padrão, já ordenadas por prioridade (mais vogais primeiro)
             matching_words: List[str] = [
-                word for word in words_trie.search_with_pattern(pattern)
-                if len(word) == max_length and word not in [w[0] for w in used_words]
+                word for word in get_candidates(words_index, pattern, session)
+                if not session.is_word_used(word)
             ]
 
-            # Ordena as palavras correspondentes por prioridade (mais vogais primeiro)
-            matching_words.sort(key=lambda word: (count_vowels(word), priority_removal_criteria(word)), reverse=True)
-
             # Tenta inserir as palavras correspondentes no grid
             if matching_words:
                 for word in matching_words:
+                    metrics.examine((row, col, direction))
                     # Verifica se a palavra pode ser colocada na posição e direção especificadas
-                    if can_place_word(grid, word, row, col, direction):
+                    if metrics.timed('scan', can_place_word, grid, word, row, col, direction):
                         # Coloca a palavra no grid
-                        place_word(grid, word, row, col, direction)
-                        print_grid(grid)  # Imprime o grid com a palavra colocada
+                        metrics.timed('update', place_word, grid, word, row, col, direction, slot_graph)
+                        metrics.timed('logging', print_grid, grid)  # Imprime o grid com a palavra colocada
                         used_words.append((word, row, col, direction))  # Adiciona a palavra à lista de usadas
                         space_filled = True  # Marca que um espaço foi preenchido
                         break  # Sai do loop para tentar preencher o próximo espaço
@@ -155,11 +195,61 @@ def fill_grid_max(grid: List[List[str]], words_trie: Trie, word_size_map: Dict[i
         if not space_filled:
             logger.info("Nenhuma palavra pode ser preenchida mais. Iniciando backtracking.")
             # Chama a função de resolução (backtracking) para tentar resolver o grid
-            return solve(grid, words_trie, word_size_map, used_words=used_words)
+            return solve(grid, words_index, word_size_map, session)
 
         # Atualiza os espaços livres após a inserção de uma palavra
-        free_spaces = find_free_spaces(grid)
+        free_spaces = metrics.timed('scan', get_free_spaces, grid, slot_graph)
 
     # Quando todos os espaços possíveis forem preenchidos, inicia o backtracking para completar o grid
     logger.info("Preenchimento máximo concluído, iniciando backtracking para completar o grid.")
-    return solve(grid, words_trie, word_size_map, used_words=used_words)
+    return solve(grid, words_index, word_size_map, session)
+
+# Espaços livres lidos do grafo de slots (incremental) ou, sem ele, reescaneando o grid
+def get_free_spaces(grid: List[List[str]], slot_graph: Optional[SlotGraph]) -> List[Tuple[int, int, int, str, int, int]]:
+    if slot_graph is not None:
+        return slot_graph.free_spaces()
+    return find_free_spaces(grid)
+
+# Padrão atual de um espaço, lido do grafo de slots ou reconstruído a partir do grid
+def get_slot_pattern(grid: List[List[str]], row: int, col: int, direction: str, slot_graph: Optional[SlotGraph]) -> str:
+    if slot_graph is not None:
+        return slot_graph.pattern_at(row, col, direction)
+    if isinstance(grid, Grid) and (row, col, direction) in grid.slot_indices:
+        return grid.pattern(row, col, direction)
+    max_length, existing_letters = find_max_word_length_and_existing_letters(grid, row, col, direction)
+    return create_pattern_from_existing_letters(max_length, existing_letters)
+
+# Candidatas para o padrão em ordem de prioridade, pelo cache da sessão (criado na primeira consulta)
+def get_candidates(words_index: PatternIndex, pattern: str, session: SolverSession) -> Tuple[str, ...]:
+    if session.pattern_cache is None:
+        session.pattern_cache = PatternCache(words_index)
+    session.metrics.pattern_queries += 1
+    return session.metrics.timed('lookup', session.pattern_cache.candidates, pattern)
+
+# Palavras inválidas do grid completo: pelo validador incremental da sessão (só os slots alterados desde a última
+# validação são testados) ou, sem grafo de slots, em uma varredura do grid
+def get_invalid_words(grid: List[List[str]], words_index: PatternIndex, session: SolverSession) -> List[Tuple[str, int, int, str]]:
+    if session.slot_graph is None:
+        return find_invalid_words(grid, words_index)
+    if session.validator is None:
+        session.validator = GridValidator(session.slot_graph, words_index)
+    return session.validator.invalid_words()
+
+# A palavra deixaria algum slot cruzado (ainda livre na célula do cruzamento) com um padrão que contém um nogood?
+def crosses_nogood(word: str, row: int, col: int, direction: str, nogoods: NogoodStore, slot_graph: Optional[SlotGraph]) -> bool:
+    if slot_graph is None or not nogoods:
+        return False
+    for index, other, other_index in slot_graph.neighbors[slot_graph.slot_at[(row, col, direction)]]:
+        letters: List[str] = slot_graph.patterns[other]
+        if letters[other_index] == '?':
+            if nogoods.blocked(''.join(letters[:other_index]) + word[index] + ''.join(letters[other_index + 1:])):
+                return True
+    return False
+
+# Slots completos com palavras válidas, pelo mesmo validador incremental (sem grafo de slots, as palavras colocadas)
+def count_valid_slots(words_index: PatternIndex, session: SolverSession, placed: int) -> int:
+    if session.slot_graph is None:
+        return placed
+    if session.validator is None:
+        session.validator = GridValidator(session.slot_graph, words_index)
+    return session.validator.valid_slots()
@@ -0,0 +1,188 @@
+import argparse
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from typing import List, Dict, Tuple, Optional, Any
+
+# O mesmo logger do solver, sem configurar manipuladores: o CLI de reprodução não pode truncar o log.txt
+# (quem configura é o ponto de entrada do solver, via setup_logger)
+logger = logging.getLogger("crossword_solver")
+
+# Níveis de rastreamento do solver:
+#   off      - nenhum log passo a passo (os pontos quentes só testam um booleano, sem formatar strings)
+#   progress - off + uma linha periódica com nós/s, profundidade e melhor preenchimento
+#   full     - progress + log passo a passo e eventos JSONL, escritos de forma assíncrona (QueueHandler/QueueListener)
+TRACE_LEVELS = ('off', 'progress', 'full')
+DEFAULT_TRACE_PATH = 'src/files/trace.jsonl'
+
+# Enfileira o próprio dicionário do evento: a serialização em JSON acontece na thread do QueueListener
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class _JsonEventFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, ensure_ascii=False, separators=(',', ':'))
+
+class Tracer:
+    def __init__(self):
+        self.level: str = 'off'
+        self.steps: bool = False  # Log passo a passo e eventos (nível full)
+        self.progress: bool = False  # Amostragem periódica de progresso (progress e full)
+        self.interval: float = 1.0
+        self.sample: int = 256  # O relógio só é consultado a cada `sample` nós
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.events: Optional[logging.Logger] = None
+        self.replaced_handlers: List[logging.Handler] = []
+        self.reset()
+
+    def reset(self) -> None:
+        self.nodes: int = 0
+        self.best_fill: float = 0.0
+        self.start_time: float = time.perf_counter()
+        self.last_report: float = self.start_time
+        self.last_nodes: int = 0
+
+    def configure(self, level: str = 'off', path: str = DEFAULT_TRACE_PATH, interval: float = 1.0, sample: int = 256) -> None:
+        if level not in TRACE_LEVELS:
+            raise ValueError(f"Nível de rastreamento desconhecido: {level}")
+        self.close()
+        self.level = level
+        self.steps = level == 'full'
+        self.progress = level != 'off'
+        self.interval = interval
+        self.sample = sample
+        self.reset()
+        if self.steps:
+            self.start_listener(path)
+
+    # No nível full, o log de texto e os eventos passam por uma fila; a escrita em disco/console fica na thread do listener
+    def start_listener(self, path: str) -> None:
+        log_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+        event_handler = logging.FileHandler(path, mode='w', encoding='utf-8')
+        event_handler.setFormatter(_JsonEventFormatter())
+        event_handler.addFilter(lambda record: isinstance(record.msg, dict))
+        self.replaced_handlers = list(logger.handlers)
+        for handler in self.replaced_handlers:
+            handler.addFilter(lambda record: not isinstance(record.msg, dict))
+            logger.removeHandler(handler)
+        queue_handler = _DeferredQueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+        self.events = logging.getLogger("crossword_solver.trace")  # Herda o QueueHandler do logger principal
+        self.listener = logging.handlers.QueueListener(log_queue, event_handler, *self.replaced_handlers, respect_handler_level=True)
+        self.listener.start()
+
+    # Esvazia a fila e devolve ao logger os manipuladores originais
+    def close(self) -> None:
+        if self.listener is None:
+            return
+        self.listener.stop()
+        for handler in list(logger.handlers):
+            if isinstance(handler, _DeferredQueueHandler):
+                logger.removeHandler(handler)
+        for handler in self.replaced_handlers:
+            for log_filter in list(handler.filters):
+                handler.removeFilter(log_filter)
+            logger.addHandler(handler)
+        for handler in self.listener.handlers:
+            if handler not in self.replaced_handlers:
+                handler.close()
+        self.listener = None
+        self.events = None
+        self.replaced_handlers = []
+
+    # Evento estruturado (nível full); o chamador deve testar `tracer.steps` antes
+    def event(self, kind: str, **fields: Any) -> None:
+        if self.events is not None:
+            fields['e'] = kind
+            fields['t'] = round(time.perf_counter() - self.start_time, 6)
+            self.events.info(fields)
+
+    # Conta um nó da busca; o chamador deve testar `tracer.progress` antes
+    def node(self, depth: int, filled: int, total: int) -> None:
+        self.nodes += 1
+        if total and filled / total > self.best_fill:
+            self.best_fill = filled / total
+        if self.nodes % self.sample == 0:
+            now: float = time.perf_counter()
+            if now - self.last_report >= self.interval:
+                self.report(now, depth)
+
+    def report(self, now: float, depth: int) -> None:
+        rate: float = (self.nodes - self.last_nodes) / (now - self.last_report)
+        logger.info(f"[progresso] nós: {self.nodes} | {rate:.0f} nós/s | profundidade: {depth} | melhor preenchimento: {self.best_fill:.1%}")
+        if self.steps:
+            self.event('progress', nodes=self.nodes, rate=round(rate), depth=depth, best_fill=round(self.best_fill, 4))
+        self.last_report = now
+        self.last_nodes = self.nodes
+
+# Instância única, importada pelos módulos do solver; configure_trace a reconfigura no lugar
+tracer = Tracer()
+
+def configure_trace(level: str = 'off', path: str = DEFAULT_TRACE_PATH, interval: float = 1.0) -> Tracer:
+    tracer.configure(level, path, interval)
+    return tracer
+
+# --- Reprodução de um arquivo de eventos ---
+
+# Reconstrói o grid aplicando os eventos em ordem. Eventos do solver legado (place/remove) alteram o grid
+# diretamente; os do modo ac3 (assign/unassign) são sobrepostos ao grid inicial.
+def replay_events(events: List[Dict[str, Any]], until: Optional[int] = None) -> Tuple[List[List[str]], int]:
+    grid: List[List[str]] = []
+    assigned: Dict[Tuple[int, int, str], str] = {}
+    applied: int = 0
+    for step, event in enumerate(events):
+        if until is not None and step > until:
+            break
+        kind = event['e']
+        if kind == 'start':
+            grid = [list(row) for row in event['rows']]
+            assigned.clear()
+        elif kind in ('place', 'remove'):
+            # Em 'remove' o evento traz as letras que sobraram na posição (as que pertencem a outras palavras)
+            letters: str = event['w'] if kind == 'place' else event['left']
+            write_letters(grid, letters, event['r'], event['c'], event['d'])
+        elif kind == 'assign':
+            assigned[(event['r'], event['c'], event['d'])] = event['w']
+        elif kind == 'unassign':
+            assigned.pop((event['r'], event['c'], event['d']), None)
+        applied = step
+    for (row, col, direction), word in assigned.items():
+        write_letters(grid, word, row, col, direction)
+    return grid, applied
+
+def write_letters(grid: List[List[str]], letters: str, row: int, col: int, direction: str) -> None:
+    for i, letter in enumerate(letters):
+        if direction == 'H':
+            grid[row][col + i] = letter
+        else:
+            grid[row + i][col] = letter
+
+def read_events(path: str) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reproduz um arquivo de eventos do solver (nível de rastreamento full)")
+    parser.add_argument('trace', nargs='?', default=DEFAULT_TRACE_PATH)
+    parser.add_argument('--step', type=int, default=None, help="mostra o grid após este evento (padrão: o último)")
+    parser.add_argument('--summary', action='store_true', help="apenas conta os eventos por tipo")
+    args = parser.parse_args()
+
+    events = read_events(args.trace)
+    counts: Dict[str, int] = {}
+    for event in events:
+        counts[event['e']] = counts.get(event['e'], 0) + 1
+    print(f"{len(events)} eventos: " + ', '.join(f"{kind}={count}" for kind, count in sorted(counts.items())))
+    if args.summary or not events:
+        return
+    grid, step = replay_events(events, args.step)
+    event = events[step]
+    print(f"Evento {step} (t={event['t']}s): {event['e']}")
+    for line in grid:
+        print(''.join(line))
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,49 @@
-from typing import Set, List, Tuple
+from typing import FrozenSet, List, Tuple, Dict, Callable
 from logger_config import setup_logger
+from placements import PlacedWords
 
 logger = setup_logger()
 
+# Conjuntos constantes criados uma única vez (antes eram reconstruídos a cada chamada)
+VOWELS: FrozenSet[str] = frozenset('aeiouAEIOU')
+SPECIAL_CHARS: FrozenSet[str] = frozenset('&#$+!@*()-_/')
+NUMBERS: FrozenSet[str] = frozenset('0123456789')
+
 def count_vowels(word: str) -> int:
-    vowels: Set[str] = set('aeiouAEIOU')
-    return sum(1 for char in word if char in vowels)
+    return sum(1 for char in word if char in VOWELS)
 
 def priority_removal_criteria(word: str) -> int:
     score: int = 0
-    special_chars: Set[str] = set('&#$+!@*()-_/')
-    numbers: Set[str] = set('0123456789')
     for char in word:
-        if char in special_chars:
+        if char in SPECIAL_CHARS:
             score -= 30
-        elif char in numbers:
+        elif char in NUMBERS:
             score -= 20
         else:
             score += 1
     return score
 
+# Pontuação de prioridade em um único inteiro: vogais nos bits altos e o critério de remoção (deslocado para
+# ficar positivo) nos bits baixos. Comparar as pontuações equivale a comparar (count_vowels, priority_removal_criteria).
+def priority_score(word: str) -> int:
+    return (count_vowels(word) << 32) + priority_removal_criteria(word) + (1 << 31)
+
+# Funções de pontuação disponíveis para pré-calcular no carregamento do dicionário (maior pontuação = maior prioridade)
+WORD_SCORERS: Dict[str, Callable[[str], int]] = {'priority': priority_score, 'vowels': count_vowels}
+DEFAULT_SCORER: str = 'priority'
+
 # Ordena as palavras correspondentes por prioridade (mais vogais primeiro e menos caracteres especiais)
 def prioritize_words(matching_words: List[str]) -> List[str]:
     # Ordena as palavras com base em dois critérios:
     # 1. Maior número de vogais (quanto mais vogais, mais alta a prioridade)
     # 2. Menos caracteres especiais ou números (quanto menos, maior a prioridade)
-    return sorted(matching_words, key=lambda word: (count_vowels(word), priority_removal_criteria(word)), reverse=True)
+    return sorted(matching_words, key=priority_score, reverse=True)
 
 # Função para encontrar o número de interseções de uma palavra no grid
 def find_intersections(word: str, row: int, col: int, direction: str, used_words: List[Tuple[str, int, int, str]]) -> int:
+    if isinstance(used_words, PlacedWords):  # O(1) por célula usando o índice de posse
+        return used_words.count_crossings(word, row, col, direction)
+
     intersections: int = 0
     length: int = len(word)
     
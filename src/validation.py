@@ -0,0 +1,54 @@
+from typing import List, Tuple, Set
+from pattern_index import PatternIndex
+from slots import SlotGraph
+from logger_config import setup_logger
+from tracing import tracer
+
+logger = setup_logger()
+
+# Validação do grid pelo modelo de slots: cada slot completo é testado contra o conjunto de palavras do seu
+# tamanho (pertinência exata por hash), sem reescanear linhas e colunas nem consultar padrões.
+# A validação é incremental: só os slots marcados como alterados pelo SlotGraph são testados de novo,
+# e o conjunto de slots inválidos é mantido entre as chamadas.
+class GridValidator:
+    def __init__(self, slot_graph: SlotGraph, words_index: PatternIndex):
+        self.slot_graph: SlotGraph = slot_graph
+        self.words_index: PatternIndex = words_index
+        self.invalid: Set[int] = set()  # Slots completos cuja palavra não está no dicionário
+        self.complete: Set[int] = set()  # Slots sem células vazias
+        self.checked: int = 0  # Slots testados (para medir o ganho da validação incremental)
+
+    # Testa apenas os slots alterados desde a última chamada
+    def refresh(self) -> None:
+        graph = self.slot_graph
+        for slot_id in graph.dirty:
+            pattern: str = graph.pattern(slot_id)
+            if '?' in pattern:
+                self.complete.discard(slot_id)
+                self.invalid.discard(slot_id)
+                continue
+            self.complete.add(slot_id)
+            if pattern not in self.words_index.word_set(len(pattern)):
+                self.invalid.add(slot_id)
+            else:
+                self.invalid.discard(slot_id)
+        self.checked += len(graph.dirty)
+        graph.dirty.clear()
+
+    # Número de slots completos com palavras do dicionário (qualidade de um preenchimento parcial)
+    def valid_slots(self) -> int:
+        self.refresh()
+        return len(self.complete) - len(self.invalid)
+
+    # Testa os slots alterados desde a última chamada e devolve todas as palavras inválidas do grid
+    # como (palavra, linha, coluna, direção), na ordem dos slots (horizontais e depois verticais)
+    def invalid_words(self) -> List[Tuple[str, int, int, str]]:
+        self.refresh()
+        graph = self.slot_graph
+        invalid_words: List[Tuple[str, int, int, str]] = []
+        for slot_id in sorted(self.invalid):
+            slot = graph.slots[slot_id]
+            invalid_words.append((graph.pattern(slot_id), slot.row, slot.col, slot.direction))
+            if tracer.steps:
+                logger.info(f"Palavra inválida encontrada: {invalid_words[-1][0]} na direção {slot.direction} na posição ({slot.row}, {slot.col})")
+        return invalid_words
@@ -1,17 +1,120 @@
-def verify_word(file_path: str, searched_word: str) -> bool:
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                words = line.split()
-                if searched_word in words:
-                    print(f"A palavra '{searched_word}' está na lista.")
-                    return True
+import argparse
+import sys
+import time
+from itertools import islice
+from typing import List, Tuple, Dict, Set, Iterator, Iterable, TextIO
+from compiled_index import load_dictionary
+from pattern_index import PatternIndex
+from compact_grid import Grid
+from slots import SlotGraph
+from validation import GridValidator
+
+BATCH_SIZE = 65536  # Entradas lidas e respondidas por lote
+
+# Verifica uma única palavra (mantida para uso interativo); para muitas palavras use verify_stream
+def verify_word(words_index: PatternIndex, searched_word: str) -> bool:
+    found: bool = searched_word in words_index.word_set(len(searched_word))
+    if found:
+        print(f"A palavra '{searched_word}' está na lista.")
+    else:
         print(f"A palavra '{searched_word}' não está na lista.")
-        return False
-    except FileNotFoundError:
-        print("file não encontrado.")
-        return False
-
-file_path = 'src/files/lista_palavras.txt'
-searched_word = "MAI"
-verify_word(file_path, searched_word)
\ No newline at end of file
+    return found
+
+# Lê as entradas de um stream (uma por linha) em lotes, sem carregar o arquivo inteiro
+def read_batches(stream: Iterable[str], size: int = BATCH_SIZE) -> Iterator[List[str]]:
+    entries = (line.strip() for line in stream)
+    entries = (entry for entry in entries if entry)
+    while True:
+        batch: List[str] = list(islice(entries, size))
+        if not batch:
+            return
+        yield batch
+
+# Responde um lote: as palavras são agrupadas por tamanho e cada grupo é respondido por uma interseção com o
+# conjunto daquele tamanho; entradas com '?' são padrões e devolvem o número de palavras que casam (contagem por
+# bitsets, sem materializar as palavras), calculado uma vez por padrão distinto do lote
+def verify_batch(words_index: PatternIndex, batch: List[str]) -> List[Tuple[str, bool, int]]:
+    by_length: Dict[int, Set[str]] = {}
+    counts: Dict[str, int] = {}
+    for entry in batch:
+        if '?' in entry:
+            counts[entry] = 0
+        else:
+            by_length.setdefault(len(entry), set()).add(entry)
+    found: Set[str] = set()
+    for length, words in by_length.items():
+        found.update(words.intersection(words_index.word_set(length)))
+    for pattern in counts:
+        counts[pattern] = words_index.count_pattern(pattern)
+    return [(entry, counts[entry] > 0, counts[entry]) if '?' in entry else (entry, entry in found, int(entry in found))
+            for entry in batch]
+
+# Verifica um stream de entradas e escreve uma linha por entrada (ou só as ausentes); devolve (entradas, ausentes)
+def verify_stream(words_index: PatternIndex, stream: Iterable[str], output: TextIO, missing_only: bool = False) -> Tuple[int, int]:
+    total: int = 0
+    missing: int = 0
+    for batch in read_batches(stream):
+        lines: List[str] = []
+        for entry, found, count in verify_batch(words_index, batch):
+            if not found:
+                missing += 1
+            if missing_only and found:
+                continue
+            if '?' in entry:
+                lines.append(f"{entry}\t{count}")
+            else:
+                lines.append(f"{entry}\t{'OK' if found else 'AUSENTE'}")
+        total += len(batch)
+        if lines:
+            output.write('\n'.join(lines) + '\n')
+    return total, missing
+
+# Verifica as palavras formadas em um grid preenchido pelo mesmo validador de slots do solver;
+# devolve (palavras, inválidas) e lista as inválidas. Linhas mais curtas são completadas com bloqueios
+def verify_grid(words_index: PatternIndex, grid_path: str, output: TextIO) -> Tuple[int, int]:
+    slot_graph = SlotGraph(Grid.from_file(grid_path))
+    invalid_words = GridValidator(slot_graph, words_index).invalid_words()  # Só testa slots completos
+    for word, row, col, direction in invalid_words:
+        output.write(f"{grid_path}\t{word}\t({row}, {col})\t{direction}\tINVÁLIDA\n")
+    for slot_id, slot in enumerate(slot_graph.slots):
+        if slot_graph.open_counts[slot_id]:
+            invalid_words.append((slot_graph.pattern(slot_id), slot.row, slot.col, slot.direction))
+            output.write(f"{grid_path}\t{invalid_words[-1][0]}\t({slot.row}, {slot.col})\t{slot.direction}\tINCOMPLETA\n")
+    output.write(f"{grid_path}\t{'OK' if not invalid_words else 'INVÁLIDO'}\n")
+    return len(slot_graph.slots), len(invalid_words)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verifica palavras, padrões ('?' é coringa) e grids preenchidos contra o dicionário")
+    parser.add_argument('entries', nargs='*', help="palavras ou padrões a verificar")
+    parser.add_argument('--words', default='src/files/lista_palavras.txt')
+    parser.add_argument('--input', default=None, metavar='ARQUIVO', help="arquivo com uma entrada por linha ('-' para stdin)")
+    parser.add_argument('--grid', action='append', default=[], metavar='ARQUIVO', help="grid preenchido a validar (pode repetir)")
+    parser.add_argument('--missing-only', action='store_true', help="escreve só as entradas ausentes")
+    parser.add_argument('--compiled-index', action=argparse.BooleanOptionalAction, default=True)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    words_index, _ = load_dictionary(args.words, args.compiled_index)
+    load_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    total, missing = verify_stream(words_index, args.entries, sys.stdout, args.missing_only)
+    if args.input == '-':
+        counts = verify_stream(words_index, sys.stdin, sys.stdout, args.missing_only)
+    elif args.input:
+        with open(args.input, 'r', encoding='utf-8') as file:
+            counts = verify_stream(words_index, file, sys.stdout, args.missing_only)
+    else:
+        counts = (0, 0)
+    total, missing = total + counts[0], missing + counts[1]
+    for grid_path in args.grid:
+        words, invalid = verify_grid(words_index, grid_path, sys.stdout)
+        total, missing = total + words, missing + invalid
+    seconds = time.perf_counter() - start_time
+    rate = total / seconds if seconds > 0 else float('inf')
+    # Estatísticas no stderr, para não misturar com a saída das respostas
+    print(f"{total} entradas verificadas ({missing} ausentes/inválidas) em {seconds:.3f}s: {rate:,.0f} entradas/s "
+          f"(dicionário carregado em {load_seconds:.3f}s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
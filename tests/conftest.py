@@ -0,0 +1,60 @@
+import itertools
+import os
+import random
+import sys
+from typing import List, Set, Tuple
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))  # Os módulos do projeto se importam pelo nome, como em `python src/main.py`
+os.chdir(ROOT)  # O logger e os caminhos padrão são relativos à raiz do repositório
+
+from slots import SlotGraph
+
+# Dicionário aleatório pequeno (letras e tamanhos restritos, para haver muitos cruzamentos possíveis)
+def random_words(rng: random.Random, count: int, letters: str = 'abcde', lengths: range = range(2, 7)) -> List[str]:
+    return sorted({''.join(rng.choice(letters) for _ in range(rng.choice(lengths))) for _ in range(count)})
+
+# Lista de palavras pequena gravada em arquivo, para o que carrega o dicionário pelo caminho
+@pytest.fixture
+def words_file(tmp_path) -> str:
+    path = tmp_path / 'palavras.txt'
+    path.write_text('\n'.join(['ARA', 'ARARA', 'ASA', 'CASA', 'CASO', 'COCO', 'OCA', 'OSSO', 'SACO', 'SAPO', 'OVO', 'AVE', 'EVA']) + '\n', encoding='utf-8')
+    return str(path)
+
+# Grid aleatório pequeno; simétrico (igual ao transposto) se pedido
+def random_grid(rng: random.Random, size: int = 3, symmetric: bool = False) -> List[str]:
+    grid = [['?' if rng.random() < 0.85 else '.' for _ in range(size)] for _ in range(size)]
+    if symmetric:
+        for row in range(size):
+            for col in range(row):
+                grid[row][col] = grid[col][row]
+    return [''.join(line) for line in grid]
+
+# Todas as soluções por força bruta: uma palavra por slot, sem repetição, letras compatíveis nos cruzamentos
+def brute_force(rows: List[str], words: List[str]) -> Set[Tuple[str, ...]]:
+    slot_graph = SlotGraph([list(row) for row in rows])
+    domains = [[word for word in words if len(word) == slot.length
+                and all(fixed in ('?', letter) for fixed, letter in zip(slot_graph.pattern(slot.id), word))] for slot in slot_graph.slots]
+    solutions = set()
+    for combination in itertools.product(*domains):
+        if len(set(combination)) < len(combination):
+            continue
+        cells = {}
+        for slot, word in zip(slot_graph.slots, combination):
+            for cell, letter in zip(slot.cells, word):
+                if cells.setdefault(cell, letter) != letter:
+                    break
+            else:
+                continue
+            break
+        else:
+            solutions.add(tuple(''.join(cells.get((row, col), char) for col, char in enumerate(line)) for row, line in enumerate(rows)))
+    return solutions
+
+# Grid preenchido válido: toda palavra está no dicionário e nenhuma se repete
+def assert_valid_fill(grid: List[List[str]], index) -> None:
+    slot_graph = SlotGraph(grid)
+    placed = [slot_graph.pattern(slot.id) for slot in slot_graph.slots]
+    assert len(set(placed)) == len(placed) and all(word in index for word in placed)
@@ -0,0 +1,59 @@
+import os
+import random
+
+from conftest import random_words
+from compiled_index import MappedPatternIndex, build_packed_trie, ensure_compiled_index
+from pattern_index import load_words_index
+from test_pattern_index import make_trie, random_patterns
+
+def write_words(tmp_path, words):
+    path = tmp_path / 'palavras.txt'
+    path.write_text('\n'.join(words) + '\n', encoding='utf-8')
+    return str(path)
+
+def test_compiled_index_matches_memory_index(tmp_path):
+    rng = random.Random(17)
+    words = random_words(rng, 300, 'ABCDE')
+    compiled = ensure_compiled_index(write_words(tmp_path, words))
+    try:
+        assert isinstance(compiled, MappedPatternIndex)
+        memory = load_words_index(str(tmp_path / 'palavras.txt'), compiled.scorer)[0]
+        trie = make_trie(words)
+        for pattern in random_patterns(rng, words, 300):
+            assert compiled.search_with_pattern(pattern) == memory.search_with_pattern(pattern)
+            assert sorted(compiled.trie.search_with_pattern(pattern)) == sorted(trie.search_with_pattern(pattern))
+    finally:
+        compiled.close()
+
+def test_dawg_shares_suffixes():
+    words = ['CANTAR', 'CANTOU', 'FALAR', 'FALOU', 'PARAR', 'PAROU']
+    trie_nodes = len({word[:end] for word in words for end in range(len(word) + 1)})
+    assert len(build_packed_trie(words)) < trie_nodes
+
+def test_non_latin1_dictionary_falls_back_to_memory_index(tmp_path):
+    index = ensure_compiled_index(write_words(tmp_path, ['ΑΛΦΑ', 'ΒΗΤΑ', 'CASA']))
+    assert not isinstance(index, MappedPatternIndex)
+    assert index.search_with_pattern('??ΤΑ') == ['ΒΗΤΑ']
+
+def test_checksum_only_when_mtime_changes(tmp_path, monkeypatch):
+    import compiled_index
+    source = write_words(tmp_path, ['CASA', 'CASO', 'SACO'])
+    ensure_compiled_index(source).close()
+    calls = []
+    checksum = compiled_index.source_checksum
+    monkeypatch.setattr(compiled_index, 'source_checksum', lambda path: calls.append(path) or checksum(path))
+    ensure_compiled_index(source).close()
+    assert calls == []  # Tamanho e mtime iguais: sem hash
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    ensure_compiled_index(source).close()
+    assert len(calls) == 1  # Só o mtime mudou: hash confere e o cabeçalho é atualizado
+    ensure_compiled_index(source).close()
+    assert len(calls) == 1
+    with open(source, 'a', encoding='utf-8') as file:
+        file.write('SAPO\n')
+    index = ensure_compiled_index(source)
+    try:
+        assert index.search_with_pattern('SAP?') == ['SAPO']
+    finally:
+        index.close()
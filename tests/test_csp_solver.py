@@ -0,0 +1,24 @@
+import random
+
+from conftest import assert_valid_fill, brute_force, random_grid, random_words
+from csp_solver import solve_ac3
+from pattern_index import PatternIndex
+from trie import preprocess_words_by_length
+
+def test_ac3_agrees_with_brute_force():
+    rng = random.Random(1)
+    for _ in range(60):
+        rows = random_grid(rng)
+        if rng.random() < 0.3:  # Letra pré-preenchida
+            rows[0] = rows[0].replace('?', rng.choice('ab'), 1)
+        words = random_words(rng, 20, 'ab', range(2, 4))
+        index = PatternIndex(preprocess_words_by_length(words))
+        expected = brute_force(rows, words)
+        for backjumping in (True, False):
+            grid = [list(row) for row in rows]
+            assert solve_ac3(grid, index, backjumping=backjumping) == bool(expected)
+            if expected:
+                assert tuple(''.join(line) for line in grid) in expected
+                assert_valid_fill(grid, index)
+            else:
+                assert [''.join(line) for line in grid] == rows  # Sem solução: o grid volta ao estado original
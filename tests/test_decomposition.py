@@ -0,0 +1,60 @@
+import random
+
+import decomposition
+from conftest import assert_valid_fill, random_words
+from anytime import AnytimeControl
+from csp_solver import solve_ac3
+from decomposition import choose_cut, component_rows, solve_decomposed
+from pattern_index import PatternIndex
+from slots import SlotGraph
+from trie import preprocess_words_by_length
+
+CUT_ROWS = ['???????', '???.???', '???.???']
+
+def random_rows(rng: random.Random):
+    rows = [''.join('?' if rng.random() < 0.62 else '.' for _ in range(rng.randint(3, 5))) for _ in range(rng.randint(3, 5))]
+    return [row.ljust(max(len(line) for line in rows), '.') for row in rows]
+
+def assert_agrees_with_ac3(index, rng: random.Random, count: int, workers: int = 1):
+    for _ in range(count):
+        rows = random_rows(rng)
+        whole, decomposed = [list(row) for row in rows], [list(row) for row in rows]
+        budget = AnytimeControl(node_limit=20000)
+        solved = solve_ac3(whole, index, anytime=budget)
+        if budget.exhausted:
+            continue
+        assert solve_decomposed(decomposed, index, workers=workers) == solved
+        if solved:
+            assert_valid_fill(decomposed, index)
+
+def test_components_mode_agrees_with_ac3():
+    rng = random.Random(4)
+    index = PatternIndex(preprocess_words_by_length(random_words(rng, 600, 'ABCDE', range(2, 6))))
+    assert_agrees_with_ac3(index, rng, 60)
+
+def test_cut_fallback_to_whole_component_agrees_with_ac3(monkeypatch):
+    monkeypatch.setattr(decomposition, 'MAX_CUT_CROSSINGS', 1)
+    rng = random.Random(8)
+    index = PatternIndex(preprocess_words_by_length(random_words(rng, 300, 'ABC', range(2, 6))))
+    assert_agrees_with_ac3(index, rng, 60)
+
+def test_components_mode_splits_at_cut_slot():
+    index = PatternIndex(preprocess_words_by_length(random_words(random.Random(5), 800, 'ABCDE', range(3, 8))))
+    grid = [list(row) for row in CUT_ROWS]
+    slot_graph = SlotGraph(grid)
+    assert choose_cut(slot_graph, slot_graph.components()[0], slot_graph.articulation_slots())[0] == 0
+    assert solve_decomposed(grid, index)
+    assert_valid_fill(grid, index)
+
+def test_part_sees_only_the_crossing_letters():
+    slot_graph = SlotGraph([list(row) for row in CUT_ROWS])
+    part = [slot.id for slot in slot_graph.slots if slot.id != 0 and slot.col < 3]
+    assert component_rows([list(row) for row in CUT_ROWS], slot_graph, part, {0: 'ABCDEFG'}) == ['ABC....', '???....', '???....']
+
+def test_budget_reaches_the_regions():
+    index = PatternIndex(preprocess_words_by_length(random_words(random.Random(9), 300, 'ABCDE', range(4, 5))))
+    for workers in (1, 2):
+        anytime = AnytimeControl(node_limit=5, stop=lambda: False)
+        grid = [list('????.????') for _ in range(4)]
+        assert not solve_decomposed(grid, index, workers=workers, anytime=anytime)
+        assert anytime.exhausted and not anytime.cancelled
@@ -0,0 +1,47 @@
+import random
+
+from conftest import brute_force, random_grid, random_words
+from anytime import AnytimeControl
+from csp_solver import enumerate_solutions
+from pattern_index import PatternIndex
+from trie import preprocess_words_by_length
+
+def transposed(rows):
+    return tuple(''.join(line[col] for line in rows) for col in range(len(rows)))
+
+def test_enumeration_matches_brute_force():
+    rng = random.Random(1)
+    for _ in range(60):
+        rows = random_grid(rng)
+        words = random_words(rng, 20, 'ab', range(2, 4))
+        index = PatternIndex(preprocess_words_by_length(words))
+        expected = brute_force(rows, words)
+        for backjumping in (True, False):
+            found = list(enumerate_solutions([list(row) for row in rows], index, backjumping=backjumping, symmetry=False))
+            assert len(found) == len(set(found))
+            assert set(found) == expected
+
+def test_limit_caps_the_number_of_solutions():
+    rng = random.Random(7)
+    words = random_words(rng, 20, 'ab', range(2, 4))
+    index = PatternIndex(preprocess_words_by_length(words))
+    rows = ['???', '?.?', '???']
+    expected = brute_force(rows, words)
+    found = list(enumerate_solutions([list(row) for row in rows], index, 2, symmetry=False))
+    assert len(found) == min(2, len(expected)) and set(found) <= expected
+
+def test_symmetry_breaking_keeps_one_of_each_transposed_pair():
+    rng = random.Random(2)
+    for _ in range(40):
+        rows = random_grid(rng, symmetric=True)
+        words = random_words(rng, 20, 'ab', range(2, 4))
+        index = PatternIndex(preprocess_words_by_length(words))
+        found = set(enumerate_solutions([list(row) for row in rows], index, symmetry=True))
+        assert found | {transposed(solution) for solution in found} == brute_force(rows, words)
+
+def test_node_limit_stops_enumeration():
+    words = random_words(random.Random(3), 300, 'ABCDE', range(4, 5))
+    index = PatternIndex(preprocess_words_by_length(words))
+    anytime = AnytimeControl(node_limit=10)
+    list(enumerate_solutions([list('????') for _ in range(4)], index, anytime=anytime, symmetry=False))
+    assert anytime.exhausted
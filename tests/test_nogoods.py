@@ -0,0 +1,84 @@
+import random
+
+from conftest import random_words
+from nogoods import NogoodStore, pattern_letters
+from pattern_cache import PatternCache
+from pattern_index import PatternIndex
+from session import SolverSession
+from slots import SlotGraph
+from solver import fill_grid_max
+from trie import preprocess_words_by_length
+
+INDEX = PatternIndex(preprocess_words_by_length(['CASA', 'CASO', 'SACO', 'SAPO', 'OCA', 'OVO', 'ARA']))
+
+def test_nogood_is_minimized_to_the_conflicting_letters():
+    store = NogoodStore()
+    store.add('XA?O', INDEX)  # Nenhuma palavra começa com X: as outras letras não fazem parte do conflito
+    assert store.stats()['dropped_letters'] == 2
+    assert 'X???' in store and 'XB?C' in store
+    assert 'CA?O' not in store and 'X??' not in store  # Outro tamanho: outro dicionário
+
+def test_blocked_by_subsumption():
+    store = NogoodStore()
+    store.add('C?P?', INDEX)  # Há palavras com C no início e com P na terceira posição, mas não com os dois
+    assert 'C?P?' in store and 'CAPA' in store and 'CSPO' in store
+    assert not store.blocked('C???') and not store.blocked('??P?')
+    assert store.blocked('COPO')
+    assert store.stats()['hits'] == 1
+
+def test_covered_pattern_is_not_recorded_again():
+    store = NogoodStore()
+    store.add('X???', INDEX)
+    store.add('XY??', INDEX)
+    assert len(store) == 1 and store.stats()['recorded'] == 1
+
+def test_length_without_words_blocks_every_pattern():
+    store = NogoodStore()
+    store.add('A????', INDEX)
+    assert len(store) == 1 and 'ZZZZZ' in store and '?????' in store
+
+def test_least_recently_used_is_evicted():
+    store = NogoodStore(capacity=2)
+    store.add('X???', INDEX)
+    store.add('Y???', INDEX)
+    assert store.blocked('X???')  # Consultar renova o nogood
+    store.add('Z???', INDEX)
+    assert 'X???' in store and 'Y???' not in store and 'Z???' in store
+    assert store.stats()['evictions'] == 1
+    assert (4, 0, 'Y') not in store.postings
+
+def test_zero_capacity_records_nothing():
+    store = NogoodStore(capacity=0)
+    store.add('X???', INDEX)
+    assert len(store) == 0 and not store.blocked('X???')
+
+def test_clear():
+    store = NogoodStore()
+    store.add('X???', INDEX)
+    store.clear()
+    assert len(store) == 0 and not store.blocked('X???') and not store.postings
+
+# Um nogood só pode conter letras sem nenhuma palavra no dicionário (vale em qualquer parte da busca), e é mínimo:
+# sem qualquer uma das suas letras, o padrão já tem palavras
+def test_legacy_solver_records_only_minimal_nogoods():
+    rng = random.Random(7)
+    recorded = 0
+    for _ in range(30):
+        words = random_words(rng, 120, 'ABC', range(2, 6))
+        word_size_map = preprocess_words_by_length(words)
+        index = PatternIndex(word_size_map)
+        grid = [['?' if rng.random() < 0.75 else '.' for _ in range(5)] for _ in range(5)]
+        session = SolverSession(SlotGraph(grid), PatternCache(index))
+        try:
+            fill_grid_max(grid, index, word_size_map, session)
+        except RecursionError:
+            pass
+        for length, letters in session.nogoods.entries:
+            pattern = ['?'] * length
+            for position, letter in letters:
+                pattern[position] = letter
+            assert index.count_pattern(''.join(pattern)) == 0
+            for position, _ in pattern_letters(''.join(pattern)):
+                assert index.count_pattern(''.join(pattern[:position]) + '?' + ''.join(pattern[position + 1:]))
+        recorded += len(session.nogoods)
+    assert recorded > 0
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+import numpy_index
+from compiled_index import MappedPatternIndex
+from conftest import random_words
+from csp_solver import enumerate_solutions
+from pattern_index import PatternIndex
+from test_pattern_index import random_patterns
+from trie import preprocess_words_by_length
+
+requires_numpy = pytest.mark.skipif(not numpy_index.NUMPY_AVAILABLE, reason="NumPy não está instalado")
+
+def write_words(tmp_path, words):
+    path = tmp_path / 'palavras.txt'
+    path.write_text('\n'.join(words) + '\n', encoding='utf-8')
+    return str(path)
+
+@requires_numpy
+def test_numpy_engine_matches_bitsets():
+    rng = random.Random(19)
+    words = random_words(rng, 300, 'ABCDE')
+    word_size_map = preprocess_words_by_length(words)
+    bitsets = PatternIndex(word_size_map, 'priority')
+    vectorized = numpy_index.NumpyPatternIndex(word_size_map, 'priority')
+    assert vectorized.position_bits == {}  # Só a matriz é construída
+    assert vectorized.words_by_length == bitsets.words_by_length
+    for pattern in random_patterns(rng, words, 300):
+        domain = bitsets.match_mask(pattern)
+        assert vectorized.match_mask(pattern) == domain
+        if '?' in pattern and domain:
+            length = len(pattern)
+            for position in range(length):
+                letters = bitsets.supported_letters(length, position, domain)
+                assert vectorized.supported_letters(length, position, domain) == sorted(letters)
+                assert vectorized.letters_mask(length, position, letters) == bitsets.letters_mask(length, position, letters)
+
+@requires_numpy
+def test_compiled_numpy_engine_solves_like_bitsets(tmp_path):
+    source = write_words(tmp_path, ['ARA', 'ASA', 'CASA', 'CASO', 'OCA', 'OSSO', 'SACO', 'SAPO', 'OVO', 'AVE', 'EVA'])
+    bitsets, _ = numpy_index.load_dictionary_with_engine(source, 'bitset', compiled=False)
+    vectorized, _ = numpy_index.load_dictionary_with_engine(source, 'numpy')
+    try:
+        assert isinstance(vectorized, numpy_index.MappedNumpyPatternIndex)
+        rows = ['???', '?.?', '???']
+        solutions = [sorted(enumerate_solutions([list(row) for row in rows], words_index, symmetry=False)) for words_index in (bitsets, vectorized)]
+        assert solutions[0] and solutions[0] == solutions[1]
+        assert len(vectorized.position_bits) == 0  # Bitsets do arquivo nunca convertidos
+    finally:
+        vectorized.close()
+
+def test_numpy_engine_falls_back_to_bitsets_without_numpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(numpy_index, 'np', None)
+    source = write_words(tmp_path, ['CASA', 'CASO', 'SACO'])
+    words_index, words_by_length = numpy_index.load_dictionary_with_engine(source, 'numpy', compiled=False)
+    assert type(words_index) is PatternIndex
+    assert words_index.search_with_pattern('CAS?') == ['CASA', 'CASO']
+    words_index, _ = numpy_index.load_dictionary_with_engine(source, 'numpy')
+    try:
+        assert type(words_index) is MappedPatternIndex
+    finally:
+        words_index.close()
+    with pytest.raises(ImportError):
+        numpy_index.NumpyPatternIndex(preprocess_words_by_length(['CASA']))
@@ -0,0 +1,52 @@
+import random
+
+from conftest import random_words
+from pattern_index import PatternIndex, load_words_index
+from trie import Trie, preprocess_words_by_length
+
+def random_patterns(rng: random.Random, words, count: int):
+    for _ in range(count):
+        base = rng.choice(words) if rng.random() < 0.7 else ''.join(rng.choice('ABCDEF') for _ in range(rng.randint(1, 7)))
+        yield ''.join('?' if rng.random() < 0.5 else char for char in base)
+
+def make_trie(words) -> Trie:
+    trie = Trie()
+    for word in words:
+        trie.insert(word)
+    return trie
+
+def test_search_with_pattern_matches_trie():
+    rng = random.Random(11)
+    words = random_words(rng, 400, 'ABCDE')
+    index = PatternIndex(preprocess_words_by_length(words))
+    trie = make_trie(words)
+    for pattern in random_patterns(rng, words, 500):
+        assert sorted(index.search_with_pattern(pattern)) == sorted(trie.search_with_pattern(pattern))
+        assert index.count_pattern(pattern) == len(trie.search_with_pattern(pattern))
+
+def test_supported_letters_match_domain_words():
+    rng = random.Random(12)
+    words = random_words(rng, 300, 'ABCDE', range(4, 5))
+    index = PatternIndex(preprocess_words_by_length(words))
+    for pattern in random_patterns(rng, [word for word in words if len(word) == 4], 100):
+        if len(pattern) != 4:
+            continue
+        domain = index.match_mask(pattern)
+        for position in range(4):
+            expected = {word[position] for word in index.words_from_mask(4, domain)}
+            assert set(index.supported_letters(4, position, domain)) == expected
+
+def test_load_words_index_ignores_empty_lines(tmp_path):
+    path = tmp_path / 'palavras.txt'
+    path.write_text('CASA\n\nSAPO\n\nOVO\n', encoding='utf-8')
+    index, word_size_map = load_words_index(str(path))
+    assert sorted(len(word) for words in word_size_map.values() for word in words) == [3, 4, 4]
+    assert 'CASA' in index and 'OVO' in index and 'CAS' not in index
+
+def test_scored_index_keeps_score_order():
+    rng = random.Random(13)
+    words = random_words(rng, 200, 'AEIOUST')
+    index = PatternIndex(preprocess_words_by_length(words), scorer='priority')
+    for pattern in random_patterns(rng, words, 100):
+        found = index.search_with_pattern(pattern)
+        assert index.prioritize(found) == index.sort_by_score(found)
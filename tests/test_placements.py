@@ -0,0 +1,68 @@
+import random
+
+from placements import PlacedWords, has_owner_linear, word_cells
+
+SIZE = 8
+
+def random_placement(rng: random.Random):
+    direction = rng.choice('HV')
+    length = rng.randint(2, SIZE)
+    row, col = (rng.randrange(SIZE), rng.randint(0, SIZE - length)) if direction == 'H' else (rng.randint(0, SIZE - length), rng.randrange(SIZE))
+    return (''.join(rng.choice('abc') for _ in range(length)), row, col, direction)
+
+def count_crossings_linear(placed, word, row, col, direction):
+    other = 'V' if direction == 'H' else 'H'
+    return sum(1 for cell_row, cell_col in word_cells(word, row, col, direction) if has_owner_linear(placed, cell_row, cell_col, other))
+
+def assert_matches_linear(placed: PlacedWords, rng: random.Random) -> None:
+    reference = list(placed)
+    for row in range(SIZE):
+        for col in range(SIZE):
+            for direction in 'HV':
+                assert placed.has_owner(row, col, direction) == has_owner_linear(reference, row, col, direction)
+    for _ in range(10):
+        word, row, col, direction = random_placement(rng)
+        assert placed.count_crossings(word, row, col, direction) == count_crossings_linear(reference, word, row, col, direction)
+    assert sum(placed.cell_refcount(row, col) for row in range(SIZE) for col in range(SIZE)) == sum(len(item[0]) for item in reference)
+
+def test_index_matches_linear_scan_under_random_edits():
+    rng = random.Random(3)
+    for _ in range(40):
+        placed = PlacedWords()
+        for _ in range(60):
+            operation = rng.random()
+            if operation < 0.45 or not placed:
+                placed.append(random_placement(rng))
+            elif operation < 0.6:
+                placed.remove(rng.choice(list(placed)))
+            elif operation < 0.7:
+                placed.pop(rng.randrange(len(placed)))
+            elif operation < 0.8:
+                placed[rng.randrange(len(placed))] = random_placement(rng)
+            elif operation < 0.87:
+                start = rng.randrange(len(placed))
+                del placed[start:start + rng.randint(1, 3)]
+            elif operation < 0.94:
+                placed.insert(rng.randrange(len(placed) + 1), random_placement(rng))
+            else:
+                placed[1:3] = [random_placement(rng) for _ in range(rng.randint(0, 3))]
+        assert_matches_linear(placed, rng)
+
+def test_in_place_operators_keep_index():
+    rng = random.Random(5)
+    placed = PlacedWords(random_placement(rng) for _ in range(4))
+    placed += placed
+    assert_matches_linear(placed, rng)
+    placed *= 2
+    assert len(placed) == 16
+    assert_matches_linear(placed, rng)
+    placed *= 0
+    assert not placed.cell_owners and not placed.word_counts
+
+def test_repeated_entries_are_reference_counted():
+    entry = ('casa', 0, 0, 'H')
+    placed = PlacedWords([entry, entry])
+    placed.remove(entry)
+    assert entry in placed and placed.contains_word('casa') and placed.has_owner(0, 3, 'H')
+    placed.remove(entry)
+    assert entry not in placed and not placed.contains_word('casa') and not placed.has_owner(0, 3, 'H')
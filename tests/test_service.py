@@ -0,0 +1,78 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+import time
+
+import service
+from metrics import percentile
+from conftest import ROOT
+
+def run_service(words_file, requests, timeout=60):
+    lines = ''.join(json.dumps(request) + '\n' for request in requests)
+    process = subprocess.run([sys.executable, os.path.join('src', 'service.py'), '--words', words_file, '--workers', '1'],
+                             input=lines, capture_output=True, text=True, timeout=timeout, cwd=ROOT)
+    assert process.returncode == 0, process.stderr
+    return [json.loads(line) for line in process.stdout.splitlines()]
+
+def test_stdio_protocol(words_file):
+    responses = run_service(words_file, [
+        {'id': 1, 'op': 'solve', 'grid': ['???', '?.?', '???'], 'mode': 'ac3', 'timeout': 10},
+        {'id': 2, 'op': 'solve', 'grid': ['??????'], 'mode': 'legacy'},
+        {'id': 3, 'op': 'solve', 'grid': ['???'], 'mode': 'inexistente'},
+        {'id': 4, 'op': 'cancel', 'target': 99},
+        {'id': 5, 'op': 'desconhecida'},
+    ]) + run_service(words_file, ['não é um objeto'])
+    by_id = {response['id']: response for response in responses}
+    assert by_id[1]['status'] == 'solved' and '?' not in ''.join(by_id[1]['rows'])
+    assert by_id[2]['status'] == 'unsolvable' and by_id[2]['rows'] is None
+    assert by_id[3]['status'] == 'error'
+    assert by_id[4] == {'id': 4, 'status': 'ok', 'cancelled': False}
+    assert by_id[5]['status'] == 'error'
+    assert by_id[None]['status'] == 'error'
+
+def test_stats_and_shutdown(words_file):
+    responses = run_service(words_file, [
+        {'id': 1, 'op': 'solve', 'grid': ['???', '?.?', '???'], 'mode': 'components'},
+        {'id': 2, 'op': 'shutdown'},
+    ])
+    assert {response['id']: response['status'] for response in responses} == {1: 'solved', 2: 'ok'}
+
+# O slot do pool só é devolvido quando o worker termina, mesmo que o serviço já tenha desistido de esperar
+def test_slot_is_held_until_worker_finishes(words_file, monkeypatch):
+    monkeypatch.setattr(service, 'TIMEOUT_GRACE', 0.1)
+    monkeypatch.setattr(service, 'solve_request', lambda seq, request, timeout: (time.sleep(0.6), {'status': 'solved'})[1])
+    solver_service = service.SolverService(words_file, 1, 0.0)
+    solver_service.executor.shutdown()
+    solver_service.executor = concurrent.futures.ThreadPoolExecutor(1)
+
+    async def scenario():
+        solver_service.start_loop_state()
+        responses = []
+
+        async def respond(message):
+            responses.append(message)
+
+        await solver_service.handle_line(json.dumps({'id': 1, 'grid': ['??'], 'timeout': 0}), respond)
+        await solver_service.handle_line(json.dumps({'id': 2, 'grid': ['??'], 'timeout': 0}), respond)
+        await asyncio.sleep(0.3)
+        during = (list(responses), solver_service.stats())
+        await solver_service.drain()  # O pedido 2 também desiste antes de o seu worker terminar
+        still_running = solver_service.stats()['running']
+        await asyncio.sleep(0.8)
+        return during, responses, still_running, solver_service.stats()
+
+    try:
+        (early, stats), responses, still_running, final = asyncio.run(scenario())
+    finally:
+        solver_service.executor.shutdown()
+    assert [response['status'] for response in early] == ['timeout']
+    assert stats['running'] == 1 and stats['queue_depth'] == 1  # O pedido 2 espera o worker ocupado
+    assert [response['status'] for response in responses] == ['timeout', 'timeout'] and still_running == 1
+    assert final['running'] == 0 and final['queue_depth'] == 0
+
+def test_latency_percentiles_use_nearest_rank():
+    latencies = [0.4, 0.1, 0.3, 0.2]
+    assert [percentile(latencies, fraction) for fraction in (0.0, 0.5, 0.9, 1.0)] == [0.1, 0.2, 0.4, 0.4]
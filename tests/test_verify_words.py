@@ -0,0 +1,58 @@
+import io
+
+from pattern_index import load_words_index
+from verify_words import read_batches, verify_batch, verify_grid, verify_stream
+
+def test_batch_answers_words_and_patterns(words_file):
+    index = load_words_index(words_file)[0]
+    assert verify_batch(index, ['CASA', 'CASE', 'CAS?', '??', 'O?O']) == [
+        ('CASA', True, 1), ('CASE', False, 0), ('CAS?', True, 2), ('??', False, 0), ('O?O', True, 1)]
+
+def test_stream_reports_missing_entries(words_file):
+    index = load_words_index(words_file)[0]
+    output = io.StringIO()
+    assert verify_stream(index, ['CASA\n', '\n', 'XYZ\n', 'S?PO\n'], output) == (3, 1)
+    assert output.getvalue() == 'CASA\tOK\nXYZ\tAUSENTE\nS?PO\t1\n'
+    output = io.StringIO()
+    verify_stream(index, ['CASA', 'XYZ'], output, missing_only=True)
+    assert output.getvalue() == 'XYZ\tAUSENTE\n'
+
+def test_read_batches_splits_input():
+    assert list(read_batches(['A', 'B', ' ', 'C'], size=2)) == [['A', 'B'], ['C']]
+
+def test_grid_with_valid_words(words_file, tmp_path):
+    path = tmp_path / 'grid.txt'
+    path.write_text('OCA\nV.S\nOSA\n', encoding='utf-8')
+    output = io.StringIO()
+    assert verify_grid(load_words_index(words_file)[0], str(path), output) == (4, 1)
+    assert 'OSA\t(2, 0)\tH\tINVÁLIDA' in output.getvalue() and output.getvalue().endswith('INVÁLIDO\n')
+
+def test_grid_reports_open_slots(words_file, tmp_path):
+    path = tmp_path / 'grid.txt'
+    path.write_text('OVO\n..?\n', encoding='utf-8')
+    output = io.StringIO()
+    assert verify_grid(load_words_index(words_file)[0], str(path), output) == (2, 1)
+    assert 'O?\t(0, 2)\tV\tINCOMPLETA' in output.getvalue()
+
+def test_filled_grid_is_ok(words_file, tmp_path):
+    path = tmp_path / 'grid.txt'
+    path.write_text('AVE\nS.V\nARA\n', encoding='utf-8')
+    output = io.StringIO()
+    assert verify_grid(load_words_index(words_file)[0], str(path), output) == (4, 0)
+    assert output.getvalue().endswith('\tOK\n')
+
+def test_batch_counts_each_distinct_pattern_once(words_file, monkeypatch):
+    index = load_words_index(words_file)[0]
+    counted = []
+    count_pattern = index.count_pattern
+    monkeypatch.setattr(index, 'count_pattern', lambda pattern: counted.append(pattern) or count_pattern(pattern))
+    assert verify_batch(index, ['CAS?', 'OVO', 'CAS?', 'OVO', 'OV?']) == [
+        ('CAS?', True, 2), ('OVO', True, 1), ('CAS?', True, 2), ('OVO', True, 1), ('OV?', True, 1)]
+    assert sorted(counted) == ['CAS?', 'OV?']
+
+def test_ragged_grid_is_padded_with_blocks(words_file, tmp_path):
+    path = tmp_path / 'grid.txt'
+    path.write_text('OVO\nV\nO\n', encoding='utf-8')
+    output = io.StringIO()
+    assert verify_grid(load_words_index(words_file)[0], str(path), output) == (2, 0)
+    assert output.getvalue().endswith('\tOK\n')